@@ -1,6 +1,25 @@
 """Package algorithms"""
 
-from .dijkstra import dijkstra
+from .dijkstra import (
+    dijkstra, dijkstra_all, multi_source_dijkstra, dijkstra_targets, bounded_dijkstra, build_path
+)
 from .coloring import graph_coloring, get_coloring_stats
+from .depots import nearest_depot_partition
+from .partition import partition_graph, zone_adjacency
+from .tours import plan_tours
+from .components import connected_components, ComponentIndex
+from .spatial import SpatialIndex
+from .betweenness import edge_betweenness, sample_sources, merge_scores, rank_edges
+from .scenarios import evaluate_scenarios
+from .dynamic_sssp import ShortestPathTree, ShortestPathTrees
+from .time_slots import TimeSlotTable, compile_time_slots, parse_schedule, parse_departure, apply_profile
+from .executor import AlgorithmExecutor, AlgorithmTimeout, AlgorithmCancelled
 
-__all__ = ['dijkstra', 'graph_coloring', 'get_coloring_stats']
\ No newline at end of file
+__all__ = ['dijkstra', 'dijkstra_all', 'multi_source_dijkstra', 'dijkstra_targets', 'bounded_dijkstra', 'build_path',
+           'graph_coloring', 'get_coloring_stats',
+           'nearest_depot_partition', 'partition_graph', 'zone_adjacency', 'plan_tours',
+           'connected_components', 'ComponentIndex', 'SpatialIndex',
+           'edge_betweenness', 'sample_sources', 'merge_scores', 'rank_edges', 'evaluate_scenarios',
+           'ShortestPathTree', 'ShortestPathTrees',
+           'TimeSlotTable', 'compile_time_slots', 'parse_schedule', 'parse_departure', 'apply_profile',
+           'AlgorithmExecutor', 'AlgorithmTimeout', 'AlgorithmCancelled']
\ No newline at end of file
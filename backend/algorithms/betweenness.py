@@ -0,0 +1,130 @@
+import heapq
+import random
+
+
+def edge_betweenness(graph_adj, sources=None, stats=None):
+    """
+    Centralité d'intermédiarité des arêtes (Brandes, coûts pondérés)
+
+    Pour chaque source : un Dijkstra qui compte les plus courts chemins
+    (sigma), puis une remontée dans l'ordre inverse qui répartit la
+    dépendance de chaque nœud entre ses prédécesseurs. Les sources sont
+    indépendantes : le calcul se découpe en lots (un par worker) dont on
+    additionne les scores partiels.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        sources: Sources à parcourir (None = tous les nœuds : résultat exact)
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+
+    Returns:
+        dict: {(a, b): score} par arête non-orientée (a < b), non normalisé
+              (somme sur les couples orientés (source, cible))
+    """
+    if sources is None:
+        sources = list(graph_adj)
+    scores = {}
+    counters = {'nodes_settled': 0, 'edges_relaxed': 0}
+
+    for source in sources:
+        if source not in graph_adj:
+            raise ValueError(f"Le nœud source '{source}' n'existe pas !")
+        order, sigma, preds = _count_paths(graph_adj, source, counters)
+
+        delta = dict.fromkeys(order, 0.0)
+        for node in reversed(order):
+            coefficient = (1 + delta[node]) / sigma[node]
+            for pred in preds[node]:
+                contribution = sigma[pred] * coefficient
+                key = (pred, node) if pred < node else (node, pred)
+                scores[key] = scores.get(key, 0.0) + contribution
+                delta[pred] += contribution
+
+    if stats is not None:
+        stats.update(counters)
+    return scores
+
+
+def sample_sources(nodes, samples=None, seed=0):
+    """
+    Sources du calcul : toutes, ou un échantillon reproductible
+
+    Returns:
+        list: Sources triées (même échantillon pour la même graine)
+    """
+    nodes = sorted(nodes)
+    if samples is None or samples >= len(nodes):
+        return nodes
+    return sorted(random.Random(seed).sample(nodes, samples))
+
+
+def merge_scores(partials):
+    """Additionner les scores partiels de plusieurs lots de sources"""
+    total = {}
+    for partial in partials:
+        for key, score in partial.items():
+            total[key] = total.get(key, 0.0) + score
+    return total
+
+
+def rank_edges(scores, node_count, sources_used, top=20):
+    """
+    Arêtes les plus critiques
+
+    Avec un échantillon, les scores sont extrapolés (× nœuds / sources).
+    Le score d'une arête est divisé par 2 (graphe non-orienté : chaque
+    couple est compté dans les deux sens) ; 'share' est la part des couples
+    de nœuds dont les plus courts chemins empruntent l'arête.
+
+    Returns:
+        list: [{'source', 'target', 'betweenness', 'share'}] du plus au moins critique
+    """
+    scale = node_count / sources_used / 2 if sources_used else 0
+    pairs = node_count * (node_count - 1) / 2
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top]
+    return [
+        {
+            'source': a,
+            'target': b,
+            'betweenness': score * scale,
+            'share': score * scale / pairs if pairs else 0
+        }
+        for (a, b), score in ranked
+    ]
+
+
+def _count_paths(graph_adj, source, counters):
+    """Dijkstra depuis source : ordre de fixation, nombre de plus courts chemins, prédécesseurs"""
+    dist = {source: 0}
+    sigma = {source: 1}
+    preds = {source: []}
+    order = []
+    visited = set()
+    heap = [(0, 0, source)]
+    counter = 1
+
+    while heap:
+        d, _, current = heapq.heappop(heap)
+        if current in visited:
+            continue
+        visited.add(current)
+        order.append(current)
+
+        for neighbor, weight, constraint in graph_adj[current]:
+            counters['edges_relaxed'] += 1
+            if neighbor in visited:
+                continue
+            new_dist = d + weight + constraint
+            known = dist.get(neighbor)
+            if known is None or new_dist < known:
+                dist[neighbor] = new_dist
+                sigma[neighbor] = sigma[current]
+                preds[neighbor] = [current]
+                heapq.heappush(heap, (new_dist, counter, neighbor))
+                counter += 1
+            elif new_dist == known:
+                sigma[neighbor] += sigma[current]
+                preds[neighbor].append(current)
+
+    counters['nodes_settled'] += len(order)
+    return order, sigma, preds
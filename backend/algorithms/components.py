@@ -0,0 +1,171 @@
+import threading
+
+
+def connected_components(graph_adj):
+    """
+    Composantes connexes d'un graphe non-orienté
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+
+    Returns:
+        list: Composantes (listes de nœuds), de la plus grande à la plus petite
+    """
+    index = ComponentIndex()
+    index.rebuild(lambda: graph_adj)
+    return [members for _, members in index.groups()]
+
+
+class ComponentIndex:
+    """
+    Index des composantes connexes (union-find) tenu à jour avec le graphe
+
+    Les ajouts (nœud, arête) sont appliqués immédiatement : une union coûte
+    O(α(n)). Une suppression peut scinder une composante, ce qu'un union-find
+    ne sait pas défaire : l'index est alors invalidé puis reconstruit en O(V+E)
+    à la prochaine question (reconstruction paresseuse).
+
+    Seule la présence des arêtes compte, pas leur coût : « pas connectés »
+    est donc une réponse sûre pour Dijkstra, quelles que soient les contraintes.
+    """
+
+    def __init__(self):
+        self._parent = {}
+        self._size = {}
+        self._valid = False      # Construit à la première question
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    # =====================
+    # MISES À JOUR
+    # =====================
+
+    def add_node(self, node):
+        with self._lock:
+            self._generation += 1
+            if self._valid and node not in self._parent:
+                self._parent[node] = node
+                self._size[node] = 1
+
+    def add_edge(self, source, target):
+        with self._lock:
+            self._generation += 1
+            if self._valid:
+                self._union(source, target)
+
+    def invalidate(self):
+        """Une suppression (ou une modification inconnue) : reconstruire plus tard"""
+        with self._lock:
+            self._generation += 1
+            self._valid = False
+
+    def clear(self):
+        """Graphe vidé : index vide et valide"""
+        with self._lock:
+            self._generation += 1
+            self._parent = {}
+            self._size = {}
+            self._valid = True
+
+    @property
+    def valid(self):
+        return self._valid
+
+    def rebuild(self, load_adjacency):
+        """
+        Reconstruire l'index depuis la liste d'adjacence
+
+        Si une modification arrive pendant le chargement, le nouvel index
+        n'est pas installé (il serait déjà obsolète) : l'appel suivant
+        recommencera.
+
+        Args:
+            load_adjacency: Fonction retournant {node: [(voisin, poids, contrainte), ...]}
+        """
+        with self._lock:
+            generation = self._generation
+
+        adj = load_adjacency()
+        parent = {node: node for node in adj}
+        size = {node: 1 for node in adj}
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for node, neighbors in adj.items():
+            for neighbor, _, _ in neighbors:
+                a, b = find(node), find(neighbor)
+                if a != b:
+                    if size[a] < size[b]:
+                        a, b = b, a
+                    parent[b] = a
+                    size[a] += size[b]
+
+        with self._lock:
+            self.rebuilds += 1
+            if self._generation == generation:
+                self._parent = parent
+                self._size = size
+                self._valid = True
+                return True
+            return False
+
+    # =====================
+    # QUESTIONS
+    # =====================
+
+    def _find(self, node):
+        parent = self._parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def _union(self, a, b):
+        for node in (a, b):
+            if node not in self._parent:
+                self._parent[node] = node
+                self._size[node] = 1
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size.pop(b)
+
+    def disconnected(self, a, b):
+        """
+        True si a et b sont connus et dans deux composantes différentes
+
+        Returns:
+            bool: False aussi si l'index est invalide ou un nœud inconnu
+                  (la question est alors laissée à l'algorithme)
+        """
+        with self._lock:
+            if not self._valid or a not in self._parent or b not in self._parent:
+                return False
+            return self._find(a) != self._find(b)
+
+    def component_of(self, node):
+        """Nœuds de la composante de `node` (None si inconnu ou index invalide)"""
+        with self._lock:
+            if not self._valid or node not in self._parent:
+                return None
+            root = self._find(node)
+            return [n for n in self._parent if self._find(n) == root]
+
+    def groups(self):
+        """
+        Returns:
+            list: [(racine, [nœuds])] de la plus grande à la plus petite composante
+        """
+        with self._lock:
+            members = {}
+            for node in self._parent:
+                members.setdefault(self._find(node), []).append(node)
+        return sorted(members.items(), key=lambda item: -len(item[1]))
@@ -0,0 +1,46 @@
+from .dijkstra import multi_source_dijkstra
+
+
+def nearest_depot_partition(graph_adj, depots, stats=None):
+    """
+    Rattacher chaque point de collecte à son dépôt le plus proche (un seul parcours)
+
+    Le résultat est en colonnes : une entrée par nœud atteint, dans l'ordre
+    de `nodes`, sans répéter les clés JSON pour chaque nœud.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        depots: Liste des nœuds dépôts
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+
+    Returns:
+        dict: {
+            'depots': [dépôts],
+            'nodes': [nœuds atteints, triés],
+            'depot': [indice du dépôt dans 'depots'],
+            'distance': [coût depuis ce dépôt],
+            'predecessor': [nœud précédent sur le chemin depuis le dépôt (None pour un dépôt)],
+            'unreachable': [nœuds qu'aucun dépôt n'atteint],
+            'zones': {dépôt: {'nodes': nb, 'max_distance': d}}
+        }
+    """
+    depots = list(dict.fromkeys(depots))
+    dist, nearest, parent = multi_source_dijkstra(graph_adj, depots, stats)
+
+    index = {depot: i for i, depot in enumerate(depots)}
+    nodes = sorted(dist)
+    zones = {depot: {'nodes': 0, 'max_distance': 0} for depot in depots}
+    for node in nodes:
+        zone = zones[nearest[node]]
+        zone['nodes'] += 1
+        zone['max_distance'] = max(zone['max_distance'], dist[node])
+
+    return {
+        'depots': depots,
+        'nodes': nodes,
+        'depot': [index[nearest[node]] for node in nodes],
+        'distance': [dist[node] for node in nodes],
+        'predecessor': [parent[node] for node in nodes],
+        'unreachable': sorted(node for node in graph_adj if node not in dist),
+        'zones': zones
+    }
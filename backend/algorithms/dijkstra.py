@@ -1,4 +1,7 @@
-def dijkstra(graph_adj, source, destination):
+import heapq
+
+
+def dijkstra(graph_adj, source, destination, stats=None):
     """
     Algorithme de Dijkstra avec support des contraintes
     
@@ -6,6 +9,7 @@ def dijkstra(graph_adj, source, destination):
         graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
         source: Nœud de départ
         destination: Nœud d'arrivée
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
     
     Returns:
         tuple: (chemin, distance) ou (None, inf) si impossible
@@ -21,6 +25,8 @@ def dijkstra(graph_adj, source, destination):
     dist[source] = 0
     parent = {node: None for node in graph_adj}
     unvisited = set(graph_adj.keys())
+    nodes_settled = 0
+    edges_relaxed = 0
 
     while unvisited:
         # Trouver le nœud non visité le plus proche
@@ -34,9 +40,11 @@ def dijkstra(graph_adj, source, destination):
             break
         
         unvisited.remove(current)
+        nodes_settled += 1
 
         # Explorer les voisins
         for neighbor, weight, constraint in graph_adj[current]:
+            edges_relaxed += 1
             # Coût total = poids de base + contrainte
             total_cost = weight + constraint
             new_dist = dist[current] + total_cost
@@ -45,6 +53,10 @@ def dijkstra(graph_adj, source, destination):
                 dist[neighbor] = new_dist
                 parent[neighbor] = current
 
+    if stats is not None:
+        stats['nodes_settled'] = nodes_settled
+        stats['edges_relaxed'] = edges_relaxed
+
     # Vérifier si destination atteignable
     if dist[destination] == float('inf'):
         return None, float('inf')
@@ -57,4 +69,233 @@ def dijkstra(graph_adj, source, destination):
         current = parent[current]
     path.reverse()
     
-    return path, dist[destination]
\ No newline at end of file
+    return path, dist[destination]
+
+
+def dijkstra_all(graph_adj, source, stats=None):
+    """
+    Dijkstra depuis une source vers TOUS les nœuds (file de priorité)
+    
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        source: Nœud de départ
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+    
+    Returns:
+        tuple: (dist, parent) - dist {node: distance} pour les nœuds atteints,
+               parent {node: prédécesseur} (None pour la source)
+    """
+    if source not in graph_adj:
+        raise ValueError(f"Le nœud source '{source}' n'existe pas !")
+    
+    dist = {source: 0}
+    parent = {source: None}
+    visited = set()
+    heap = [(0, 0, source)]
+    counter = 1  # Départage des égalités sans comparer les nœuds
+    edges_relaxed = 0
+    
+    while heap:
+        d, _, current = heapq.heappop(heap)
+        if current in visited:
+            continue
+        visited.add(current)
+        
+        for neighbor, weight, constraint in graph_adj[current]:
+            edges_relaxed += 1
+            new_dist = d + weight + constraint
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                heapq.heappush(heap, (new_dist, counter, neighbor))
+                counter += 1
+    
+    if stats is not None:
+        stats['nodes_settled'] = len(visited)
+        stats['edges_relaxed'] = edges_relaxed
+    
+    return dist, parent
+
+
+def multi_source_dijkstra(graph_adj, sources, stats=None):
+    """
+    Dijkstra multi-sources : chaque nœud reçoit sa source la plus proche
+
+    Toutes les sources partent à distance 0 dans la même file de priorité ;
+    un seul parcours suffit au lieu d'un Dijkstra par source.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        sources: Nœuds de départ (ex: les dépôts)
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+
+    Returns:
+        tuple: (dist, nearest, parent) pour les nœuds atteints -
+               dist {node: distance}, nearest {node: source la plus proche},
+               parent {node: prédécesseur} (None pour une source)
+    """
+    dist = {}
+    nearest = {}
+    parent = {}
+    heap = []
+    for counter, source in enumerate(sources):
+        if source not in graph_adj:
+            raise ValueError(f"Le nœud source '{source}' n'existe pas !")
+        if source not in dist:
+            dist[source] = 0
+            nearest[source] = source
+            parent[source] = None
+            heap.append((0, counter, source))
+    heapq.heapify(heap)
+    counter = len(heap)
+
+    visited = set()
+    edges_relaxed = 0
+
+    while heap:
+        d, _, current = heapq.heappop(heap)
+        if current in visited:
+            continue
+        visited.add(current)
+
+        for neighbor, weight, constraint in graph_adj[current]:
+            edges_relaxed += 1
+            new_dist = d + weight + constraint
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                nearest[neighbor] = nearest[current]
+                parent[neighbor] = current
+                heapq.heappush(heap, (new_dist, counter, neighbor))
+                counter += 1
+
+    if stats is not None:
+        stats['nodes_settled'] = len(visited)
+        stats['edges_relaxed'] = edges_relaxed
+
+    return dist, nearest, parent
+
+
+def dijkstra_targets(graph_adj, source, targets, counters):
+    """
+    Dijkstra depuis source, arrêté dès que toutes les cibles sont fixées
+
+    Args:
+        counters: dict {'nodes_settled', 'edges_relaxed'} incrémenté (cumul sur plusieurs appels)
+
+    Returns:
+        tuple: (dist, parent) pour les nœuds atteints
+    """
+    dist = {source: 0}
+    parent = {source: None}
+    remaining = set(targets)
+    remaining.discard(source)
+    visited = set()
+    heap = [(0, 0, source)]
+    counter = 1
+
+    while heap and remaining:
+        d, _, current = heapq.heappop(heap)
+        if current in visited:
+            continue
+        visited.add(current)
+        remaining.discard(current)
+
+        for neighbor, weight, constraint in graph_adj[current]:
+            counters['edges_relaxed'] += 1
+            new_dist = d + weight + constraint
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                heapq.heappush(heap, (new_dist, counter, neighbor))
+                counter += 1
+
+    counters['nodes_settled'] += len(visited)
+    return dist, parent
+
+
+def bounded_dijkstra(graph_adj, source, budget, with_frontier=False, stats=None):
+    """
+    Nœuds atteignables depuis source pour un coût au plus égal à budget (isochrone)
+
+    Un nœud n'entre dans la file que si sa distance reste dans le budget :
+    le parcours s'arrête de lui-même au bord de la zone, son coût suit la
+    taille de la zone atteinte et non celle du graphe.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        source: Nœud de départ
+        budget: Coût maximum
+        with_frontier: Ajouter les arêtes qui sortent de la zone
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+
+    Returns:
+        dict: {
+            'nodes': [nœuds atteints, du plus proche au plus lointain],
+            'distance': [coût depuis source], 'predecessor': [nœud précédent],
+            'frontier': [{'source', 'target', 'cost', 'remaining'}] si with_frontier
+                        (remaining = budget restant en entrant sur l'arête)
+        }
+    """
+    if source not in graph_adj:
+        raise ValueError(f"Le nœud source '{source}' n'existe pas !")
+    if budget < 0:
+        raise ValueError("Le budget doit être positif")
+
+    dist = {source: 0}
+    parent = {source: None}
+    order = []
+    crossing = []
+    heap = [(0, 0, source)]
+    counter = 1
+    edges_relaxed = 0
+
+    while heap:
+        d, _, current = heapq.heappop(heap)
+        if d > dist[current]:
+            continue
+        order.append(current)
+
+        for neighbor, weight, constraint in graph_adj[current]:
+            edges_relaxed += 1
+            new_dist = d + weight + constraint
+            if new_dist > budget:
+                if with_frontier:
+                    crossing.append((current, neighbor, weight + constraint))
+                continue
+            if new_dist < dist.get(neighbor, float('inf')):
+                dist[neighbor] = new_dist
+                parent[neighbor] = current
+                heapq.heappush(heap, (new_dist, counter, neighbor))
+                counter += 1
+
+    if stats is not None:
+        stats['nodes_settled'] = len(order)
+        stats['edges_relaxed'] = edges_relaxed
+
+    result = {
+        'nodes': order,
+        'distance': [dist[node] for node in order],
+        'predecessor': [parent[node] for node in order]
+    }
+    if with_frontier:
+        # Seules les arêtes vers un nœud hors zone bornent réellement la zone
+        result['frontier'] = [
+            {'source': a, 'target': b, 'cost': cost, 'remaining': budget - dist[a]}
+            for a, b, cost in crossing if b not in dist
+        ]
+    return result
+
+
+def build_path(parent, destination):
+    """Reconstruire le chemin source → destination depuis l'arbre des parents"""
+    if destination not in parent:
+        return None
+    
+    path = []
+    current = destination
+    while current is not None:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    
+    return path
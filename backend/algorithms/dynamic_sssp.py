@@ -0,0 +1,357 @@
+import collections
+import heapq
+import threading
+
+from .dijkstra import dijkstra_all, build_path
+
+
+class ShortestPathTree:
+    """
+    Arbre des plus courts chemins d'une source, réparable arête par arête
+
+    - Baisse du coût de (a, b) : si elle raccourcit d(b), propagation à la
+      Dijkstra depuis b, limitée aux nœuds qui s'en trouvent rapprochés.
+    - Hausse du coût de (a, b) : rien si (a, b) n'est pas une arête de
+      l'arbre ; sinon seul le sous-arbre de b est recalculé, à partir de ses
+      meilleurs raccordements au reste de l'arbre.
+
+    Le coût d'une réparation suit la partie de l'arbre réellement touchée.
+    """
+
+    def __init__(self, source, dist, parent):
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+        self.children = collections.defaultdict(set)
+        for node, previous in parent.items():
+            if previous is not None:
+                self.children[previous].add(node)
+
+    @classmethod
+    def build(cls, graph_adj, source, stats=None):
+        dist, parent = dijkstra_all(graph_adj, source, stats)
+        return cls(source, dist, parent)
+
+    def path_to(self, destination):
+        """
+        Returns:
+            tuple: (chemin, distance) ou (None, inf) si destination n'est pas atteinte
+        """
+        if destination not in self.dist:
+            return None, float('inf')
+        return build_path(self.parent, destination), self.dist[destination]
+
+    # =====================
+    # RÉPARATIONS
+    # =====================
+
+    def decrease(self, graph_adj, a, b, cost):
+        """
+        Le coût de a -> b a baissé (déjà appliqué à graph_adj)
+
+        Returns:
+            int: Nombre de nœuds dont la distance a changé
+        """
+        if a not in self.dist:
+            return 0
+        new_dist = self.dist[a] + cost
+        if new_dist >= self.dist.get(b, float('inf')):
+            return 0
+
+        self._attach(b, a, new_dist)
+        heap = [(new_dist, 0, b)]
+        counter = 1
+        changed = 0
+        while heap:
+            d, _, current = heapq.heappop(heap)
+            if d > self.dist[current]:
+                continue
+            changed += 1
+            for neighbor, weight, constraint in graph_adj[current]:
+                candidate = d + weight + constraint
+                if candidate < self.dist.get(neighbor, float('inf')):
+                    self._attach(neighbor, current, candidate)
+                    heapq.heappush(heap, (candidate, counter, neighbor))
+                    counter += 1
+        return changed
+
+    def increase(self, graph_adj, reverse_adj, a, b):
+        """
+        Le coût de a -> b a augmenté ou l'arête a disparu (déjà appliqué à graph_adj)
+
+        Args:
+            reverse_adj: dict {node: {prédécesseurs}} (arêtes entrantes)
+
+        Returns:
+            int: Nombre de nœuds recalculés (taille du sous-arbre touché)
+        """
+        if self.parent.get(b) != a:
+            return 0
+
+        # Sous-arbre de b : ses distances ne sont plus garanties
+        subtree = []
+        stack = [b]
+        while stack:
+            node = stack.pop()
+            subtree.append(node)
+            stack.extend(self.children.get(node, ()))
+        affected = set(subtree)
+        for node in subtree:
+            self._detach(node)
+            del self.dist[node]
+
+        # Meilleur raccordement de chaque nœud au reste de l'arbre
+        heap = []
+        counter = 0
+        for node in subtree:
+            best, via = float('inf'), None
+            for previous in reverse_adj.get(node, ()):
+                if previous in affected or previous not in self.dist:
+                    continue
+                for neighbor, weight, constraint in graph_adj[previous]:
+                    if neighbor == node and self.dist[previous] + weight + constraint < best:
+                        best, via = self.dist[previous] + weight + constraint, previous
+            if via is not None:
+                self.dist[node] = best
+                self._set_parent(node, via)
+                heap.append((best, counter, node))
+                counter += 1
+        heapq.heapify(heap)
+
+        # Dijkstra limité au sous-arbre (le reste de l'arbre est déjà optimal)
+        while heap:
+            d, _, current = heapq.heappop(heap)
+            if d > self.dist[current]:
+                continue
+            for neighbor, weight, constraint in graph_adj[current]:
+                if neighbor not in affected:
+                    continue
+                candidate = d + weight + constraint
+                if candidate < self.dist.get(neighbor, float('inf')):
+                    self._attach(neighbor, current, candidate)
+                    heapq.heappush(heap, (candidate, counter, neighbor))
+                    counter += 1
+
+        # Nœuds qui ne sont plus atteignables
+        for node in subtree:
+            if node not in self.dist:
+                self.parent.pop(node, None)
+        return len(subtree)
+
+    def _attach(self, node, previous, distance):
+        self.dist[node] = distance
+        self._set_parent(node, previous)
+
+    def _set_parent(self, node, previous):
+        self._detach(node)
+        self.parent[node] = previous
+        self.children[previous].add(node)
+
+    def _detach(self, node):
+        previous = self.parent.get(node)
+        if previous is not None:
+            self.children[previous].discard(node)
+        self.parent[node] = None
+
+
+class ShortestPathTrees:
+    """
+    Arbres des plus courts chemins des sources fréquentes (dépôts), tenus à jour
+
+    Garde sa propre liste d'adjacence (contraintes actives comprises) ; un
+    changement de coût d'une arête (contrainte créée, activée, désactivée ou
+    expirée, poids modifié, arête ajoutée ou supprimée) est appliqué à la
+    liste puis réparé dans chaque arbre. Les modifications de nœuds
+    invalident le tout (reconstruction paresseuse, comme ComponentIndex).
+
+    Une source n'a un arbre qu'à partir de sa min_hits-ième requête : les
+    trajets ponctuels restent servis par un Dijkstra arrêté à destination.
+
+    Args:
+        max_trees: Nombre maximum d'arbres (les moins récemment utilisés sont retirés)
+        min_hits: Nombre de requêtes d'une source avant de lui construire un arbre
+    """
+
+    def __init__(self, max_trees=16, min_hits=2):
+        self.max_trees = max_trees
+        self.min_hits = min_hits
+        self._adj = {}
+        self._reverse = {}
+        self._constraint_edges = {}  # {id de contrainte: (source, target)}
+        self._trees = collections.OrderedDict()
+        self._hits = collections.OrderedDict()
+        self._valid = False
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.repaired_nodes = 0
+
+    # =====================
+    # ÉTAT
+    # =====================
+
+    @property
+    def valid(self):
+        return self._valid
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._valid = False
+            self._trees.clear()
+
+    def rebuild(self, load_adjacency, load_constraints):
+        """
+        Recharger la liste d'adjacence (les arbres repartent de zéro)
+
+        Args:
+            load_adjacency: Fonction retournant {node: [(voisin, poids, contrainte), ...]}
+            load_constraints: Fonction retournant les contraintes [{'id', 'source', 'target', ...}]
+        """
+        with self._lock:
+            generation = self._generation
+
+        adj = {node: list(neighbors) for node, neighbors in load_adjacency().items()}
+        reverse = {node: set() for node in adj}
+        for node, neighbors in adj.items():
+            for neighbor, _, _ in neighbors:
+                reverse.setdefault(neighbor, set()).add(node)
+        constraint_edges = {row['id']: (row['source'], row['target']) for row in load_constraints()}
+
+        with self._lock:
+            self.rebuilds += 1
+            if self._generation != generation:
+                return False
+            self._adj = adj
+            self._reverse = reverse
+            self._constraint_edges = constraint_edges
+            self._trees.clear()
+            self._valid = True
+            return True
+
+    def wants_tree(self, source):
+        """Compter une requête depuis source ; True si elle mérite un arbre"""
+        with self._lock:
+            if source in self._trees:
+                return True
+            hits = self._hits.pop(source, 0) + 1
+            self._hits[source] = hits
+            while len(self._hits) > self.max_trees * 16:
+                self._hits.popitem(last=False)
+            return hits >= self.min_hits
+
+    def tree(self, source, stats=None):
+        """Arbre de source (construit s'il manque) ; None si l'index est invalide ou la source inconnue"""
+        with self._lock:
+            if not self._valid or source not in self._adj:
+                return None
+            tree = self._trees.get(source)
+            if tree is None:
+                tree = ShortestPathTree.build(self._adj, source, stats)
+                self._trees[source] = tree
+                while len(self._trees) > self.max_trees:
+                    self._trees.popitem(last=False)
+            self._trees.move_to_end(source)
+            return tree
+
+    def path(self, source, destination):
+        """(chemin, distance) lus dans l'arbre de source, sous verrou (pas de réparation en cours)"""
+        with self._lock:
+            tree = self._trees.get(source)
+            if tree is None or not self._valid or destination not in self._adj:
+                return None
+            return tree.path_to(destination)
+
+    def sources(self):
+        with self._lock:
+            return list(self._trees)
+
+    # =====================
+    # MISES À JOUR
+    # =====================
+
+    def constraint_edge(self, constraint_id):
+        with self._lock:
+            return self._constraint_edges.get(constraint_id)
+
+    def add_constraint(self, constraint_id, source, target):
+        with self._lock:
+            self._constraint_edges[constraint_id] = (source, target)
+
+    def add_node(self, node):
+        with self._lock:
+            self._generation += 1
+            if self._valid:
+                self._adj.setdefault(node, [])
+                self._reverse.setdefault(node, set())
+
+    def set_edge(self, source, target, cost):
+        """
+        Nouveau coût (poids + contraintes) de l'arête dans les deux sens ; None = arête supprimée
+
+        Args:
+            cost: (poids, contrainte) ou None
+        """
+        with self._lock:
+            self._generation += 1
+            if not self._valid:
+                return
+            if source not in self._adj or target not in self._adj:
+                self._valid = False
+                self._trees.clear()
+                return
+            for a, b in ((source, target), (target, source)):
+                self._set_direction(a, b, cost)
+
+    def set_constraint(self, source, target, constraint):
+        """Nouvelle somme des contraintes valides de l'arête (poids inchangé)"""
+        with self._lock:
+            self._generation += 1
+            if not self._valid:
+                return
+            weight = next((w for neighbor, w, _ in self._adj.get(source, ()) if neighbor == target), None)
+            if weight is None:
+                return  # Contrainte sur une arête absente : aucun coût ne change
+            for a, b in ((source, target), (target, source)):
+                self._set_direction(a, b, (weight, constraint))
+
+    def _set_direction(self, a, b, cost):
+        neighbors = self._adj[a]
+        old = None
+        for i, (neighbor, weight, constraint) in enumerate(neighbors):
+            if neighbor == b:
+                old = weight + constraint
+                if cost is None:
+                    del neighbors[i]
+                else:
+                    neighbors[i] = (b, cost[0], cost[1])
+                break
+        else:
+            if cost is not None:
+                neighbors.append((b, cost[0], cost[1]))
+
+        if cost is None:
+            self._reverse.get(b, set()).discard(a)
+        else:
+            self._reverse.setdefault(b, set()).add(a)
+
+        new = None if cost is None else cost[0] + cost[1]
+        if old == new:
+            return
+        for tree in self._trees.values():
+            if new is not None and (old is None or new < old):
+                self.repaired_nodes += tree.decrease(self._adj, a, b, new)
+            else:
+                self.repaired_nodes += tree.increase(self._adj, self._reverse, a, b)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'valid': self._valid,
+                'trees': len(self._trees),
+                'sources': list(self._trees),
+                'max_trees': self.max_trees,
+                'min_hits': self.min_hits,
+                'rebuilds': self.rebuilds,
+                'repaired_nodes': self.repaired_nodes
+            }
@@ -0,0 +1,573 @@
+import atexit
+import collections
+import itertools
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from multiprocessing.connection import wait
+
+from .dijkstra import dijkstra, bounded_dijkstra
+from .coloring import graph_coloring
+from .depots import nearest_depot_partition
+from .partition import partition_graph
+from .tours import plan_tours
+from .betweenness import edge_betweenness
+from .scenarios import evaluate_scenarios
+from .time_slots import apply_profile
+
+
+class AlgorithmTimeout(Exception):
+    """Le calcul a dépassé son délai (il a été interrompu)"""
+
+
+class AlgorithmCancelled(Exception):
+    """Le calcul a été annulé avant la fin"""
+
+
+# =====================
+# CÔTÉ WORKER (processus)
+# =====================
+
+# Graphe du worker : snapshot mappé, rechargé quand la version change
+_graph = None
+_graph_version = None
+_base_adjacency = None
+_base_trees = {}  # Arbres des plus courts chemins de base par source (scénarios)
+_slot_adjacency = {}  # Listes d'adjacence par profil de créneau horaire
+
+
+def _load_graph(version, path):
+    global _graph, _graph_version, _base_adjacency
+    if version != _graph_version:
+        from backend.models import GraphSnapshot
+        _graph = GraphSnapshot.open(path)
+        _graph_version = version
+        _base_adjacency = None
+        _base_trees.clear()
+        _slot_adjacency.clear()
+
+
+def _adjacency(custom_constraints=None):
+    """Liste d'adjacence ; celle sans contraintes custom est gardée pour la version"""
+    global _base_adjacency
+    if custom_constraints:
+        return _graph.get_adjacency_list(custom_constraints)
+    if _base_adjacency is None:
+        _base_adjacency = _graph.get_adjacency_list()
+    return _base_adjacency
+
+
+def _profile_adjacency(custom_constraints, profile):
+    """
+    Liste d'adjacence avec les surcoûts d'un créneau horaire
+
+    Args:
+        profile: (clé, {(a, b): surcoût}) ; la liste sans contraintes custom
+                 est gardée par clé pour la version
+    """
+    if profile is None:
+        return _adjacency(custom_constraints)
+    key, extras = profile
+    if custom_constraints:
+        return apply_profile(_adjacency(custom_constraints), extras)
+    adj_list = _slot_adjacency.get(key)
+    if adj_list is None:
+        if len(_slot_adjacency) > 32:
+            _slot_adjacency.clear()
+        adj_list = _slot_adjacency[key] = apply_profile(_adjacency(), extras)
+    return adj_list
+
+
+def _task_dijkstra(source, destination, custom_constraints, profile=None):
+    stats = {}
+    start = time.perf_counter()
+    path, distance = dijkstra(_profile_adjacency(custom_constraints, profile), source, destination, stats)
+    return {'path': path, 'distance': distance, 'stats': stats,
+            'duration': time.perf_counter() - start}
+
+
+def _task_coloring():
+    adj_list = _adjacency()
+    start = time.perf_counter()
+    coloring = graph_coloring(adj_list)
+    return {
+        'coloring': coloring,
+        'duration': time.perf_counter() - start,
+        'stats': {
+            'nodes_settled': len(coloring),
+            'edges_relaxed': sum(len(neighbors) for neighbors in adj_list.values())
+        }
+    }
+
+
+def _task_nearest_depot(depots, custom_constraints):
+    stats = {}
+    start = time.perf_counter()
+    partition = nearest_depot_partition(_adjacency(custom_constraints), depots, stats)
+    return {'partition': partition, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+def _task_reachable(source, budget, custom_constraints, with_frontier):
+    stats = {}
+    start = time.perf_counter()
+    reach = bounded_dijkstra(_adjacency(custom_constraints), source, budget, with_frontier, stats)
+    return {'reach': reach, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+def _task_partition(k, tolerance):
+    stats = {}
+    start = time.perf_counter()
+    partition = partition_graph(_adjacency(), k, _graph.get_capacities(), tolerance, stats=stats)
+    return {'partition': partition, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+def _task_tours(depot, points, vehicle_capacity, method, time_budget, custom_constraints, with_paths):
+    capacities = _graph.get_capacities()
+    if points is None:
+        points = [node for node, capacity in capacities.items() if capacity > 0 and node != depot]
+    stats = {}
+    start = time.perf_counter()
+    tours = plan_tours(_adjacency(custom_constraints), depot, points, capacities, vehicle_capacity,
+                       method, time_budget, with_paths, stats)
+    return {'tours': tours, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+def _task_betweenness(sources, custom_constraints):
+    stats = {}
+    start = time.perf_counter()
+    scores = edge_betweenness(_adjacency(custom_constraints), sources, stats)
+    return {'scores': scores, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+def _task_scenarios(pairs, scenarios, with_paths):
+    stats = {}
+    start = time.perf_counter()
+    if len(_base_trees) > 64:
+        _base_trees.clear()
+    comparison = evaluate_scenarios(_adjacency(), pairs, scenarios, with_paths, _base_trees, stats)
+    return {'comparison': comparison, 'stats': stats, 'duration': time.perf_counter() - start}
+
+
+# Calculs exécutables par les workers (nom -> fonction(*args))
+TASKS = {
+    'dijkstra': _task_dijkstra,
+    'coloring': _task_coloring,
+    'nearest_depot': _task_nearest_depot,
+    'reachable': _task_reachable,
+    'partition': _task_partition,
+    'tours': _task_tours,
+    'betweenness': _task_betweenness,
+    'scenarios': _task_scenarios,
+}
+
+
+def _worker_main(conn):
+    """Boucle d'un worker : (id, version, chemin, nom, args) -> (id, (ok, résultat))"""
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        task_id, version, path, name, args = message
+        try:
+            _load_graph(version, path)
+            reply = (True, TASKS[name](*args))
+        except Exception as e:
+            reply = (False, e)
+
+        try:
+            conn.send((task_id, reply))
+        except Exception as e:
+            # Résultat ou exception non sérialisable : on renvoie le message
+            conn.send((task_id, (False, Exception(f"Résultat non transmissible: {e}"))))
+
+
+# =====================
+# CÔTÉ SERVEUR
+# =====================
+
+class _Task:
+    __slots__ = ('id', 'name', 'args', 'submitted_at', 'done', 'ok', 'result')
+
+    def __init__(self, task_id, name, args):
+        self.id = task_id
+        self.name = name
+        self.args = args
+        self.submitted_at = time.perf_counter()
+        self.done = threading.Event()
+        self.ok = None
+        self.result = None
+
+    def finish(self, ok, result):
+        if not self.done.is_set():
+            self.ok = ok
+            self.result = result
+            self.done.set()
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'task')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.task = None
+
+
+class AlgorithmExecutor:
+    """
+    Exécute les algorithmes dans un pool de processus, hors du thread de la requête
+
+    Chaque worker mappe un snapshot binaire du graphe ; quand la version du
+    graphe change, un nouveau snapshot est écrit et les workers le rechargent
+    à leur prochain calcul. Un calcul qui dépasse son délai ou qui est annulé
+    en cours d'exécution termine son worker, aussitôt remplacé.
+
+    Args:
+        workers: Nombre de processus
+        default_timeout: Délai par défaut d'un calcul (s)
+    """
+
+    def __init__(self, workers=2, default_timeout=30.0):
+        from backend.monitoring.metrics import (
+            EXECUTOR_QUEUE_DEPTH, EXECUTOR_BUSY, EXECUTOR_TASKS, EXECUTOR_WAIT
+        )
+        self._queue_gauge = EXECUTOR_QUEUE_DEPTH
+        self._busy_gauge = EXECUTOR_BUSY
+        self._task_counter = EXECUTOR_TASKS
+        self._wait_histogram = EXECUTOR_WAIT
+
+        self.size = max(1, workers)
+        self.default_timeout = default_timeout
+
+        self._context = multiprocessing.get_context('spawn')
+        self._lock = threading.Lock()
+        self._graph_lock = threading.Lock()
+        self._pending = collections.deque()
+        self._tasks = {}
+        self._workers = []
+        self._retired = []
+        self._ids = itertools.count(1)
+
+        self._version = None
+        self._path = None
+        self._path_owned = False
+        self._old_paths = []
+        self._dir = None
+
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._collector = None
+        self._closed = False
+
+    # =====================
+    # GRAPHE
+    # =====================
+
+    def ensure_graph(self, version, source):
+        """
+        Préparer le graphe de la version pour les workers (si elle a changé)
+
+        Args:
+            version: Clé de version (chaîne ou entier)
+            source: Fonction retournant un Graph, ou le chemin d'un snapshot existant
+        """
+        if version == self._version:
+            return
+        with self._graph_lock:
+            if version == self._version:
+                return
+
+            graph = source()
+            if isinstance(graph, str):
+                path, owned = graph, False
+            else:
+                from backend.models import GraphSnapshot
+                if self._dir is None:
+                    self._dir = tempfile.mkdtemp(prefix='wastegraph-executor-')
+                    atexit.register(shutil.rmtree, self._dir, True)
+                path, owned = os.path.join(self._dir, f'graph-{next(self._ids)}.snapshot'), True
+                GraphSnapshot.from_graph(graph).write(path)
+
+            with self._lock:
+                previous = (self._path, self._path_owned) if self._path else None
+                self._version, self._path, self._path_owned = version, path, owned
+
+            # Le snapshot précédent peut encore être demandé par un message en vol :
+            # on ne supprime que ceux d'avant (un worker garde son mmap après unlink)
+            if previous and previous[1]:
+                self._old_paths.append(previous[0])
+            while len(self._old_paths) > 1:
+                try:
+                    os.unlink(self._old_paths.pop(0))
+                except OSError:
+                    pass
+
+    # =====================
+    # CALCULS
+    # =====================
+
+    def run(self, name, args=(), timeout=None, task_id=None):
+        """
+        Exécuter un calcul et attendre son résultat
+
+        Args:
+            name: Nom du calcul (TASKS)
+            args: Arguments (sérialisables)
+            timeout: Délai en secondes (défaut : default_timeout)
+            task_id: Identifiant choisi par le client (pour cancel)
+
+        Raises:
+            AlgorithmTimeout, AlgorithmCancelled, ou l'exception du calcul
+        """
+        task = self.submit(name, args, task_id)
+        timeout = self.default_timeout if timeout is None else timeout
+
+        if not task.done.wait(timeout):
+            self.cancel(task.id, AlgorithmTimeout(
+                f"Calcul '{name}' interrompu après {timeout:g} s"))
+            task.done.wait()
+
+        if task.ok:
+            return task.result
+        raise task.result
+
+    def run_many(self, name, args_list, timeout=None, task_id=None):
+        """
+        Exécuter plusieurs calculs en parallèle (un lot par worker) et attendre tous les résultats
+
+        Le délai porte sur l'ensemble ; au premier échec (ou au délai) les
+        calculs restants sont annulés. Avec task_id, les calculs s'appellent
+        '<task_id>/<i>' et cancel(task_id) les annule tous.
+
+        Returns:
+            list: Résultats dans l'ordre de args_list
+        """
+        tasks = []
+        try:
+            for i, args in enumerate(args_list):
+                tasks.append(self.submit(name, args, f"{task_id}/{i}" if task_id is not None else None))
+        except Exception:
+            for task in tasks:
+                self.cancel(task.id)
+            raise
+
+        timeout = self.default_timeout if timeout is None else timeout
+        deadline = time.perf_counter() + timeout
+        for task in tasks:
+            if not task.done.wait(max(0, deadline - time.perf_counter())):
+                for other in tasks:
+                    self.cancel(other.id, AlgorithmTimeout(
+                        f"Calcul '{name}' interrompu après {timeout:g} s"))
+                task.done.wait()
+            if not task.ok:
+                for other in tasks:
+                    self.cancel(other.id)
+                raise task.result
+        return [task.result for task in tasks]
+
+    def submit(self, name, args=(), task_id=None):
+        """Mettre un calcul en file (retourne la tâche, attendre task.done)"""
+        if name not in TASKS:
+            raise ValueError(f"Calcul inconnu: {name}")
+        if self._path is None:
+            raise RuntimeError("Aucun graphe préparé (appeler ensure_graph)")
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Exécuteur arrêté")
+            task_id = str(task_id) if task_id is not None else f"t{next(self._ids)}"
+            if task_id in self._tasks:
+                raise ValueError(f"Tâche déjà en cours: {task_id}")
+
+            task = _Task(task_id, name, tuple(args))
+            self._tasks[task_id] = task
+            self._pending.append(task)
+            self._start_locked()
+            self._dispatch_locked()
+        return task
+
+    def cancel(self, task_id, reason=None):
+        """
+        Annuler un calcul en file ou en cours
+
+        Returns:
+            bool: False si la tâche est inconnue (ou déjà terminée)
+        """
+        reason = reason or AlgorithmCancelled(f"Calcul {task_id} annulé")
+        with self._lock:
+            task = self._tasks.get(str(task_id))
+            if task is not None:
+                tasks = [task]
+            else:
+                # Calcul découpé par run_many : annuler tous ses lots
+                tasks = [t for t in self._tasks.values() if t.id.startswith(f"{task_id}/")]
+            if not tasks:
+                return False
+
+            for task in tasks:
+                if task in self._pending:
+                    self._pending.remove(task)
+                else:
+                    for worker in self._workers:
+                        if worker.task is task:
+                            # Impossible d'interrompre un calcul Python : on arrête le processus
+                            self._retire_locked(worker)
+                            self._workers.append(self._spawn_locked())
+                            break
+
+                self._finish_locked(task, False, reason)
+            self._dispatch_locked()
+        self._wake()
+        return True
+
+    def status(self):
+        """File d'attente, workers occupés et version du graphe chargée"""
+        with self._lock:
+            return {
+                'workers': self.size,
+                'started': len(self._workers),
+                'busy': sum(1 for worker in self._workers if worker.task is not None),
+                'queue_depth': len(self._pending),
+                'running': [worker.task.id for worker in self._workers if worker.task is not None],
+                'graph_version': self._version,
+                'default_timeout_s': self.default_timeout
+            }
+
+    def shutdown(self):
+        """Arrêter les workers et supprimer les snapshots temporaires"""
+        with self._lock:
+            self._closed = True
+            for task in list(self._pending):
+                self._finish_locked(task, False, AlgorithmCancelled("Exécuteur arrêté"))
+            self._pending.clear()
+            for worker in list(self._workers):
+                if worker.task is not None:
+                    self._finish_locked(worker.task, False, AlgorithmCancelled("Exécuteur arrêté"))
+                self._retire_locked(worker)
+        self._wake()
+        if self._dir:
+            shutil.rmtree(self._dir, ignore_errors=True)
+
+    # =====================
+    # INTERNE (sous self._lock)
+    # =====================
+
+    def _start_locked(self):
+        while len(self._workers) < self.size:
+            self._workers.append(self._spawn_locked())
+        if self._collector is None:
+            self._collector = threading.Thread(target=self._collect, name='algo-executor', daemon=True)
+            self._collector.start()
+
+    def _spawn_locked(self):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _retire_locked(self, worker):
+        """Arrêter un worker ; sa connexion est fermée par le thread collecteur"""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.process.terminate()
+        worker.task = None
+        self._retired.append(worker)
+
+    def _dispatch_locked(self):
+        for worker in self._workers:
+            if not self._pending:
+                break
+            if worker.task is not None:
+                continue
+            task = self._pending.popleft()
+            worker.task = task
+            self._wait_histogram.observe(time.perf_counter() - task.submitted_at)
+            try:
+                worker.conn.send((task.id, self._version, self._path, task.name, task.args))
+            except (OSError, ValueError) as e:
+                self._finish_locked(task, False, Exception(f"Worker indisponible: {e}"))
+                worker.task = None
+        self._update_gauges_locked()
+
+    def _finish_locked(self, task, ok, result):
+        self._tasks.pop(task.id, None)
+        task.finish(ok, result)
+        if ok:
+            outcome = 'ok'
+        elif isinstance(result, AlgorithmTimeout):
+            outcome = 'timeout'
+        elif isinstance(result, AlgorithmCancelled):
+            outcome = 'cancelled'
+        else:
+            outcome = 'error'
+        self._task_counter.inc(task=task.name, result=outcome)
+        self._update_gauges_locked()
+
+    def _update_gauges_locked(self):
+        self._queue_gauge.set(len(self._pending))
+        self._busy_gauge.set(sum(1 for worker in self._workers if worker.task is not None))
+
+    # =====================
+    # THREAD COLLECTEUR
+    # =====================
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass
+
+    def _collect(self):
+        """Recevoir les résultats des workers et relancer la file"""
+        while True:
+            with self._lock:
+                if self._closed and not self._retired:
+                    return
+                retired = list(self._retired)
+                conns = [worker.conn for worker in self._workers + retired]
+
+            ready = wait(conns + [self._wake_r], timeout=1.0)
+            if self._wake_r in ready:
+                try:
+                    while self._wake_r.recv(4096):
+                        pass
+                except (BlockingIOError, OSError):
+                    pass
+
+            with self._lock:
+                for worker in retired:
+                    if worker.conn in ready or not worker.process.is_alive():
+                        worker.conn.close()
+                        worker.process.join(0)
+                        self._retired.remove(worker)
+
+                for worker in list(self._workers):
+                    if worker.conn not in ready:
+                        continue
+                    try:
+                        task_id, (ok, result) = worker.conn.recv()
+                    except (EOFError, OSError):
+                        # Worker mort (OOM, signal...) : sa tâche échoue, il est remplacé
+                        if worker.task is not None:
+                            self._finish_locked(worker.task, False,
+                                                Exception("Le worker de calcul s'est arrêté"))
+                        self._retire_locked(worker)
+                        if not self._closed:
+                            self._workers.append(self._spawn_locked())
+                        continue
+
+                    task = worker.task
+                    worker.task = None
+                    if task is not None and task.id == task_id:
+                        self._finish_locked(task, ok, result)
+
+                self._dispatch_locked()
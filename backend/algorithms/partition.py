@@ -0,0 +1,335 @@
+import heapq
+
+from .components import connected_components
+from .dijkstra import multi_source_dijkstra
+
+
+def partition_graph(graph_adj, k, capacities=None, tolerance=0.1, passes=4, stats=None):
+    """
+    Découper le graphe en k zones contiguës de capacité équilibrée
+
+    1. Graines : réparties entre les composantes selon leur charge (la plus
+       chargée par graine en reçoit une de plus), puis dans chaque composante
+       des nœuds éloignés les uns des autres (farthest-first, Dijkstra
+       multi-sources depuis les graines déjà choisies).
+    2. Croissance : la zone la moins chargée annexe le nœud de sa frontière
+       le plus proche de sa graine ; les zones restent contiguës et compactes.
+    3. Raffinement : des nœuds de bordure passent dans la zone voisine si la
+       coupe diminue (ou si leur zone dépasse la charge maximale), sans
+       dépasser la charge maximale ni déconnecter leur zone d'origine.
+
+    Les composantes sans graine sont données entières aux zones les moins
+    chargées (une zone n'est alors plus contiguë : voir 'contiguous').
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        k: Nombre de zones
+        capacities: dict {node: capacité} ; sans capacité, 1 par nœud
+        tolerance: Charge maximale d'une zone = moyenne * (1 + tolerance)
+        passes: Nombre maximum de passes de raffinement
+        stats: dict optionnel rempli avec 'nodes_settled', 'edges_relaxed' et 'moves'
+
+    Returns:
+        dict: {
+            'k', 'balance_by' ('capacity' ou 'nodes'),
+            'nodes': [nœuds triés], 'zone': [zone de chaque nœud],
+            'zones': [{'zone', 'seed', 'nodes', 'load', 'contiguous'}],
+            'cut_edges', 'cut_cost', 'imbalance' (charge max / charge moyenne)
+        }
+    """
+    if k < 1:
+        raise ValueError("Le nombre de zones doit être au moins 1")
+
+    # Ordre canonique : même découpage que le graphe vienne de la BDD ou du snapshot
+    graph_adj = {node: sorted(graph_adj[node]) for node in sorted(graph_adj)}
+    weights, balance_by = _node_weights(graph_adj, capacities)
+    k = min(k, len(graph_adj))
+    counters = {'nodes_settled': 0, 'edges_relaxed': 0, 'moves': 0}
+    if k == 0:
+        return _result(graph_adj, {}, [], [], 0, weights, balance_by, counters, stats)
+
+    components = connected_components(graph_adj)
+    seeds = []
+    for members, count in zip(components, _seed_counts(components, weights, k)):
+        if count:
+            seeds += _farthest_seeds(graph_adj, members, count, counters)
+    target = sum(weights.values()) / k
+
+    # Chaque zone grandit dans la composante de sa graine
+    zone_of, load = _grow(graph_adj, seeds, weights, counters)
+
+    # Composantes sans graine : entières, la plus grande d'abord, à la zone la moins chargée
+    for members in components:
+        if members[0] in zone_of:
+            continue
+        zone = min(range(k), key=lambda z: load[z])
+        for node in members:
+            zone_of[node] = zone
+            load[zone] += weights[node]
+
+    _refine(graph_adj, zone_of, load, weights, target * (1 + tolerance), passes, counters)
+
+    return _result(graph_adj, zone_of, seeds, load, target, weights, balance_by, counters, stats)
+
+
+def zone_adjacency(graph_adj, zone_nodes):
+    """
+    Liste d'adjacence réduite à une zone (arêtes internes seulement)
+
+    Chaque zone se route alors indépendamment des autres (en parallèle,
+    par exemple dans le pool de calcul).
+    """
+    members = set(zone_nodes)
+    return {
+        node: [edge for edge in graph_adj[node] if edge[0] in members]
+        for node in zone_nodes
+    }
+
+
+# =====================
+# ÉTAPES
+# =====================
+
+def _node_weights(graph_adj, capacities):
+    """Poids d'équilibrage : la capacité, ou 1 par nœud si aucune n'est renseignée"""
+    if capacities and any(capacities.get(node, 0) > 0 for node in graph_adj):
+        return {node: max(capacities.get(node, 0) or 0, 0) for node in graph_adj}, 'capacity'
+    return {node: 1 for node in graph_adj}, 'nodes'
+
+
+def _seed_counts(components, weights, k):
+    """
+    Nombre de graines par composante (plus forte moyenne, comme la règle de D'Hondt)
+
+    Chaque graine va à la composante dont la charge par zone serait la plus
+    forte ; à égalité, à une composante encore sans graine (elle reste entière).
+    Une composante ne reçoit pas plus de graines que de nœuds.
+    """
+    loads = [sum(weights[node] for node in members) for members in components]
+    counts = [0] * len(components)
+    for _ in range(k):
+        candidates = [i for i, members in enumerate(components) if counts[i] < len(members)]
+        best = max(candidates, key=lambda i: (loads[i] / (counts[i] + 1), counts[i] == 0, -i))
+        counts[best] += 1
+    return counts
+
+
+def _farthest_seeds(graph_adj, component, k, counters):
+    """
+    k graines dans une composante, chacune la plus loin des précédentes
+
+    Les distances aux graines sont mises à jour à chaque nouvelle graine par
+    un Dijkstra élagué : il ne visite que les nœuds qu'elle rapproche.
+    """
+    stats = {}
+    dist, _, _ = multi_source_dijkstra(graph_adj, [min(component)], stats)
+    _count(counters, stats)
+    seeds = [max(dist, key=lambda node: (dist[node], node))]
+    dist, _, _ = multi_source_dijkstra(graph_adj, seeds, stats)
+    _count(counters, stats)
+
+    while len(seeds) < k:
+        seed = max(dist, key=lambda node: (dist[node], node))
+        if seed in seeds:
+            # Nœuds restants tous à distance nulle des graines
+            seed = next(node for node in sorted(component) if node not in seeds)
+        seeds.append(seed)
+
+        dist[seed] = 0
+        heap = [(0, seed)]
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d > dist[current]:
+                continue
+            counters['nodes_settled'] += 1
+            for neighbor, weight, constraint in graph_adj[current]:
+                counters['edges_relaxed'] += 1
+                new_dist = d + weight + constraint
+                if new_dist < dist.get(neighbor, float('inf')):
+                    dist[neighbor] = new_dist
+                    heapq.heappush(heap, (new_dist, neighbor))
+
+    return seeds
+
+
+def _grow(graph_adj, seeds, weights, counters):
+    """Croissance simultanée : la zone la moins chargée avance toujours en premier"""
+    # Chaque graine appartient d'emblée à sa zone : aucune zone ne reste vide
+    zone_of = {seed: zone for zone, seed in enumerate(seeds)}
+    load = [weights[seed] for seed in seeds]
+    counters['nodes_settled'] += len(seeds)
+    # Égalités départagées par l'identifiant du nœud
+    frontiers = []
+    for seed in seeds:
+        frontier = []
+        for neighbor, weight, constraint in graph_adj[seed]:
+            counters['edges_relaxed'] += 1
+            if neighbor not in zone_of:
+                frontier.append((weight + constraint, neighbor))
+        heapq.heapify(frontier)
+        frontiers.append(frontier)
+    turns = [(load[zone], zone) for zone in range(len(seeds))]
+    heapq.heapify(turns)
+
+    while turns:
+        zone_load, zone = heapq.heappop(turns)
+        if zone_load != load[zone]:
+            continue
+        frontier = frontiers[zone]
+
+        while frontier and frontier[0][1] in zone_of:
+            heapq.heappop(frontier)
+        if not frontier:
+            continue  # Zone encerclée : elle ne grandit plus
+
+        d, node = heapq.heappop(frontier)
+        zone_of[node] = zone
+        load[zone] += weights[node]
+        counters['nodes_settled'] += 1
+
+        for neighbor, weight, constraint in graph_adj[node]:
+            counters['edges_relaxed'] += 1
+            if neighbor not in zone_of:
+                heapq.heappush(frontier, (d + weight + constraint, neighbor))
+        heapq.heappush(turns, (load[zone], zone))
+
+    return zone_of, load
+
+
+def _refine(graph_adj, zone_of, load, weights, max_load, passes, counters):
+    """Déplacements de nœuds de bordure (gain de coupe ou délestage d'une zone trop chargée)"""
+    sizes = [0] * len(load)
+    for zone in zone_of.values():
+        sizes[zone] += 1
+
+    for _ in range(passes):
+        moved = 0
+        for node, neighbors in graph_adj.items():
+            current = zone_of[node]
+            links = {}
+            for neighbor, weight, constraint in neighbors:
+                zone = zone_of[neighbor]
+                links[zone] = links.get(zone, 0) + weight + constraint
+            if sizes[current] == 1 or all(zone == current for zone in links):
+                continue
+
+            internal = links.get(current, 0)
+            w = weights[node]
+            overloaded = load[current] > max_load
+            best, best_gain = None, None
+            for zone, cost in links.items():
+                if zone == current:
+                    continue
+                gain = cost - internal
+                fits = load[zone] + w <= max_load
+                relieves = overloaded and load[zone] + w < load[current]
+                if not (fits and gain > 0) and not relieves:
+                    continue
+                if best is None or (gain, -zone) > (best_gain, -best):
+                    best, best_gain = zone, gain
+
+            if best is None or not _stays_connected(graph_adj, zone_of, node, current):
+                continue
+
+            zone_of[node] = best
+            load[current] -= w
+            load[best] += w
+            sizes[current] -= 1
+            sizes[best] += 1
+            moved += 1
+
+        counters['moves'] += moved
+        if not moved:
+            break
+
+
+def _stays_connected(graph_adj, zone_of, node, zone, limit=128):
+    """
+    La zone reste-t-elle connexe sans `node` ? (parcours borné)
+
+    Au-delà de `limit` arêtes examinées, la réponse est « non » : le
+    déplacement est simplement refusé.
+    """
+    targets = {neighbor for neighbor, _, _ in graph_adj[node]
+               if neighbor != node and zone_of[neighbor] == zone}
+    if len(targets) <= 1:
+        return True
+
+    start = min(targets)
+    seen = {start, node}
+    stack = [start]
+    remaining = len(targets) - 1
+    budget = limit
+    while stack:
+        for neighbor, _, _ in graph_adj[stack.pop()]:
+            budget -= 1
+            if budget == 0:
+                return False
+            if neighbor in seen or zone_of[neighbor] != zone:
+                continue
+            if neighbor in targets:
+                remaining -= 1
+                if remaining == 0:
+                    return True
+            seen.add(neighbor)
+            stack.append(neighbor)
+    return False
+
+
+def _is_contiguous(graph_adj, members):
+    members = set(members)
+    if not members:
+        return True
+    start = next(iter(members))
+    seen = {start}
+    stack = [start]
+    while stack:
+        for neighbor, _, _ in graph_adj[stack.pop()]:
+            if neighbor in members and neighbor not in seen:
+                seen.add(neighbor)
+                stack.append(neighbor)
+    return len(seen) == len(members)
+
+
+def _count(counters, stats):
+    counters['nodes_settled'] += stats.get('nodes_settled', 0)
+    counters['edges_relaxed'] += stats.get('edges_relaxed', 0)
+
+
+def _result(graph_adj, zone_of, seeds, load, target, weights, balance_by, counters, stats):
+    cut_edges = 0
+    cut_cost = 0
+    for node, neighbors in graph_adj.items():
+        for neighbor, weight, constraint in neighbors:
+            if zone_of[node] != zone_of[neighbor]:
+                cut_edges += 1
+                cut_cost += weight + constraint
+
+    members = [[] for _ in seeds]
+    for node, zone in zone_of.items():
+        members[zone].append(node)
+
+    if stats is not None:
+        stats.update(counters)
+
+    nodes = sorted(zone_of)
+    return {
+        'k': len(seeds),
+        'balance_by': balance_by,
+        'nodes': nodes,
+        'zone': [zone_of[node] for node in nodes],
+        'zones': [
+            {
+                'zone': zone,
+                'seed': seed,
+                'nodes': len(members[zone]),
+                'load': load[zone],
+                'contiguous': _is_contiguous(graph_adj, members[zone])
+            }
+            for zone, seed in enumerate(seeds)
+        ],
+        # Graphe non-orienté : chaque arête apparaît dans les deux sens
+        'cut_edges': cut_edges // 2,
+        'cut_cost': cut_cost / 2,
+        'imbalance': max(load) / target if load and target else 0
+    }
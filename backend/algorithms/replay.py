@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .dijkstra import dijkstra_all, build_path
+
+
+# Graphe partagé par les processus workers (chargé une fois par processus)
+_worker_graph = None
+
+EPSILON = 1e-9
+
+
+def _init_worker(graph):
+    """
+    Initialiser un worker avec le graphe courant
+
+    Args:
+        graph: Graph (copié dans le worker) ou chemin d'un snapshot binaire
+               (mappé : les workers partagent les mêmes pages mémoire)
+    """
+    global _worker_graph
+    if isinstance(graph, str):
+        from backend.models import GraphSnapshot
+        graph = GraphSnapshot.open(graph)
+    _worker_graph = graph
+
+
+def replay_group(task):
+    """
+    Rejouer tous les calculs d'une même source (et mêmes contraintes)
+
+    Un seul Dijkstra depuis la source répond à toutes les destinations.
+
+    Args:
+        task: (source, constraints, [(history_id, destination, old_path, old_distance), ...])
+
+    Returns:
+        list: diffs {history_id, source, destination, old/new distance et chemin, status}
+    """
+    source, constraints, entries = task
+    adj_list = _worker_graph.get_adjacency_list(constraints)
+
+    if source in adj_list:
+        dist, parent = dijkstra_all(adj_list, source)
+    else:
+        dist, parent = {}, {}
+
+    diffs = []
+    for history_id, destination, old_path, old_distance in entries:
+        new_distance = dist.get(destination, float('inf'))
+        new_path = build_path(parent, destination)
+
+        if new_path is None:
+            status = 'unreachable'
+        elif new_distance > old_distance + EPSILON:
+            status = 'longer'
+        elif new_distance < old_distance - EPSILON:
+            status = 'shorter'
+        elif new_path != old_path:
+            status = 'rerouted'
+        else:
+            status = 'unchanged'
+
+        diffs.append({
+            'history_id': history_id,
+            'source': source,
+            'destination': destination,
+            'old_distance': old_distance,
+            'new_distance': new_distance if new_path is not None else None,
+            'delta': new_distance - old_distance if new_path is not None else None,
+            'old_path': old_path,
+            'new_path': new_path,
+            'status': status
+        })
+
+    return diffs
+
+
+def replay_bulk(graph, tasks, workers=None):
+    """
+    Rejouer des groupes de calculs en parallèle (un groupe = une source)
+
+    Args:
+        graph: Graph chargé une seule fois, ou chemin d'un snapshot binaire
+        tasks: liste de tâches au format de replay_group()
+        workers: nombre de processus (None = nb de CPU, 1 = sans pool)
+
+    Yields:
+        dict: un diff par entrée d'historique, au fil de l'eau
+    """
+    workers = workers or os.cpu_count() or 1
+
+    if workers <= 1 or len(tasks) <= 1:
+        _init_worker(graph)
+        for task in tasks:
+            yield from replay_group(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)),
+                             initializer=_init_worker,
+                             initargs=(graph,)) as pool:
+        futures = [pool.submit(replay_group, task) for task in tasks]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+class ReplaySummary:
+    """Statistiques agrégées d'un replay en masse"""
+
+    def __init__(self, top=10):
+        self.top = top
+        self.counts = {'unchanged': 0, 'rerouted': 0, 'longer': 0, 'shorter': 0, 'unreachable': 0}
+        self.total = 0
+        self.total_delta = 0.0
+        self.regressions = []  # [(delta, history_id)]
+
+    def add(self, diff):
+        self.total += 1
+        self.counts[diff['status']] += 1
+        if diff['delta'] is not None:
+            self.total_delta += diff['delta']
+        if diff['status'] == 'longer':
+            self.regressions.append((diff['delta'], diff['history_id']))
+
+    def to_dict(self):
+        reachable = self.total - self.counts['unreachable']
+        worst = sorted(self.regressions, reverse=True)[:self.top]
+        return {
+            'total': self.total,
+            'counts': dict(self.counts),
+            'mean_delta': self.total_delta / reachable if reachable else 0,
+            'max_increase': worst[0][0] if worst else 0,
+            'worst_regressions': [{'history_id': h, 'delta': d} for d, h in worst]
+        }
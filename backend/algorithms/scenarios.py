@@ -0,0 +1,150 @@
+from .dijkstra import dijkstra_all, dijkstra_targets, build_path
+
+
+def evaluate_scenarios(graph_adj, pairs, scenarios, with_paths=False, base_trees=None, stats=None):
+    """
+    Comparer des scénarios de contraintes hypothétiques sur les mêmes trajets
+
+    Le graphe de base (contraintes actives) n'est jamais recopié : chaque
+    scénario est une surcouche {"A-B": valeur} appliquée aux seuls nœuds
+    concernés. Pour chaque source, l'arbre des plus courts chemins de base
+    (calculé une fois, réutilisable via base_trees) décide si le scénario
+    peut changer le résultat :
+
+    - une baisse sur (a, b) ne change rien si d(a) + coût' >= d(b) : les
+      distances de base restent un potentiel valide, aucun chemin ne passe
+      sous elles ;
+    - une hausse ne touche que les cibles dont le chemin de base emprunte
+      l'arête.
+
+    Les trajets non touchés reprennent le résultat de base ; les autres
+    sont recalculés par un Dijkstra arrêté dès que leurs cibles sont fixées.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        pairs: [(source, destination)]
+        scenarios: [{'name': str, 'constraints': {"A-B": valeur}}]
+        with_paths: Ajouter les chemins
+        base_trees: dict optionnel {source: (dist, parent)} gardé entre appels
+        stats: dict optionnel rempli avec 'nodes_settled', 'edges_relaxed',
+               'pairs_reused' et 'pairs_recomputed'
+
+    Returns:
+        dict: {'baseline': {'distance'[, 'path']},
+               'scenarios': [{'name', 'distance', 'delta', 'changed', 'reused'[, 'path']}]}
+    """
+    pairs = [tuple(pair) for pair in pairs]
+    for source, destination in pairs:
+        for node in (source, destination):
+            if node not in graph_adj:
+                raise ValueError(f"Le nœud '{node}' n'existe pas !")
+
+    counters = {'nodes_settled': 0, 'edges_relaxed': 0, 'pairs_reused': 0, 'pairs_recomputed': 0}
+    trees = base_trees if base_trees is not None else {}
+    by_source = {}
+    for index, (source, destination) in enumerate(pairs):
+        by_source.setdefault(source, []).append((index, destination))
+        if source not in trees:
+            tree_stats = {}
+            trees[source] = dijkstra_all(graph_adj, source, tree_stats)
+            counters['nodes_settled'] += tree_stats.get('nodes_settled', 0)
+            counters['edges_relaxed'] += tree_stats.get('edges_relaxed', 0)
+
+    inf = float('inf')
+    baseline = {'distance': [trees[s][0].get(t, inf) for s, t in pairs]}
+    if with_paths:
+        baseline['path'] = [build_path(trees[s][1], t) for s, t in pairs]
+
+    results = []
+    for scenario in scenarios:
+        overlay = _Overlay(graph_adj, scenario.get('constraints') or {})
+        distance = list(baseline['distance'])
+        paths = list(baseline['path']) if with_paths else None
+        reused = [True] * len(pairs)
+
+        for source, targets in by_source.items():
+            dist, parent = trees[source]
+            affected = _affected_targets(overlay, dist, parent, targets)
+            if not affected:
+                continue
+            new_dist, new_parent = dijkstra_targets(overlay, source, {t for _, t in affected}, counters)
+            for index, destination in affected:
+                distance[index] = new_dist.get(destination, inf)
+                reused[index] = False
+                if with_paths:
+                    paths[index] = build_path(new_parent, destination)
+
+        counters['pairs_reused'] += sum(reused)
+        counters['pairs_recomputed'] += len(pairs) - sum(reused)
+        entry = {
+            'name': scenario.get('name'),
+            'distance': distance,
+            'delta': [new - old if new != old else 0 for new, old in zip(distance, baseline['distance'])],
+            'changed': [new != old for new, old in zip(distance, baseline['distance'])],
+            'reused': sum(reused)
+        }
+        if with_paths:
+            entry['path'] = paths
+        results.append(entry)
+
+    if stats is not None:
+        stats.update(counters)
+    return {'baseline': baseline, 'scenarios': results}
+
+
+class _Overlay:
+    """Liste d'adjacence de base + contraintes du scénario (seuls les nœuds touchés sont recopiés)"""
+
+    def __init__(self, base, constraints):
+        self.base = base
+        self.changes = {}       # {(a, b): (poids, ancienne contrainte, nouvelle)}
+        self._lists = {}
+        for key, value in constraints.items():
+            # Les identifiants peuvent contenir '-' : essayer chaque découpage
+            for position, char in enumerate(key):
+                if char != '-' or key[:position] not in base:
+                    continue
+                source, target = key[:position], key[position + 1:]
+                for neighbor, weight, constraint in base[source]:
+                    if neighbor == target and constraint != value:
+                        self.changes[(source, target)] = (weight, constraint, value)
+                        self._lists[source] = None
+
+        for source in self._lists:
+            self._lists[source] = [
+                (neighbor, weight, constraints.get(f"{source}-{neighbor}", constraint))
+                for neighbor, weight, constraint in base[source]
+            ]
+
+    def __contains__(self, node):
+        return node in self.base
+
+    def __getitem__(self, node):
+        adjusted = self._lists.get(node)
+        return adjusted if adjusted is not None else self.base[node]
+
+
+def _affected_targets(overlay, dist, parent, targets):
+    """Cibles dont le résultat de base peut changer avec le scénario"""
+    if not overlay.changes:
+        return []
+
+    inf = float('inf')
+    increased = set()
+    for (a, b), (weight, old, new) in overlay.changes.items():
+        if new > old:
+            increased.add((a, b))
+        elif dist.get(a, inf) + weight + new < dist.get(b, inf):
+            # Un raccourci possible : toutes les cibles atteintes sont à revoir
+            return [(index, t) for index, t in targets if t in dist]
+
+    affected = []
+    for index, destination in targets:
+        node = destination
+        while node is not None and node in parent:
+            previous = parent[node]
+            if previous is not None and (previous, node) in increased:
+                affected.append((index, destination))
+                break
+            node = previous
+    return affected
@@ -0,0 +1,259 @@
+import heapq
+import math
+import threading
+
+
+class SpatialIndex:
+    """
+    Index spatial des nœuds (grille uniforme) pour les questions géométriques
+
+    Chaque cellule de la grille contient les nœuds dont les coordonnées y
+    tombent. Un rectangle ne parcourt que les cellules qu'il recouvre ; les
+    k plus proches voisins sont cherchés par anneaux de cellules autour du
+    point, jusqu'à ce que l'anneau suivant ne puisse plus rien améliorer.
+
+    Comme ComponentIndex : les créations et suppressions de nœuds sont
+    appliquées immédiatement, toute modification inconnue invalide l'index,
+    reconstruit paresseusement à la question suivante. La taille des
+    cellules est recalculée à chaque reconstruction (≈ 2 nœuds par cellule).
+    """
+
+    def __init__(self, cell_size=None):
+        self._fixed_cell = cell_size
+        self._cell = cell_size or 1.0
+        self._cells = {}
+        self._coords = {}
+        self._bounds = None      # Cellules extrêmes occupées (jamais réduites avant reconstruction)
+        self._valid = False      # Construit à la première question
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+
+    # =====================
+    # MISES À JOUR
+    # =====================
+
+    def insert(self, node, x, y):
+        with self._lock:
+            self._generation += 1
+            if self._valid:
+                self._remove(node)
+                self._insert(node, float(x), float(y))
+
+    def remove(self, node):
+        with self._lock:
+            self._generation += 1
+            if self._valid:
+                self._remove(node)
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._valid = False
+
+    def clear(self):
+        """Graphe vidé : index vide et valide"""
+        with self._lock:
+            self._generation += 1
+            self._cells = {}
+            self._coords = {}
+            self._bounds = None
+            self._valid = True
+
+    @property
+    def valid(self):
+        return self._valid
+
+    def __len__(self):
+        return len(self._coords)
+
+    def rebuild(self, load_nodes):
+        """
+        Reconstruire l'index depuis les nœuds
+
+        Si une modification arrive pendant le chargement, le nouvel index
+        n'est pas installé : l'appel suivant recommencera.
+
+        Args:
+            load_nodes: Fonction retournant [{'id', 'x', 'y', ...}]
+        """
+        with self._lock:
+            generation = self._generation
+
+        coords = {row['id']: (float(row['x']), float(row['y'])) for row in load_nodes()}
+        cell = self._fixed_cell or _cell_size(coords)
+        cells = {}
+        for node, (x, y) in coords.items():
+            cells.setdefault(_key(x, y, cell), set()).add(node)
+        bounds = None
+        if cells:
+            bounds = (min(i for i, _ in cells), min(j for _, j in cells),
+                      max(i for i, _ in cells), max(j for _, j in cells))
+
+        with self._lock:
+            self.rebuilds += 1
+            if self._generation == generation:
+                self._cell = cell
+                self._cells = cells
+                self._coords = coords
+                self._bounds = bounds
+                self._valid = True
+                return True
+            return False
+
+    def _insert(self, node, x, y):
+        self._coords[node] = (x, y)
+        i, j = _key(x, y, self._cell)
+        self._cells.setdefault((i, j), set()).add(node)
+        if self._bounds is None:
+            self._bounds = (i, j, i, j)
+        else:
+            low_i, low_j, high_i, high_j = self._bounds
+            self._bounds = (min(low_i, i), min(low_j, j), max(high_i, i), max(high_j, j))
+
+    def _remove(self, node):
+        coords = self._coords.pop(node, None)
+        if coords is None:
+            return
+        key = _key(coords[0], coords[1], self._cell)
+        members = self._cells.get(key)
+        if members is not None:
+            members.discard(node)
+            if not members:
+                del self._cells[key]
+
+    # =====================
+    # QUESTIONS
+    # =====================
+
+    def coords(self, node):
+        """Coordonnées (x, y) du nœud, None si inconnu"""
+        with self._lock:
+            return self._coords.get(node)
+
+    def within(self, min_x, min_y, max_x, max_y):
+        """
+        Nœuds dans le rectangle (bords inclus)
+
+        Returns:
+            list: Identifiants triés
+        """
+        if min_x > max_x or min_y > max_y:
+            return []
+        with self._lock:
+            cell = self._cell
+            low_i, low_j = _key(min_x, min_y, cell)
+            high_i, high_j = _key(max_x, max_y, cell)
+            coords = self._coords
+            found = []
+            # Rectangle plus grand que la grille : parcourir les cellules occupées
+            if (high_i - low_i + 1) * (high_j - low_j + 1) > len(self._cells):
+                keys = [key for key in self._cells
+                        if low_i <= key[0] <= high_i and low_j <= key[1] <= high_j]
+            else:
+                keys = [(i, j) for i in range(low_i, high_i + 1) for j in range(low_j, high_j + 1)]
+            for key in keys:
+                for node in self._cells.get(key, ()):
+                    x, y = coords[node]
+                    if min_x <= x <= max_x and min_y <= y <= max_y:
+                        found.append(node)
+        return sorted(found)
+
+    def nearest(self, x, y, k=1):
+        """
+        Les k nœuds les plus proches du point (distance euclidienne)
+
+        Returns:
+            list: [(distance, nœud)] du plus proche au plus lointain
+        """
+        x, y = float(x), float(y)
+        with self._lock:
+            if k < 1 or not self._cells:
+                return []
+            cell = self._cell
+            coords = self._coords
+            ci, cj = _key(x, y, cell)
+            # Au-delà de cet anneau, plus aucune cellule occupée
+            low_i, low_j, high_i, high_j = self._bounds
+            reach = max(ci - low_i, high_i - ci, cj - low_j, high_j - cj, 0)
+
+            gap = max(low_i - ci, ci - high_i, low_j - cj, cj - high_j, 0)
+            if (2 * gap + 1) ** 2 > len(self._cells):
+                # Point loin des nœuds : les premiers anneaux seraient tous vides
+                ranked = heapq.nsmallest(k, ((math.hypot(nx - x, ny - y), node)
+                                             for node, (nx, ny) in coords.items()))
+                return [(d, node) for d, node in ranked]
+
+            best = []  # Tas max (distance négative) des k meilleurs
+            for ring in range(reach + 1):
+                # Tout nœud hors des anneaux déjà vus est à plus de (ring - 1) cellules
+                if len(best) == k and (ring - 1) * cell > -best[0][0]:
+                    break
+                for key in _ring(ci, cj, ring):
+                    for node in self._cells.get(key, ()):
+                        nx, ny = coords[node]
+                        entry = (-math.hypot(nx - x, ny - y), _Desc(node))
+                        if len(best) < k:
+                            heapq.heappush(best, entry)
+                        elif entry > best[0]:
+                            heapq.heapreplace(best, entry)
+
+        return sorted((-d, node.value) for d, node in best)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'valid': self._valid,
+                'nodes': len(self._coords),
+                'cells': len(self._cells),
+                'cell_size': self._cell,
+                'rebuilds': self.rebuilds
+            }
+
+
+class _Desc:
+    """Identifiant à ordre inversé : à distance égale, le tas garde le plus petit"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return self.value > other.value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+
+def _key(x, y, cell):
+    return (math.floor(x / cell), math.floor(y / cell))
+
+
+def _ring(ci, cj, ring):
+    """Cellules à exactement `ring` cellules (distance de Tchebychev) de (ci, cj)"""
+    if ring == 0:
+        yield (ci, cj)
+        return
+    for i in range(ci - ring, ci + ring + 1):
+        yield (i, cj - ring)
+        yield (i, cj + ring)
+    for j in range(cj - ring + 1, cj + ring):
+        yield (ci - ring, j)
+        yield (ci + ring, j)
+
+
+def _cell_size(coords):
+    """Taille des cellules : environ 2 nœuds par cellule sur l'emprise des nœuds"""
+    if len(coords) < 2:
+        return 1.0
+    xs = [x for x, _ in coords.values()]
+    ys = [y for _, y in coords.values()]
+    width = max(xs) - min(xs)
+    height = max(ys) - min(ys)
+    area = width * height
+    if area <= 0:
+        # Nœuds alignés : découper la seule dimension non nulle
+        extent = max(width, height)
+        return extent / len(coords) * 2 if extent > 0 else 1.0
+    return math.sqrt(area / len(coords) * 2)
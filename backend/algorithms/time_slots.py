@@ -0,0 +1,200 @@
+from datetime import datetime
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+DAYS = ('lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche')
+
+
+def parse_schedule(schedule):
+    """
+    Valider et normaliser le calendrier d'une contrainte
+
+    Format : [{'days': [0, 1], 'start': '08:00', 'end': '12:00'}, ...]
+    - days : jours de la semaine (0 = lundi ... 6 = dimanche, ou leur nom
+      français) ; absent = tous les jours
+    - end <= start : la fenêtre se poursuit le lendemain (ex: 22:00 - 06:00)
+
+    Returns:
+        list: Fenêtres normalisées (jours triés, heures 'HH:MM'), None si pas de calendrier
+
+    Raises:
+        ValueError: Calendrier invalide
+    """
+    if schedule is None:
+        return None
+    if not isinstance(schedule, list) or not schedule:
+        raise ValueError("Le calendrier doit être une liste de fenêtres non vide")
+
+    windows = []
+    for window in schedule:
+        if not isinstance(window, dict):
+            raise ValueError(f"Fenêtre invalide: {window!r}")
+        days = window.get('days', list(range(7)))
+        if not isinstance(days, list) or not days:
+            raise ValueError(f"Jours invalides: {days!r}")
+        windows.append({
+            'days': sorted({_day(day) for day in days}),
+            'start': _format(_minutes(window.get('start'))),
+            'end': _format(_minutes(window.get('end')))
+        })
+    return windows
+
+
+def compile_time_slots(constraints, slot_minutes=60):
+    """
+    Compiler les contraintes à calendrier en tables de surcoûts par créneau
+
+    La semaine est découpée en créneaux de slot_minutes. Une contrainte
+    s'applique à tout créneau que l'une de ses fenêtres recouvre, même en
+    partie. Les créneaux qui ont exactement les mêmes contraintes partagent
+    un profil : la table ne garde que les profils distincts.
+
+    Args:
+        constraints: Contraintes valides [{'source', 'target', 'constraint_value', 'schedule'}]
+                     (celles sans calendrier sont ignorées : déjà dans le graphe)
+        slot_minutes: Durée d'un créneau (diviseur de 24 h)
+
+    Returns:
+        TimeSlotTable
+    """
+    if slot_minutes <= 0 or MINUTES_PER_DAY % slot_minutes:
+        raise ValueError("La durée d'un créneau doit diviser 24 h")
+    slots = MINUTES_PER_WEEK // slot_minutes
+
+    active = [[] for _ in range(slots)]
+    for index, constraint in enumerate(constraints):
+        schedule = parse_schedule(constraint.get('schedule'))
+        if not schedule:
+            continue
+        for slot in _covered_slots(schedule, slot_minutes):
+            active[slot].append(index)
+
+    profile_ids = {(): 0}
+    profiles = [{}]
+    slot_profile = []
+    for indexes in active:
+        key = tuple(indexes)
+        if key not in profile_ids:
+            extras = {}
+            for index in indexes:
+                constraint = constraints[index]
+                a, b = constraint['source'], constraint['target']
+                edge = (a, b) if a < b else (b, a)
+                extras[edge] = extras.get(edge, 0) + constraint['constraint_value']
+            profile_ids[key] = len(profiles)
+            profiles.append(extras)
+        slot_profile.append(profile_ids[key])
+
+    return TimeSlotTable(slot_minutes, slot_profile, profiles)
+
+
+class TimeSlotTable:
+    """
+    Surcoûts des contraintes à calendrier, par créneau de la semaine
+
+    slot_profile[créneau] -> profil ; profiles[profil] = {(a, b): surcoût}
+    (arête non-orientée, a < b). Le profil 0 est vide (aucune contrainte).
+    """
+
+    def __init__(self, slot_minutes, slot_profile, profiles):
+        self.slot_minutes = slot_minutes
+        self.slot_profile = slot_profile
+        self.profiles = profiles
+
+    def slot_of(self, when):
+        """Créneau d'une date (heure locale) : O(1)"""
+        minute = when.weekday() * MINUTES_PER_DAY + when.hour * 60 + when.minute
+        return minute // self.slot_minutes
+
+    def profile_of(self, when):
+        """Profil du créneau de la date : O(1)"""
+        return self.slot_profile[self.slot_of(when)]
+
+    def slot_bounds(self, slot):
+        """(jour, 'HH:MM' de début, 'HH:MM' de fin) d'un créneau"""
+        start = slot * self.slot_minutes
+        day, minute = divmod(start, MINUTES_PER_DAY)
+        return DAYS[day], _format(minute), _format((minute + self.slot_minutes) % MINUTES_PER_DAY)
+
+    def stats(self):
+        return {
+            'slot_minutes': self.slot_minutes,
+            'slots': len(self.slot_profile),
+            'profiles': len(self.profiles),
+            'scheduled_edges': len({edge for profile in self.profiles for edge in profile})
+        }
+
+
+def apply_profile(graph_adj, extras):
+    """
+    Liste d'adjacence avec les surcoûts d'un profil (seules les listes des nœuds touchés sont recopiées)
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        extras: {(a, b): surcoût} du profil (dans les deux sens)
+    """
+    if not extras:
+        return graph_adj
+    touched = {}
+    for (a, b), extra in extras.items():
+        touched.setdefault(a, {})[b] = extra
+        touched.setdefault(b, {})[a] = extra
+
+    adj = dict(graph_adj)
+    for node, added in touched.items():
+        if node in adj:
+            adj[node] = [(neighbor, weight, constraint + added.get(neighbor, 0))
+                         for neighbor, weight, constraint in adj[node]]
+    return adj
+
+
+def parse_departure(value):
+    """Date de départ ISO 8601 -> datetime naïve en heure locale"""
+    when = datetime.fromisoformat(value)
+    if when.tzinfo is not None:
+        when = when.astimezone().replace(tzinfo=None)
+    return when
+
+
+# =====================
+# OUTILS
+# =====================
+
+def _day(day):
+    if isinstance(day, str) and day.lower() in DAYS:
+        return DAYS.index(day.lower())
+    if isinstance(day, int) and not isinstance(day, bool) and 0 <= day <= 6:
+        return day
+    raise ValueError(f"Jour invalide: {day!r} (0 = lundi ... 6 = dimanche)")
+
+
+def _minutes(value):
+    """'HH:MM' -> minutes depuis minuit ('24:00' accepté comme fin de journée)"""
+    try:
+        hours, minutes = str(value).split(':')
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"Heure invalide: {value!r} (format HH:MM)")
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or (hours == 24 and minutes):
+        raise ValueError(f"Heure invalide: {value!r} (format HH:MM)")
+    return hours * 60 + minutes
+
+
+def _format(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def _covered_slots(schedule, slot_minutes):
+    """Créneaux recouverts (même en partie) par les fenêtres du calendrier"""
+    slots = MINUTES_PER_WEEK // slot_minutes
+    covered = set()
+    for window in schedule:
+        start, end = _minutes(window['start']), _minutes(window['end'])
+        length = end - start if end > start else end + MINUTES_PER_DAY - start
+        for day in window['days']:
+            begin = day * MINUTES_PER_DAY + start
+            first = begin // slot_minutes
+            last = (begin + length - 1) // slot_minutes
+            for slot in range(first, last + 1):
+                covered.add(slot % slots)
+    return sorted(covered)
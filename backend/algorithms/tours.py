@@ -0,0 +1,292 @@
+import time
+
+from .dijkstra import build_path, dijkstra_targets
+
+
+def plan_tours(graph_adj, depot, points, demands=None, vehicle_capacity=None,
+               method='savings', time_budget=2.0, with_paths=False, stats=None):
+    """
+    Tournées de collecte depuis un dépôt sous contrainte de capacité du camion
+
+    1. Matrice des distances dépôt / points : un Dijkstra « un vers plusieurs »
+       par point, arrêté dès que tous les points sont atteints.
+    2. Construction : économies de Clarke & Wright ('savings') ou plus
+       proche voisin ('nearest').
+    3. Amélioration de chaque tournée par 2-opt puis or-opt (déplacement de
+       segments de 1 à 3 points) tant qu'il reste du temps (time_budget).
+
+    La matrice peut être asymétrique (contraintes orientées "A-B") : le
+    coût d'un segment inversé par 2-opt est obtenu par sommes préfixes.
+
+    Args:
+        graph_adj: dict {node: [(voisin, poids, contrainte), ...]}
+        depot: Nœud de départ et d'arrivée des camions
+        points: Points de collecte à visiter
+        demands: dict {point: volume} (Node.capacity) ; sans demande, 1 par point
+        vehicle_capacity: Capacité d'un camion (None = illimitée : une seule tournée)
+        method: 'savings' ou 'nearest'
+        time_budget: Temps maximum de l'amélioration (secondes)
+        with_paths: Ajouter le chemin complet (nœud par nœud) de chaque tournée
+        stats: dict optionnel rempli avec 'nodes_settled' et 'edges_relaxed'
+
+    Returns:
+        dict: {'routes': [{'points', 'load', 'distance', 'overloaded'[, 'path']}],
+               'total_distance', 'construction_distance', 'unreachable', ...}
+    """
+    if depot not in graph_adj:
+        raise ValueError(f"Le dépôt '{depot}' n'existe pas !")
+    if method not in CONSTRUCTIONS:
+        raise ValueError(f"Méthode inconnue '{method}' (savings ou nearest)")
+    missing = [point for point in points if point not in graph_adj]
+    if missing:
+        raise ValueError(f"Points inexistants: {missing[:10]}")
+
+    start = time.perf_counter()
+    counters = {'nodes_settled': 0, 'edges_relaxed': 0}
+
+    nodes = [depot] + sorted(set(points) - {depot})
+    matrix, parents = _distance_matrix(graph_adj, nodes, with_paths, counters)
+    matrix_s = time.perf_counter() - start
+
+    # Points inatteignables (depuis ou vers le dépôt) : hors tournées
+    inf = float('inf')
+    unreachable = [nodes[i] for i in range(1, len(nodes)) if matrix[0][i] == inf or matrix[i][0] == inf]
+    blocked = set(unreachable)
+    customers = [i for i in range(1, len(nodes)) if nodes[i] not in blocked]
+
+    demands = demands or {}
+    demand = [demands.get(node, 0) or 0 for node in nodes]
+    if not any(demand[i] > 0 for i in customers):
+        demand = [1] * len(nodes)
+    capacity = vehicle_capacity if vehicle_capacity else inf
+
+    routes = CONSTRUCTIONS[method](matrix, customers, demand, capacity)
+    construction = sum(_route_cost(matrix, route) for route in routes)
+
+    moves = {'two_opt': 0, 'or_opt': 0}
+    complete = _improve(matrix, routes, time.perf_counter() + time_budget, moves)
+
+    result_routes = []
+    for route in routes:
+        load = sum(demand[i] for i in route[1:-1])
+        entry = {
+            'points': [nodes[i] for i in route[1:-1]],
+            'load': load,
+            'distance': _route_cost(matrix, route),
+            'overloaded': load > capacity
+        }
+        if with_paths:
+            entry['path'] = _expand(parents, nodes, route)
+        result_routes.append(entry)
+
+    if stats is not None:
+        stats.update(counters)
+
+    total = sum(route['distance'] for route in result_routes)
+    return {
+        'depot': depot,
+        'method': method,
+        'vehicle_capacity': vehicle_capacity,
+        'routes': result_routes,
+        'total_distance': total,
+        'construction_distance': construction,
+        'improvement': (construction - total) / construction if construction else 0,
+        'unreachable': unreachable,
+        'moves': moves,
+        'local_search_complete': complete,
+        'matrix_s': matrix_s,
+        'elapsed_s': time.perf_counter() - start
+    }
+
+
+# =====================
+# MATRICE DES DISTANCES
+# =====================
+
+def _distance_matrix(graph_adj, nodes, keep_parents, counters):
+    """Matrice des plus courtes distances entre les nœuds (index = position dans nodes)"""
+    inf = float('inf')
+    matrix = []
+    parents = []
+    for source in nodes:
+        dist, parent = dijkstra_targets(graph_adj, source, nodes, counters)
+        matrix.append([dist.get(target, inf) for target in nodes])
+        parents.append(parent if keep_parents else None)
+    return matrix, parents
+
+
+# =====================
+# CONSTRUCTION
+# =====================
+
+def _savings(matrix, customers, demand, capacity):
+    """Clarke & Wright (version parallèle) : fusionner les tournées qui économisent le plus"""
+    route_of = {i: [0, i, 0] for i in customers}
+    load = {i: demand[i] for i in customers}
+
+    savings = []
+    depot_row = matrix[0]
+    for i in customers:
+        row = matrix[i]
+        back = row[0]
+        for j in customers:
+            if i != j:
+                saving = back + depot_row[j] - row[j]
+                if saving > 0:
+                    savings.append((-saving, i, j))
+    savings.sort()
+
+    # Tournée i -> ... et tournée ... -> j : fusion si i termine l'une et j commence l'autre
+    for _, i, j in savings:
+        route_i, route_j = route_of[i], route_of[j]
+        if route_i is route_j or route_i[-2] != i or route_j[1] != j:
+            continue
+        key_i, key_j = route_i[1], route_j[1]
+        if load[key_i] + load[key_j] > capacity:
+            continue
+
+        merged = route_i[:-1] + route_j[1:]
+        load[key_i] += load.pop(key_j)
+        for point in merged[1:-1]:
+            route_of[point] = merged
+
+    unique = {id(route): route for route in route_of.values()}
+    return sorted(unique.values(), key=lambda route: route[1])
+
+
+def _nearest_neighbor(matrix, customers, demand, capacity):
+    """Plus proche voisin : le camion va au point le plus proche qui rentre encore"""
+    remaining = set(customers)
+    routes = []
+    while remaining:
+        route, load, current = [0], 0, 0
+        while True:
+            row = matrix[current]
+            candidates = [i for i in remaining if load + demand[i] <= capacity]
+            if not candidates:
+                break
+            current = min(candidates, key=lambda i: (row[i], i))
+            route.append(current)
+            load += demand[current]
+            remaining.discard(current)
+        if len(route) == 1:
+            # Point plus volumineux que le camion : tournée dédiée (signalée 'overloaded')
+            current = min(remaining)
+            route.append(current)
+            remaining.discard(current)
+        route.append(0)
+        routes.append(route)
+    return routes
+
+
+CONSTRUCTIONS = {
+    'savings': _savings,
+    'nearest': _nearest_neighbor,
+}
+
+
+# =====================
+# AMÉLIORATION LOCALE
+# =====================
+
+def _route_cost(matrix, route):
+    return sum(matrix[a][b] for a, b in zip(route, route[1:]))
+
+
+def _improve(matrix, routes, deadline, moves):
+    """2-opt puis or-opt sur chaque tournée jusqu'à stabilité ; False si le temps a manqué"""
+    for route in routes:
+        while True:
+            if time.perf_counter() > deadline:
+                return False
+            if _two_opt(matrix, route):
+                moves['two_opt'] += 1
+            elif _or_opt(matrix, route):
+                moves['or_opt'] += 1
+            else:
+                break
+    return True
+
+
+def _two_opt(matrix, route, eps=1e-9):
+    """
+    Meilleure inversion de segment route[i..j] (une seule appliquée)
+
+    Pour chaque i, les gains de tous les j sont calculés d'un bloc
+    (compréhension sur la ligne de i) puis le meilleur est retenu.
+    """
+    m = len(route)
+    if m < 5:
+        return False
+
+    # Sommes préfixes des coûts dans les deux sens (segment inversé en O(1))
+    forward = [0.0] * m
+    backward = [0.0] * m
+    for t in range(m - 1):
+        a, b = route[t], route[t + 1]
+        forward[t + 1] = forward[t] + matrix[a][b]
+        backward[t + 1] = backward[t] + matrix[b][a]
+
+    best, best_delta = None, -eps
+    for i in range(1, m - 2):
+        before, first = route[i - 1], route[i]
+        row_before = matrix[before]
+        row_first = matrix[first]
+        base = matrix[before][first]
+        fw_i, bw_i = forward[i], backward[i]
+        deltas = [
+            row_before[route[j]] + row_first[route[j + 1]] - base - matrix[route[j]][route[j + 1]]
+            + (backward[j] - bw_i) - (forward[j] - fw_i)
+            for j in range(i + 1, m - 1)
+        ]
+        k = min(range(len(deltas)), key=deltas.__getitem__)
+        if deltas[k] < best_delta:
+            best, best_delta = (i, i + 1 + k), deltas[k]
+
+    if best is None:
+        return False
+    i, j = best
+    route[i:j + 1] = route[i:j + 1][::-1]
+    return True
+
+
+def _or_opt(matrix, route, eps=1e-9):
+    """Meilleur déplacement d'un segment de 1 à 3 points ailleurs dans la tournée"""
+    m = len(route)
+    best, best_delta = None, -eps
+    for length in (1, 2, 3):
+        for i in range(1, m - length):
+            first, last = route[i], route[i + length - 1]
+            before, after = route[i - 1], route[i + length]
+            removed = matrix[before][first] + matrix[last][after] - matrix[before][after]
+            row_last = matrix[last]
+            # Insertion entre route[p] et route[p + 1], hors du segment et de ses bords
+            positions = [p for p in range(m - 1) if not i - 1 <= p <= i + length - 1]
+            if not positions:
+                continue
+            deltas = [
+                matrix[route[p]][first] + row_last[route[p + 1]] - matrix[route[p]][route[p + 1]]
+                for p in positions
+            ]
+            k = min(range(len(deltas)), key=deltas.__getitem__)
+            delta = deltas[k] - removed
+            if delta < best_delta:
+                best, best_delta = (i, length, positions[k]), delta
+
+    if best is None:
+        return False
+    i, length, p = best
+    segment = route[i:i + length]
+    rest = route[:i] + route[i + length:]
+    position = p + 1 if p < i else p + 1 - length
+    route[:] = rest[:position] + segment + rest[position:]
+    return True
+
+
+def _expand(parents, nodes, route):
+    """Chemin complet nœud par nœud d'une tournée (concaténation des trajets)"""
+    path = [nodes[route[0]]]
+    for a, b in zip(route, route[1:]):
+        leg = build_path(parents[a], nodes[b])
+        path.extend(leg[1:])
+    return path
@@ -0,0 +1,5 @@
+"""Package benchmarks - Graphes synthétiques et mesures de performance"""
+
+from .generators import grid_graph, random_geometric_graph, scale_free_graph, GENERATORS
+
+__all__ = ['grid_graph', 'random_geometric_graph', 'scale_free_graph', 'GENERATORS']
@@ -0,0 +1,130 @@
+"""
+Générateurs de graphes synthétiques (non-orientés) pour les benchmarks
+
+Chaque générateur vise un nombre d'arêtes donné (de 1k à 1M) et retourne
+un objet Graph prêt à l'emploi, avec des coordonnées Node.x / Node.y.
+Les graphes sont reproductibles grâce au paramètre `seed`.
+"""
+
+import math
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.models import Node, Edge, Graph
+
+
+def _build(nodes, edges):
+    """nodes: [(id, x, y, capacity)], edges: [(source, target, weight)]"""
+    graph = Graph()
+    for node_id, x, y, capacity in nodes:
+        graph.add_node(Node(node_id, x, y, capacity))
+    for source, target, weight in edges:
+        graph.add_edge(Edge(source, target, weight))
+    return graph
+
+
+def grid_graph(n_edges, seed=0, spacing=50):
+    """
+    Grille carrée (rues en damier) : 2·s·(s-1) arêtes pour s×s nœuds
+
+    Les poids sont tirés entre 1 et 10 (rues plus ou moins lentes).
+    """
+    rng = random.Random(seed)
+    side = max(2, math.ceil((1 + math.sqrt(1 + 2 * n_edges)) / 2))
+
+    nodes = []
+    for i in range(side):
+        for j in range(side):
+            nodes.append((f"G{i}_{j}", j * spacing, i * spacing, rng.randint(0, 100)))
+
+    edges = []
+    for i in range(side):
+        for j in range(side):
+            if j + 1 < side:
+                edges.append((f"G{i}_{j}", f"G{i}_{j + 1}", round(rng.uniform(1, 10), 2)))
+            if i + 1 < side:
+                edges.append((f"G{i}_{j}", f"G{i + 1}_{j}", round(rng.uniform(1, 10), 2)))
+
+    return _build(nodes, edges)
+
+
+def random_geometric_graph(n_edges, seed=0, avg_degree=8, density=1000.0):
+    """
+    Graphe géométrique aléatoire : points uniformes reliés s'ils sont à moins de r
+
+    Le poids d'une arête est la distance euclidienne entre Node.x/y.
+    Le rayon r est choisi pour obtenir `avg_degree` voisins en moyenne.
+    """
+    rng = random.Random(seed)
+    n_nodes = max(2, int(2 * n_edges / avg_degree))
+    size = density * math.sqrt(n_nodes / 1000)
+    radius = math.sqrt(avg_degree * size * size / (math.pi * n_nodes))
+
+    points = [(rng.uniform(0, size), rng.uniform(0, size)) for _ in range(n_nodes)]
+    nodes = [(f"R{i}", round(x, 2), round(y, 2), rng.randint(0, 100)) for i, (x, y) in enumerate(points)]
+
+    # Grille de cellules de côté r : on ne compare que les cellules voisines
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x // radius), int(y // radius)), []).append(i)
+
+    edges = []
+    radius_sq = radius * radius
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                others = cells.get((cx + dx, cy + dy))
+                if not others:
+                    continue
+                for i in members:
+                    xi, yi = points[i]
+                    for j in others:
+                        if j <= i:
+                            continue
+                        xj, yj = points[j]
+                        d_sq = (xi - xj) ** 2 + (yi - yj) ** 2
+                        if d_sq <= radius_sq:
+                            edges.append((f"R{i}", f"R{j}", round(max(math.sqrt(d_sq), 0.01), 2)))
+
+    return _build(nodes, edges)
+
+
+def scale_free_graph(n_edges, seed=0, m=3, size=1000.0):
+    """
+    Graphe sans échelle (Barabási-Albert) : quelques hubs très connectés
+
+    Chaque nouveau nœud se relie à `m` nœuds existants choisis
+    proportionnellement à leur degré. Poids tirés entre 1 et 10.
+    """
+    rng = random.Random(seed)
+    n_nodes = max(m + 1, n_edges // m + m)
+
+    nodes = [(f"S{i}", round(rng.uniform(0, size), 2), round(rng.uniform(0, size), 2), rng.randint(0, 100))
+             for i in range(n_nodes)]
+
+    edges = []
+    repeated = []  # Chaque nœud apparaît autant de fois que son degré
+    for i in range(m + 1):
+        for j in range(i):
+            edges.append((f"S{i}", f"S{j}", round(rng.uniform(1, 10), 2)))
+            repeated.extend((i, j))
+
+    for i in range(m + 1, n_nodes):
+        targets = set()
+        while len(targets) < m:
+            targets.add(rng.choice(repeated))
+        for j in targets:
+            edges.append((f"S{i}", f"S{j}", round(rng.uniform(1, 10), 2)))
+            repeated.extend((i, j))
+
+    return _build(nodes, edges)
+
+
+GENERATORS = {
+    'grid': grid_graph,
+    'geometric': random_geometric_graph,
+    'scale_free': scale_free_graph,
+}
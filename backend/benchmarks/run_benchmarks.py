@@ -0,0 +1,349 @@
+"""
+Suite de benchmarks sur graphes synthétiques
+
+Usage :
+    python backend/benchmarks/run_benchmarks.py
+    python backend/benchmarks/run_benchmarks.py --sizes 1000,10000,100000,1000000 --generators grid,scale_free
+    python backend/benchmarks/run_benchmarks.py --db --http   # ⚠ vide puis remplit la BDD configurée
+
+Mesures :
+    - Graph.get_adjacency_list
+    - dijkstra (référence, O(V²) : limitée par --max-quadratic-nodes) et dijkstra_all
+    - graph_coloring
+    - GraphController.get_graph (avec --db ; --storage postgres|sqlite)
+    - débit HTTP de bout en bout sur /algo/dijkstra (avec --http, implique --db)
+    - débit du serveur 1 processus vs prefork N lecteurs (avec --prefork N ;
+      base SQLite temporaire, n'affecte pas la BDD configurée)
+
+Les résultats sont écrits en JSON (--output) pour suivre les régressions.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import signal
+import subprocess
+import sys
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.algorithms import dijkstra, dijkstra_all, graph_coloring
+from backend.benchmarks.generators import GENERATORS
+
+
+def _measure(fn, repeat):
+    """Exécuter fn `repeat` fois et retourner les durées (secondes)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _summary(durations):
+    return {
+        'runs': len(durations),
+        'min_s': min(durations),
+        'median_s': statistics.median(durations),
+        'mean_s': statistics.mean(durations),
+        'max_s': max(durations)
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+# =====================
+# ALGORITHMES (en mémoire)
+# =====================
+
+def bench_algorithms(graph, args, rng):
+    """Benchmarks purement en mémoire sur un graphe généré"""
+    results = {}
+    node_ids = list(graph.nodes)
+    pairs = [(rng.choice(node_ids), rng.choice(node_ids)) for _ in range(args.queries)]
+
+    results['get_adjacency_list'] = _summary(_measure(graph.get_adjacency_list, args.repeat))
+    adj = graph.get_adjacency_list()
+
+    if len(node_ids) <= args.max_quadratic_nodes:
+        results['dijkstra'] = _summary(_measure(
+            lambda: [dijkstra(adj, s, d) for s, d in pairs], args.repeat))
+        results['dijkstra']['queries_per_run'] = len(pairs)
+    else:
+        results['dijkstra'] = {'skipped': f"> {args.max_quadratic_nodes} nœuds (O(V²))"}
+
+    results['dijkstra_all'] = _summary(_measure(
+        lambda: [dijkstra_all(adj, s) for s, _ in pairs], args.repeat))
+    results['dijkstra_all']['queries_per_run'] = len(pairs)
+
+    results['graph_coloring'] = _summary(_measure(lambda: graph_coloring(adj), args.repeat))
+
+    return results
+
+
+# =====================
+# STOCKAGE + HTTP
+# =====================
+
+def load_into_db(graph):
+    """Remplacer le contenu du stockage par le graphe généré (insertion en masse)"""
+    from backend.controllers import GraphController
+
+    controller = GraphController()
+    controller.clear_graph()
+
+    controller.storage.bulk_insert(
+        [(n.id, n.x, n.y, n.capacity) for n in graph.nodes.values()],
+        [(e.source, e.target, e.weight) for edges in graph.edges.values() for e in edges]
+    )
+    return controller
+
+
+def bench_get_graph(controller, args):
+    return _summary(_measure(controller.get_graph, args.repeat))
+
+
+def bench_http(graph, args, rng):
+    """Débit de bout en bout : serveur local (comme run_server) + clients concurrents"""
+    from http.server import HTTPServer
+    from backend.server import WasteGraphHandler
+
+    httpd = HTTPServer(('127.0.0.1', 0), WasteGraphHandler)
+    WasteGraphHandler.log_message = lambda *a, **k: None
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    try:
+        return _http_load(base_url, graph, args, rng)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def _http_load(base_url, graph, args, rng):
+    """Charge de routage : --http-requests Dijkstra aléatoires, --http-concurrency clients"""
+    from urllib.parse import urlencode
+
+    node_ids = list(graph.nodes)
+    urls = [
+        f"{base_url}/algo/dijkstra?" + urlencode({
+            'src': rng.choice(node_ids), 'dst': rng.choice(node_ids), 'save': 'false'
+        })
+        for _ in range(args.http_requests)
+    ]
+
+    def fetch(url):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(url) as response:
+                response.read()
+                status = response.status
+        except urllib.error.HTTPError as e:
+            # Paire inatteignable, nœud inconnu... : comptée en erreur, pas fatale
+            e.read()
+            status = e.code
+        return time.perf_counter() - start, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.http_concurrency) as pool:
+        samples = list(pool.map(fetch, urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(s[0] for s in samples)
+    return {
+        'requests': len(samples),
+        'concurrency': args.http_concurrency,
+        'errors': sum(1 for s in samples if s[1] >= 400),
+        'error_statuses': sorted({s[1] for s in samples if s[1] >= 400}),
+        'throughput_rps': len(samples) / elapsed,
+        'p50_s': latencies[len(latencies) // 2],
+        'p95_s': latencies[int(len(latencies) * 0.95) - 1],
+        'max_s': latencies[-1]
+    }
+
+
+def _free_port():
+    import socket
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def bench_prefork(graph, args, rng):
+    """
+    Débit de routage : serveur 1 processus (threads, GIL) vs prefork N lecteurs
+
+    Chaque configuration est lancée comme en production (backend/server.py
+    --workers) sur une copie SQLite du graphe, avec un snapshot temporaire.
+    """
+    from backend.storage.sqlite import SQLiteStorage
+
+    with tempfile.TemporaryDirectory(prefix='wastegraph-bench-') as tmp:
+        db_path = os.path.join(tmp, 'graph.db')
+        storage = SQLiteStorage(db_path)
+        storage.bulk_insert(
+            [(n.id, n.x, n.y, n.capacity) for n in graph.nodes.values()],
+            [(e.source, e.target, e.weight) for edges in graph.edges.values() for e in edges]
+        )
+        del storage
+
+        env = dict(os.environ,
+                   WASTEGRAPH_STORAGE='sqlite',
+                   WASTEGRAPH_SQLITE_PATH=db_path,
+                   WASTEGRAPH_SNAPSHOT_PATH=os.path.join(tmp, 'graph.snapshot'),
+                   WASTEGRAPH_ALGO_WORKERS='0')
+        server_script = os.path.join(os.path.dirname(__file__), '..', 'server.py')
+
+        results = {}
+        for workers in sorted({1, args.prefork}):
+            port = _free_port()
+            process = subprocess.Popen(
+                [sys.executable, server_script, '--host', '127.0.0.1', '--port', str(port),
+                 '--workers', str(workers)],
+                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            base_url = f"http://127.0.0.1:{port}"
+            try:
+                deadline = time.time() + 60
+                while True:
+                    try:
+                        urllib.request.urlopen(f"{base_url}/constraints").read()
+                        break
+                    except OSError:
+                        if time.time() > deadline or process.poll() is not None:
+                            raise RuntimeError(f"serveur --workers {workers} non démarré")
+                        time.sleep(0.2)
+                # Une requête par lecteur : snapshot mappé avant la mesure
+                _http_load(base_url, graph, argparse.Namespace(
+                    http_requests=workers * 4, http_concurrency=workers), rng)
+                results[f'workers_{workers}'] = _http_load(base_url, graph, args, rng)
+            finally:
+                process.send_signal(signal.SIGTERM)
+                process.wait(timeout=30)
+
+    single = results['workers_1']['throughput_rps']
+    best = results[f'workers_{args.prefork}']['throughput_rps']
+    results['throughput_rps'] = best
+    results['speedup'] = best / single if single else None
+    return results
+
+
+# =====================
+# MAIN
+# =====================
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks WasteGraph sur graphes synthétiques")
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help="Nombres d'arêtes visés (ex: 1000,10000,100000,1000000)")
+    parser.add_argument('--generators', default=','.join(GENERATORS),
+                        help=f"Générateurs parmi {', '.join(GENERATORS)}")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=5, help="Paires (src, dst) par run de Dijkstra")
+    parser.add_argument('--max-quadratic-nodes', type=int, default=5000,
+                        help="Au-delà, le Dijkstra de référence O(V²) est ignoré")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', action='store_true',
+                        help="Mesurer GraphController.get_graph (⚠ vide la BDD configurée)")
+    parser.add_argument('--storage', choices=['postgres', 'sqlite'], default=None,
+                        help="Backend de stockage (défaut : STORAGE_BACKEND de la config)")
+    parser.add_argument('--http', action='store_true', help="Mesurer le débit HTTP (implique --db)")
+    parser.add_argument('--http-requests', type=int, default=200)
+    parser.add_argument('--http-concurrency', type=int, default=8)
+    parser.add_argument('--prefork', type=int, default=0, metavar='N',
+                        help="Comparer le serveur 1 processus au mode prefork à N lecteurs")
+    parser.add_argument('--output', default='bench_results.json')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    generators = [g for g in args.generators.split(',') if g]
+    use_db = args.db or args.http
+
+    if args.storage:
+        # Avant tout import des contrôleurs (le serveur les crée à l'import)
+        from backend.storage import create_storage, set_storage
+        set_storage(create_storage(args.storage))
+
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args)
+        },
+        'results': []
+    }
+
+    for name in generators:
+        for size in sizes:
+            rng = random.Random(args.seed)
+            start = time.perf_counter()
+            graph = GENERATORS[name](size, seed=args.seed)
+            build_time = time.perf_counter() - start
+            n_edges = sum(len(edges) for edges in graph.edges.values()) // 2
+
+            print(f"▶ {name} ({len(graph.nodes)} nœuds, {n_edges} arêtes)")
+            entry = {
+                'generator': name,
+                'target_edges': size,
+                'nodes': len(graph.nodes),
+                'edges': n_edges,
+                'build_s': build_time,
+                'benchmarks': bench_algorithms(graph, args, rng)
+            }
+
+            if use_db:
+                controller = load_into_db(graph)
+                entry['benchmarks']['get_graph'] = bench_get_graph(controller, args)
+                if args.http:
+                    entry['benchmarks']['http_dijkstra'] = bench_http(graph, args, rng)
+            if args.prefork > 1:
+                entry['benchmarks']['http_prefork'] = bench_prefork(graph, args, rng)
+
+            for bench, values in entry['benchmarks'].items():
+                if 'median_s' in values:
+                    print(f"   {bench:<20} médiane {values['median_s'] * 1000:10.2f} ms")
+                elif 'speedup' in values:
+                    print(f"   {bench:<20} {values['throughput_rps']:10.1f} req/s "
+                          f"(x{values['speedup']:.2f} vs 1 processus)")
+                elif 'throughput_rps' in values:
+                    print(f"   {bench:<20} {values['throughput_rps']:10.1f} req/s")
+                else:
+                    print(f"   {bench:<20} ignoré ({values.get('skipped')})")
+
+            report['results'].append(entry)
+
+            # Écrit à chaque étape : un run interrompu garde ses mesures
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✓ Résultats écrits dans {args.output}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
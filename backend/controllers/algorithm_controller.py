@@ -1,18 +1,536 @@
 import sys
 import os
+import json
+import threading
+import time
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 from backend.controllers.graph_controller import GraphController
-from backend.algorithms import dijkstra, graph_coloring, get_coloring_stats
+from backend.algorithms import dijkstra, bounded_dijkstra, graph_coloring, get_coloring_stats
+from backend.algorithms import ComponentIndex, SpatialIndex, nearest_depot_partition, partition_graph, plan_tours
+from backend.algorithms import edge_betweenness, sample_sources, merge_scores, rank_edges, evaluate_scenarios
+from backend.algorithms import ShortestPathTrees, compile_time_slots, apply_profile
+from backend.algorithms import AlgorithmExecutor, AlgorithmTimeout, AlgorithmCancelled
+from backend.algorithms.replay import replay_bulk, ReplaySummary
+from backend.models import GraphSnapshot, Node, Edge
+from backend.monitoring.metrics import (
+    record_algorithm, ALGO_COALESCING, ALGO_DISCONNECTED, COMPONENT_REBUILDS, SPATIAL_REBUILDS,
+    DEPOT_TREE_HITS, DEPOT_TREE_REBUILDS
+)
+from backend.single_flight import SingleFlight, FlightTimeout
+from config.config import (
+    SNAPSHOT_PATH, ALGO_WORKERS, ALGO_TIMEOUT_S, DEPOT_TREES_MAX, DEPOT_TREE_MIN_HITS, TIME_SLOT_MINUTES
+)
 
 
 class AlgorithmController:
     """Contrôleur pour les algorithmes"""
     
-    def __init__(self):
+    def __init__(self, executor=None):
         self.graph_controller = GraphController()
+        self.storage = self.graph_controller.storage
+        
+        # Pool de processus pour les calculs (None = calcul dans le thread de la requête)
+        if executor is None and ALGO_WORKERS > 0:
+            executor = AlgorithmExecutor(ALGO_WORKERS, ALGO_TIMEOUT_S)
+        self.executor = executor
+        
+        # Calculs identiques simultanés (mêmes paramètres, même version) : un seul calcul
+        self.single_flight = SingleFlight()
+        
+        # Composantes connexes : refuser en O(1) les paires non reliées
+        self.components = ComponentIndex()
+        
+        # Index spatial des coordonnées : plus proches nœuds et zone visible de la carte
+        self.spatial = SpatialIndex()
+        
+        # Arbres des plus courts chemins des dépôts : réparés, pas jetés, quand une contrainte change
+        self.depot_trees = ShortestPathTrees(DEPOT_TREES_MAX, DEPOT_TREE_MIN_HITS)
+        self._depot_trees_lock = threading.Lock()  # Lecture BDD + réparation d'une même modification
+        
+        # Contraintes à calendrier compilées par créneau : (ETag du graphe, TimeSlotTable)
+        self._time_slots = None
+        
+        # Intermédiarité des arêtes par paramètres : (ETag du graphe, résultat)
+        self._criticality_cache = {}
+        self._criticality_lock = threading.Lock()
+        
+        # Snapshot binaire mappé : sert le routage tant qu'aucune modification n'a eu lieu
+        self.snapshot = None
+        self.snapshot_reconciled = False
+        self._snapshot_lock = threading.Lock()
+        self._changes = 0
+        GraphController.subscribe(self._on_graph_change)
+    
+    # =====================
+    # SNAPSHOT BINAIRE
+    # =====================
+    
+    def _on_graph_change(self, entity, operation, data):
+        """Toute modification rend le snapshot mappé obsolète"""
+        with self._snapshot_lock:
+            self._changes += 1
+            self.snapshot = None
+        self._update_components(entity, operation, data)
+        self._update_spatial(entity, operation, data)
+        self._update_depot_trees(entity, operation, data)
+    
+    def _get_routing_graph(self):
+        """Graphe pour le routage : le snapshot mappé s'il est valide, sinon la BDD"""
+        # Une contrainte expirée depuis la construction du snapshot l'invalide (notification 'expire')
+        self.graph_controller.check_expirations()
+        snapshot = self.snapshot
+        if snapshot is not None:
+            return snapshot
+        return self.graph_controller.get_graph()
+    
+    def load_snapshot(self, path=SNAPSHOT_PATH):
+        """
+        Mapper le snapshot existant (démarrage : routage sans attendre la BDD)
+        
+        Returns:
+            dict: Infos du snapshot, ou None s'il n'existe pas
+        """
+        if not os.path.exists(path):
+            return None
+        
+        snapshot = GraphSnapshot.open(path)
+        with self._snapshot_lock:
+            self.snapshot = snapshot
+            self.snapshot_reconciled = False
+        return snapshot.stats()
+    
+    def write_snapshot(self, path=SNAPSHOT_PATH):
+        """
+        Construire le snapshot depuis la BDD, l'écrire si le contenu a changé et le mapper
+        
+        Sert aussi à la réconciliation au démarrage : si une modification arrive
+        pendant le chargement, le snapshot n'est pas installé (il serait déjà obsolète).
+        """
+        try:
+            with self._snapshot_lock:
+                changes = self._changes
+            
+            fresh = GraphSnapshot.from_graph(self.graph_controller.get_graph())
+            current = self.snapshot
+            changed = current is None or current.fingerprint != fresh.fingerprint
+            
+            if changed:
+                fresh.write(path)
+                current = GraphSnapshot.open(path)
+            
+            with self._snapshot_lock:
+                installed = self._changes == changes
+                if installed:
+                    self.snapshot = current
+                    self.snapshot_reconciled = True
+            
+            result = current.stats()
+            result['changed'] = changed
+            result['installed'] = installed
+            return result
+        except Exception as e:
+            raise Exception(f"Erreur écriture snapshot: {e}")
+    
+    def reconcile_snapshot_async(self, path=SNAPSHOT_PATH):
+        """Réconcilier le snapshot avec la BDD dans un thread d'arrière-plan"""
+        def reconcile():
+            try:
+                result = self.write_snapshot(path)
+                state = 'mis à jour' if result['changed'] else 'déjà à jour'
+                print(f"✓ Snapshot réconcilié avec la BDD ({state})")
+            except Exception as e:
+                print(f"Avertissement: réconciliation du snapshot impossible: {e}")
+        
+        thread = threading.Thread(target=reconcile, name='snapshot-reconcile', daemon=True)
+        thread.start()
+        return thread
+    
+    def snapshot_status(self):
+        """État du snapshot servant le routage"""
+        snapshot = self.snapshot
+        status = {'active': snapshot is not None, 'reconciled': self.snapshot_reconciled}
+        if snapshot is not None:
+            status.update(snapshot.stats())
+        return status
+    
+    # =====================
+    # COMPOSANTES CONNEXES
+    # =====================
+    
+    def _update_components(self, entity, operation, data):
+        """Ajouts appliqués à l'index ; suppressions = reconstruction paresseuse"""
+        if entity == 'node' and operation == 'create':
+            self.components.add_node(data['id'])
+        elif entity == 'edge' and operation == 'upsert':
+            self.components.add_edge(data['source'], data['target'])
+        elif entity == 'graph' and operation == 'clear':
+            self.components.clear()
+        elif entity != 'constraint':
+            # Les contraintes changent les coûts, jamais la présence des arêtes
+            self.components.invalidate()
+    
+    def _component_index(self):
+        """Index des composantes, reconstruit s'il a été invalidé (une fois pour tous)"""
+        index = self.components
+        
+        def rebuild():
+            if index.rebuild(lambda: self._get_routing_graph().get_adjacency_list()):
+                COMPONENT_REBUILDS.inc()
+        
+        # Une reconstruction doublée par une écriture n'est pas installée : réessayer
+        for _ in range(3):
+            if index.valid:
+                break
+            self.single_flight.do(('components', self.graph_controller.get_etag('graph')), rebuild)
+        return index
+    
+    def get_components(self, node=None, limit=50):
+        """
+        Composantes connexes du graphe
+        
+        Args:
+            node: Si fourni, seulement la composante de ce nœud (liste complète)
+            limit: Nombre de composantes détaillées (les plus grandes)
+        
+        Returns:
+            dict: Résumé, ou None si `node` n'existe pas
+        """
+        try:
+            index = self._component_index()
+            
+            if node is not None:
+                members = index.component_of(node)
+                if members is None:
+                    return None
+                return {'node': node, 'size': len(members), 'nodes': sorted(members)}
+            
+            groups = index.groups()
+            return {
+                'count': len(groups),
+                'nodes': sum(len(members) for _, members in groups),
+                'largest': len(groups[0][1]) if groups else 0,
+                'isolated': sum(1 for _, members in groups if len(members) == 1),
+                'components': [
+                    {'representative': min(members), 'size': len(members)}
+                    for _, members in groups[:limit]
+                ]
+            }
+        except Exception as e:
+            raise Exception(f"Erreur composantes connexes: {e}")
+    
+    # =====================
+    # INDEX SPATIAL
+    # =====================
+    
+    def _update_spatial(self, entity, operation, data):
+        """Seuls les nœuds ont des coordonnées : arêtes et contraintes ignorées"""
+        if entity == 'node' and operation == 'create':
+            self.spatial.insert(data['id'], data['x'], data['y'])
+        elif entity == 'node' and operation == 'delete':
+            self.spatial.remove(data['id'])
+        elif entity == 'graph' and operation == 'clear':
+            self.spatial.clear()
+        elif entity not in ('edge', 'constraint'):
+            self.spatial.invalidate()
+    
+    def _spatial_index(self):
+        """Index spatial, reconstruit s'il a été invalidé (une fois pour tous)"""
+        index = self.spatial
+        
+        def rebuild():
+            if index.rebuild(self.storage.get_all_nodes):
+                SPATIAL_REBUILDS.inc()
+        
+        for _ in range(3):
+            if index.valid:
+                break
+            self.single_flight.do(('spatial', self.graph_controller.get_etag('graph')), rebuild)
+        return index
+    
+    def nearest_nodes(self, x, y, k=1):
+        """
+        Les k nœuds les plus proches d'un point de la carte
+        
+        Returns:
+            dict: {'x', 'y', 'nodes': [{'id', 'x', 'y', 'distance'}]} du plus proche au plus lointain
+        """
+        try:
+            index = self._spatial_index()
+            nodes = []
+            for distance, node in index.nearest(x, y, k):
+                coords = index.coords(node)
+                if coords is not None:
+                    nodes.append({'id': node, 'x': coords[0], 'y': coords[1], 'distance': distance})
+            return {'x': x, 'y': y, 'k': k, 'nodes': nodes}
+        except Exception as e:
+            raise Exception(f"Erreur plus proches nœuds: {e}")
+    
+    def get_region(self, min_x, min_y, max_x, max_y):
+        """
+        Partie du graphe visible dans un rectangle de la carte
+        
+        Les nœuds du rectangle sont trouvés par l'index spatial, puis seuls
+        ces nœuds et leurs arêtes sont lus : le coût suit la taille de la
+        zone, pas celle du graphe. Les arêtes qui sortent du rectangle sont
+        gardées, leur extrémité extérieure est donnée dans 'boundary'.
+        
+        Returns:
+            dict: {'bbox', 'nodes', 'edges', 'boundary': [{'id', 'x', 'y'}]}
+        """
+        try:
+            index = self._spatial_index()
+            inside = index.within(min_x, min_y, max_x, max_y)
+            node_rows, edge_rows = self.storage.load_region(inside) if inside else ([], [])
+            
+            members = set(inside)
+            edges = []
+            seen = set()
+            outside = set()
+            for row in edge_rows:
+                edge_key = tuple(sorted([row['source'], row['target']]))
+                if edge_key in seen:
+                    continue
+                seen.add(edge_key)
+                edges.append(Edge(row['source'], row['target'], row['weight'],
+                                  row['constraint_value']).to_dict())
+                if row['target'] not in members:
+                    outside.add(row['target'])
+            
+            boundary = []
+            for node in sorted(outside):
+                coords = index.coords(node)
+                if coords is not None:
+                    boundary.append({'id': node, 'x': coords[0], 'y': coords[1]})
+            
+            return {
+                'bbox': [min_x, min_y, max_x, max_y],
+                'nodes': [Node(row['id'], row['x'], row['y'], row['capacity']).to_dict()
+                          for row in node_rows],
+                'edges': edges,
+                'boundary': boundary
+            }
+        except Exception as e:
+            raise Exception(f"Erreur zone du graphe: {e}")
+    
+    # =====================
+    # ARBRES DES DÉPÔTS
+    # =====================
+    
+    def _update_depot_trees(self, entity, operation, data):
+        """Changements de coût réparés dans les arbres ; changements de nœuds = reconstruction"""
+        trees = self.depot_trees
+        if not trees.valid:
+            trees.invalidate()  # Une reconstruction en cours ne doit pas être installée
+            return
+        
+        try:
+            with self._depot_trees_lock:
+                self._repair_depot_trees(trees, entity, operation, data)
+        except Exception as e:
+            print(f"Avertissement: arbres des dépôts invalidés: {e}")
+            trees.invalidate()
+    
+    def _repair_depot_trees(self, trees, entity, operation, data):
+        if entity == 'constraint':
+            if operation == 'create':
+                trees.add_constraint(data['id'], data['source'], data['target'])
+                ids = [data['id']]
+            else:
+                ids = data['ids'] if operation == 'expire' else [data['id']]
+            edges = {trees.constraint_edge(constraint_id) for constraint_id in ids}
+            if None in edges:
+                trees.invalidate()
+                return
+            for source, target in edges:
+                trees.set_constraint(source, target, self._edge_constraint(source, target))
+        elif entity == 'edge' and operation == 'upsert':
+            trees.set_edge(data['source'], data['target'],
+                           (data['weight'], self._edge_constraint(data['source'], data['target'])))
+        elif entity == 'edge' and operation == 'delete':
+            trees.set_edge(data['source'], data['target'], None)
+        elif entity == 'node' and operation == 'create':
+            trees.add_node(data['id'])
+        else:
+            trees.invalidate()
+    
+    def _edge_constraint(self, source, target):
+        """Somme des contraintes valides permanentes de l'arête (comme dans load_graph)"""
+        return sum(row['constraint_value'] for row in self.storage.get_constraints_for_edge(source, target)
+                   if not row.get('schedule'))
+    
+    def _depot_tree_path(self, source, destination):
+        """
+        (chemin, distance) lus dans l'arbre de la source si elle est fréquente
+        
+        Returns:
+            tuple ou None: None si la source n'a pas (encore) d'arbre
+        """
+        trees = self.depot_trees
+        if trees.max_trees <= 0 or not trees.wants_tree(source):
+            return None
+        
+        def rebuild():
+            if trees.rebuild(lambda: self._get_routing_graph().get_adjacency_list(),
+                             self.storage.get_all_constraints):
+                DEPOT_TREE_REBUILDS.inc()
+        
+        for _ in range(3):
+            if trees.valid:
+                break
+            self.single_flight.do(('depot_trees', self.graph_controller.get_etag('graph')), rebuild)
+        
+        stats = {}
+        start = time.perf_counter()
+        if trees.tree(source, stats) is None:
+            return None
+        if stats:
+            record_algorithm('depot_tree', time.perf_counter() - start, stats)
+        
+        # Les arbres ne sont réparés que sur notification : une expiration doit être détectée avant la lecture
+        self.graph_controller.check_expirations()
+        result = trees.path(source, destination)
+        if result is not None:
+            DEPOT_TREE_HITS.inc()
+        return result
+    
+    # =====================
+    # CRÉNEAUX HORAIRES
+    # =====================
+    
+    def _time_slot_table(self):
+        """Contraintes à calendrier compilées par créneau (une fois par version du graphe) -> (ETag, table)"""
+        etag = self.graph_controller.get_etag('graph')
+        cached = self._time_slots
+        if cached is not None and cached[0] == etag:
+            return cached
+        
+        def compile_table():
+            rows = [row for row in self.storage.get_active_constraints() if row.get('schedule')]
+            return compile_time_slots(rows, TIME_SLOT_MINUTES)
+        
+        table, _ = self.single_flight.do(('time_slots', etag), compile_table)
+        self._time_slots = (etag, table)
+        return etag, table
+    
+    def _time_profile(self, departure):
+        """
+        Surcoûts du créneau de départ : O(1) dans la table compilée
+        
+        Returns:
+            tuple: (créneau, (clé, {(a, b): surcoût}) ou None si aucune contrainte à cette heure)
+        """
+        etag, table = self._time_slot_table()
+        slot = table.slot_of(departure)
+        index = table.slot_profile[slot]
+        extras = table.profiles[index]
+        if not extras:
+            return slot, None
+        return slot, ((etag, index), extras)
     
-    def find_shortest_path(self, source, destination, custom_constraints=None, save_to_history=True, user_notes=None):
+    def get_time_slots(self, at=None):
+        """
+        Table des créneaux horaires ; avec une date, le détail de son créneau
+        
+        Args:
+            at: datetime optionnelle (heure locale)
+        """
+        try:
+            _, table = self._time_slot_table()
+            result = table.stats()
+            if at is not None:
+                slot = table.slot_of(at)
+                day, start, end = table.slot_bounds(slot)
+                extras = table.profiles[table.slot_profile[slot]]
+                result['slot'] = {
+                    'index': slot,
+                    'day': day,
+                    'start': start,
+                    'end': end,
+                    'profile': table.slot_profile[slot],
+                    'edges': [{'source': a, 'target': b, 'extra': extra}
+                              for (a, b), extra in sorted(extras.items())]
+                }
+            return result
+        except Exception as e:
+            raise Exception(f"Erreur créneaux horaires: {e}")
+    
+    # =====================
+    # POOL DE CALCUL
+    # =====================
+    
+    def _executor_graph(self):
+        """Graphe à charger dans les workers : le snapshot mappé s'il est valide (aucune copie)"""
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.path:
+            return snapshot.path
+        return self.graph_controller.get_graph()
+    
+    def _execute(self, name, args, timeout=None, task_id=None):
+        """
+        Exécuter un calcul dans le pool de processus (graphe de la version courante)
+        
+        Returns:
+            dict: Résultat du calcul (avec 'duration' et 'stats' mesurés dans le worker)
+        """
+        self.executor.ensure_graph(self._executor_version(), self._executor_graph)
+        return self.executor.run(name, args, timeout, task_id)
+    
+    def _execute_many(self, name, args_list, timeout=None, task_id=None):
+        """Plusieurs calculs en parallèle dans le pool (même graphe), résultats dans l'ordre"""
+        self.executor.ensure_graph(self._executor_version(), self._executor_graph)
+        return self.executor.run_many(name, args_list, timeout, task_id)
+    
+    def _executor_version(self):
+        """
+        Version du graphe chargé dans le pool : (ETag du graphe, empreinte du snapshot)
+        
+        L'ETag est lu en premier : il détecte les expirations, qui abandonnent
+        le snapshot ; lu ensuite, le snapshot est celui de cette version.
+        """
+        etag = self.graph_controller.get_etag('graph')
+        snapshot = self.snapshot
+        return etag, snapshot.fingerprint if snapshot is not None else None
+    
+    def _coalesced(self, name, params, compute, timeout=None, task_id=None):
+        """
+        Partager le résultat entre requêtes identiques simultanées
+        
+        La clé inclut l'ETag du graphe (contraintes actives comprises) : une
+        requête arrivée après une modification lance son propre calcul.
+        Un calcul lancé avec ?task=<id> reste individuel (annulable seul).
+        """
+        if task_id is not None:
+            ALGO_COALESCING.inc(algorithm=name, result='computed')
+            return compute()
+        
+        if timeout is None and self.executor is not None:
+            timeout = self.executor.default_timeout
+        key = (name, self.graph_controller.get_etag('graph')) + tuple(params)
+        try:
+            result, shared = self.single_flight.do(key, compute, timeout)
+        except FlightTimeout as e:
+            raise AlgorithmTimeout(f"Calcul '{name}' : {e}")
+        ALGO_COALESCING.inc(algorithm=name, result='coalesced' if shared else 'computed')
+        return result
+    
+    def cancel_task(self, task_id):
+        """Annuler un calcul lancé avec ?task=<id> ; False s'il n'est pas en cours"""
+        return self.executor is not None and self.executor.cancel(task_id)
+    
+    def executor_status(self):
+        """État du pool de calcul (file d'attente, workers occupés)"""
+        if self.executor is None:
+            status = {'workers': 0, 'mode': 'inline'}
+        else:
+            status = self.executor.status()
+            status['mode'] = 'process_pool'
+        status['coalescing'] = self.single_flight.stats()
+        status['depot_trees'] = self.depot_trees.stats()
+        return status
+    
+    def find_shortest_path(self, source, destination, custom_constraints=None, save_to_history=True,
+                           user_notes=None, timeout=None, task_id=None, departure=None):
         """
         Trouver le plus court chemin avec Dijkstra
         
@@ -22,20 +540,37 @@ class AlgorithmController:
             custom_constraints: dict optionnel {"A-B": 5} pour test temporaire
             save_to_history: Sauvegarder dans l'historique ?
             user_notes: Notes utilisateur pour l'historique
+            timeout: Délai du calcul en secondes (pool de processus)
+            task_id: Identifiant du calcul, pour pouvoir l'annuler
+            departure: datetime optionnelle : applique les contraintes à calendrier
+                       de son créneau (sans elle, seules les permanentes comptent)
         """
         try:
-            # Récupérer le graphe (avec contraintes actives de la BDD déjà intégrées)
-            graph = self.graph_controller.get_graph()
-            
             # Si contraintes custom fournies, on les merge avec celles de la BDD
             # Sinon on utilise juste celles déjà dans le graphe
             constraints_to_apply = custom_constraints or {}
             
-            # Convertir en liste d'adjacence
-            adj_list = graph.get_adjacency_list(constraints_to_apply)
+            # Heure de départ : surcoûts de son créneau, lus dans la table compilée
+            slot, profile = self._time_profile(departure) if departure is not None else (None, None)
             
-            # Appeler Dijkstra
-            path, distance = dijkstra(adj_list, source, destination)
+            tree_path = None
+            if not constraints_to_apply and profile is None:
+                tree_path = self._depot_tree_path(source, destination)
+            if tree_path is not None:
+                # Source fréquente (dépôt) : chemin lu dans son arbre, tenu à jour
+                path, distance = tree_path
+            elif self._component_index().disconnected(source, destination):
+                # Deux composantes différentes : inatteignable, sans charger le graphe
+                ALGO_DISCONNECTED.inc()
+                path, distance = None, float('inf')
+            else:
+                path, distance = self._coalesced(
+                    'dijkstra', (source, destination, json.dumps(constraints_to_apply, sort_keys=True),
+                                 profile[0] if profile else None),
+                    lambda: self._compute_path(source, destination, constraints_to_apply, timeout, task_id,
+                                               profile),
+                    timeout, task_id
+                )
             
             result = {
                 'path': path,
@@ -44,119 +579,503 @@ class AlgorithmController:
                 'destination': destination,
                 'custom_constraints_applied': constraints_to_apply
             }
+            if departure is not None:
+                result['departure'] = departure.isoformat()
+                result['time_slot'] = slot
+                result['scheduled_constraints_applied'] = len(profile[1]) if profile else 0
             
             # Sauvegarder dans l'historique si demandé
-            if save_to_history and path:
+            # (le replay ne connaît pas l'heure de départ : pas d'historique avec des contraintes à calendrier)
+            if save_to_history and path and profile is None:
                 self._save_path_to_history(source, destination, path, distance, 
                                            constraints_to_apply, user_notes)
             
             return result
             
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
         except Exception as e:
             raise Exception(f"Erreur calcul Dijkstra: {e}")
     
-    def _save_path_to_history(self, source, destination, path, distance, 
-                              constraints_snapshot, user_notes):
-        """Sauvegarder un calcul dans l'historique"""
+    def _compute_path(self, source, destination, constraints_to_apply, timeout, task_id, profile=None):
+        """Calcul Dijkstra (pool de processus ou thread courant) -> (chemin, distance)"""
+        if self.executor is not None:
+            result = self._execute('dijkstra', (source, destination, constraints_to_apply, profile),
+                                   timeout, task_id)
+            record_algorithm('dijkstra', result['duration'], result['stats'])
+            return result['path'], result['distance']
+        
+        # Récupérer le graphe (avec contraintes actives de la BDD déjà intégrées)
+        graph = self._get_routing_graph()
+        
+        # Convertir en liste d'adjacence (+ surcoûts du créneau de départ)
+        adj_list = graph.get_adjacency_list(constraints_to_apply)
+        if profile is not None:
+            adj_list = apply_profile(adj_list, profile[1])
+        
+        # Appeler Dijkstra
+        stats = {}
+        start = time.perf_counter()
+        path, distance = dijkstra(adj_list, source, destination, stats)
+        record_algorithm('dijkstra', time.perf_counter() - start, stats)
+        return path, distance
+    
+    def assign_nearest_depots(self, depots, custom_constraints=None, timeout=None, task_id=None):
+        """
+        Dépôt le plus proche de chaque point de collecte (Dijkstra multi-sources)
+        
+        Un seul parcours du graphe au lieu d'un Dijkstra par couple (dépôt, nœud).
+        
+        Args:
+            depots: Liste des nœuds dépôts
+            custom_constraints: dict optionnel {"A-B": 5} pour test temporaire
+        
+        Returns:
+            dict: Partition en colonnes (voir nearest_depot_partition)
+        """
         try:
-            cursor = self.graph_controller.db.get_cursor()
+            if not depots:
+                raise ValueError("Au moins un dépôt requis")
+            constraints_to_apply = custom_constraints or {}
             
-            import json
-            cursor.execute("""
-                INSERT INTO path_history 
-                (source, destination, path, distance, constraints_snapshot, user_notes)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (source, destination, json.dumps(path), distance, 
-                  json.dumps(constraints_snapshot), user_notes))
+            return self._coalesced(
+                'nearest_depot', (tuple(depots), json.dumps(constraints_to_apply, sort_keys=True)),
+                lambda: self._compute_nearest_depots(depots, constraints_to_apply, timeout, task_id),
+                timeout, task_id
+            )
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur affectation aux dépôts: {e}")
+    
+    def _compute_nearest_depots(self, depots, constraints_to_apply, timeout, task_id):
+        if self.executor is not None:
+            result = self._execute('nearest_depot', (list(depots), constraints_to_apply), timeout, task_id)
+            record_algorithm('nearest_depot', result['duration'], result['stats'])
+            return result['partition']
+        
+        adj_list = self._get_routing_graph().get_adjacency_list(constraints_to_apply)
+        stats = {}
+        start = time.perf_counter()
+        partition = nearest_depot_partition(adj_list, depots, stats)
+        record_algorithm('nearest_depot', time.perf_counter() - start, stats)
+        return partition
+    
+    def reachable_within(self, source, budget, custom_constraints=None, with_frontier=False,
+                         timeout=None, task_id=None):
+        """
+        Points atteignables depuis source pour un coût maximum (isochrone)
+        
+        Args:
+            source: Nœud de départ (ex: un dépôt)
+            budget: Coût maximum (poids + contraintes valides)
+            custom_constraints: dict optionnel {"A-B": 5} pour test temporaire
+            with_frontier: Ajouter les arêtes qui sortent de la zone
+        
+        Returns:
+            dict: Nœuds atteints en colonnes (voir bounded_dijkstra)
+        """
+        try:
+            if budget < 0:
+                raise ValueError("Le budget doit être positif")
+            constraints_to_apply = custom_constraints or {}
             
-            result = cursor.fetchone()
-            self.graph_controller.db.commit()
-            cursor.close()
+            reach = self._coalesced(
+                'reachable',
+                (source, budget, json.dumps(constraints_to_apply, sort_keys=True), with_frontier),
+                lambda: self._compute_reachable(source, budget, constraints_to_apply, with_frontier,
+                                                timeout, task_id),
+                timeout, task_id
+            )
+            return {'source': source, 'budget': budget, 'count': len(reach['nodes']), **reach}
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur zone atteignable: {e}")
+    
+    def _compute_reachable(self, source, budget, constraints_to_apply, with_frontier, timeout, task_id):
+        if self.executor is not None:
+            result = self._execute('reachable', (source, budget, constraints_to_apply, with_frontier),
+                                   timeout, task_id)
+            record_algorithm('reachable', result['duration'], result['stats'])
+            return result['reach']
+        
+        adj_list = self._get_routing_graph().get_adjacency_list(constraints_to_apply)
+        stats = {}
+        start = time.perf_counter()
+        reach = bounded_dijkstra(adj_list, source, budget, with_frontier, stats)
+        record_algorithm('reachable', time.perf_counter() - start, stats)
+        return reach
+    
+    def partition_zones(self, k, tolerance=0.1, timeout=None, task_id=None):
+        """
+        Découper le graphe en k zones de collecte contiguës, équilibrées en capacité
+        
+        Args:
+            k: Nombre de zones (camions)
+            tolerance: Dépassement toléré de la charge moyenne (0.1 = 10 %)
+        
+        Returns:
+            dict: Affectation en colonnes et bilan par zone (voir partition_graph)
+        """
+        try:
+            if k < 1:
+                raise ValueError("Le nombre de zones doit être au moins 1")
+            if tolerance < 0:
+                raise ValueError("La tolérance doit être positive")
+            
+            return self._coalesced(
+                'partition', (k, tolerance),
+                lambda: self._compute_partition(k, tolerance, timeout, task_id),
+                timeout, task_id
+            )
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur découpage en zones: {e}")
+    
+    def _compute_partition(self, k, tolerance, timeout, task_id):
+        if self.executor is not None:
+            result = self._execute('partition', (k, tolerance), timeout, task_id)
+            record_algorithm('partition', result['duration'], result['stats'])
+            return result['partition']
+        
+        graph = self._get_routing_graph()
+        stats = {}
+        start = time.perf_counter()
+        partition = partition_graph(graph.get_adjacency_list(), k, graph.get_capacities(),
+                                    tolerance, stats=stats)
+        record_algorithm('partition', time.perf_counter() - start, stats)
+        return partition
+    
+    def plan_collection_tours(self, depot, points=None, vehicle_capacity=None, method='savings',
+                              time_budget=2.0, custom_constraints=None, with_paths=False,
+                              timeout=None, task_id=None):
+        """
+        Planifier les tournées de collecte d'un dépôt (capacité des camions)
+        
+        Args:
+            depot: Nœud dépôt
+            points: Points à collecter (None = tous les nœuds de capacité > 0)
+            vehicle_capacity: Capacité d'un camion (None = illimitée)
+            method: Construction 'savings' (Clarke & Wright) ou 'nearest'
+            time_budget: Temps accordé à l'amélioration 2-opt / or-opt (secondes)
+            custom_constraints: dict optionnel {"A-B": 5} pour test temporaire
+            with_paths: Ajouter le chemin complet de chaque tournée
+        
+        Returns:
+            dict: Tournées, charges et distances (voir plan_tours)
+        """
+        try:
+            if not depot:
+                raise ValueError("Dépôt requis")
+            if method not in ('savings', 'nearest'):
+                raise ValueError(f"Méthode inconnue '{method}' (savings ou nearest)")
+            constraints_to_apply = custom_constraints or {}
+            points = sorted(set(points)) if points is not None else None
             
-            return result['id']
+            args = (depot, points, vehicle_capacity, method, time_budget, constraints_to_apply, with_paths)
+            return self._coalesced(
+                'tours', (json.dumps(args, sort_keys=True),),
+                lambda: self._compute_tours(args, timeout, task_id),
+                timeout, task_id
+            )
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur planification des tournées: {e}")
+    
+    def _compute_tours(self, args, timeout, task_id):
+        if self.executor is not None:
+            result = self._execute('tours', args, timeout, task_id)
+            record_algorithm('tours', result['duration'], result['stats'])
+            return result['tours']
+        
+        depot, points, vehicle_capacity, method, time_budget, constraints_to_apply, with_paths = args
+        graph = self._get_routing_graph()
+        capacities = graph.get_capacities()
+        if points is None:
+            points = [node for node, capacity in capacities.items() if capacity > 0 and node != depot]
+        
+        stats = {}
+        start = time.perf_counter()
+        tours = plan_tours(graph.get_adjacency_list(constraints_to_apply), depot, points, capacities,
+                           vehicle_capacity, method, time_budget, with_paths, stats)
+        record_algorithm('tours', time.perf_counter() - start, stats)
+        return tours
+    
+    def edge_criticality(self, samples=None, seed=0, top=20, custom_constraints=None,
+                         timeout=None, task_id=None):
+        """
+        Routes les plus critiques : intermédiarité des arêtes (Brandes)
+        
+        Les sources sont réparties en lots calculés en parallèle dans le pool.
+        Le résultat est gardé pour la version du graphe (contraintes actives
+        comprises) : tant qu'elle ne change pas, seul le classement est refait.
+        
+        Args:
+            samples: Nombre de sources tirées au hasard (None = toutes : exact)
+            seed: Graine du tirage (même échantillon pour la même graine)
+            top: Nombre d'arêtes classées
+            custom_constraints: dict optionnel {"A-B": 5} pour test temporaire
+        
+        Returns:
+            dict: {'edges': [{'source', 'target', 'betweenness', 'share'}], 'exact', 'sources', ...}
+        """
+        try:
+            if samples is not None and samples < 1:
+                raise ValueError("Le nombre de sources échantillonnées doit être au moins 1")
+            constraints_to_apply = custom_constraints or {}
+            params = (samples, seed, json.dumps(constraints_to_apply, sort_keys=True))
+            
+            # ETag lu AVANT le calcul : au pire le résultat gardé est plus récent
+            etag = self.graph_controller.get_etag('graph')
+            with self._criticality_lock:
+                cached = self._criticality_cache.get(params)
+            hit = cached is not None and cached[0] == etag
+            if hit:
+                result = cached[1]
+            else:
+                result = self._coalesced(
+                    'betweenness', params,
+                    lambda: self._compute_betweenness(samples, seed, constraints_to_apply, timeout, task_id),
+                    timeout, task_id
+                )
+                with self._criticality_lock:
+                    self._criticality_cache = {
+                        key: entry for key, entry in self._criticality_cache.items() if entry[0] == etag
+                    }
+                    self._criticality_cache[params] = (etag, result)
+            
+            return {
+                'nodes': result['nodes'],
+                'sources': result['sources'],
+                'exact': result['sources'] == result['nodes'],
+                'seed': seed if result['sources'] != result['nodes'] else None,
+                'cached': hit,
+                'elapsed_s': result['elapsed_s'],
+                'edges': rank_edges(result['scores'], result['nodes'], result['sources'], top)
+            }
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur intermédiarité des arêtes: {e}")
+    
+    def _compute_betweenness(self, samples, seed, constraints_to_apply, timeout, task_id):
+        start = time.perf_counter()
+        if self.executor is not None:
+            nodes = [row['id'] for row in self.storage.get_all_nodes()]
+            sources = sample_sources(nodes, samples, seed)
+            # Plus de lots que de workers : un lot lent ne retarde pas tout le calcul
+            batches = [sources[i::self.executor.size * 4] for i in range(self.executor.size * 4)]
+            results = self._execute_many(
+                'betweenness', [(batch, constraints_to_apply) for batch in batches if batch], timeout, task_id
+            )
+            scores = merge_scores(result['scores'] for result in results)
+            stats = merge_scores(result['stats'] for result in results)
+        else:
+            adj_list = self._get_routing_graph().get_adjacency_list(constraints_to_apply)
+            nodes = list(adj_list)
+            sources = sample_sources(nodes, samples, seed)
+            stats = {}
+            scores = edge_betweenness(adj_list, sources, stats)
+        
+        elapsed = time.perf_counter() - start
+        record_algorithm('betweenness', elapsed, stats)
+        return {'scores': scores, 'nodes': len(nodes), 'sources': len(sources), 'elapsed_s': elapsed}
+    
+    def compare_scenarios(self, pairs, scenarios, with_paths=False, timeout=None, task_id=None):
+        """
+        Évaluer plusieurs scénarios de contraintes sur les mêmes trajets
+        
+        Les scénarios sont répartis en lots calculés en parallèle dans le pool,
+        chaque worker gardant le graphe de base et ses arbres de plus courts
+        chemins : un trajet qu'un scénario ne peut pas changer n'est pas recalculé.
+        
+        Args:
+            pairs: [(source, destination)]
+            scenarios: [{'name', 'constraints': {"A-B": valeur}}]
+            with_paths: Ajouter les chemins
+        
+        Returns:
+            dict: Tableau comparatif en colonnes (une entrée par trajet)
+        """
+        try:
+            if not pairs:
+                raise ValueError("Au moins un trajet (source, destination) requis")
+            if not scenarios:
+                raise ValueError("Au moins un scénario requis")
+            pairs = [tuple(pair) for pair in pairs]
+            scenarios = [
+                {'name': scenario.get('name') or f"scenario_{i + 1}",
+                 'constraints': scenario.get('constraints') or {}}
+                for i, scenario in enumerate(scenarios)
+            ]
+            
+            comparison = self._coalesced(
+                'scenarios', (json.dumps([pairs, scenarios, with_paths], sort_keys=True),),
+                lambda: self._compute_scenarios(pairs, scenarios, with_paths, timeout, task_id),
+                timeout, task_id
+            )
+            return {'pairs': [list(pair) for pair in pairs], **comparison}
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
+        except Exception as e:
+            raise Exception(f"Erreur comparaison de scénarios: {e}")
+    
+    def _compute_scenarios(self, pairs, scenarios, with_paths, timeout, task_id):
+        start = time.perf_counter()
+        if self.executor is not None:
+            # Un lot par worker (au plus) : les arbres de base sont calculés une fois par worker
+            count = min(self.executor.size, len(scenarios))
+            batches = [scenarios[i::count] for i in range(count)]
+            results = self._execute_many(
+                'scenarios', [(pairs, batch, with_paths) for batch in batches], timeout, task_id
+            )
+            # Lot i = scénarios i, i + count, ... : remettre l'ordre de la requête
+            ordered = [None] * len(scenarios)
+            for i, result in enumerate(results):
+                ordered[i::count] = result['comparison']['scenarios']
+            comparison = {'baseline': results[0]['comparison']['baseline'], 'scenarios': ordered}
+            stats = merge_scores(result['stats'] for result in results)
+        else:
+            stats = {}
+            comparison = evaluate_scenarios(self._get_routing_graph().get_adjacency_list(),
+                                            pairs, scenarios, with_paths, stats=stats)
+        
+        elapsed = time.perf_counter() - start
+        record_algorithm('scenarios', elapsed, stats)
+        comparison['pairs_reused'] = int(stats.get('pairs_reused', 0))
+        comparison['pairs_recomputed'] = int(stats.get('pairs_recomputed', 0))
+        comparison['elapsed_s'] = elapsed
+        return comparison
+    
+    def _save_path_to_history(self, source, destination, path, distance, 
+                              constraints_snapshot, user_notes):
+        """Sauvegarder un calcul dans l'historique (payloads dédupliqués)"""
+        try:
+            return self.storage.save_path_history(source, destination, path, distance,
+                                                  constraints_snapshot, user_notes)
         except Exception as e:
-            self.graph_controller.db.rollback()
             print(f"Avertissement: Impossible de sauvegarder dans l'historique: {e}")
     
     def get_path_history(self, limit=20):
         """Récupérer l'historique des calculs"""
         try:
-            cursor = self.graph_controller.db.get_cursor()
-            cursor.execute("""
-                SELECT * FROM path_history
-                ORDER BY calculated_at DESC
-                LIMIT %s
-            """, (limit,))
-            
-            results = cursor.fetchall()
-            cursor.close()
-            
-            import json
-            history = []
-            for row in results:
-                item = dict(row)
-                
-                # Convertir path si c'est une string JSON
-                item['path'] = json.loads(item['path']) if isinstance(item['path'], str) else item['path']
-                
-                # Convertir constraints_snapshot si c'est une string JSON
-                item['constraints_snapshot'] = json.loads(item['constraints_snapshot']) if isinstance(item['constraints_snapshot'], str) else item['constraints_snapshot']
-                
-                # FIX: Convertir calculated_at en ISO string
-                if item.get('calculated_at'):
-                    item['calculated_at'] = item['calculated_at'].isoformat()
-                
-                history.append(item)
-            
-            return history
+            return self.storage.get_path_history(limit)
         except Exception as e:
             raise Exception(f"Erreur récupération historique: {e}")
     
     def replay_path_calculation(self, history_id):
         """Recalculer un chemin depuis l'historique"""
         try:
-            cursor = self.graph_controller.db.get_cursor()
-            cursor.execute("SELECT * FROM path_history WHERE id = %s", (history_id,))
-            result = cursor.fetchone()
-            cursor.close()
+            original = self.storage.get_path_history_entry(history_id)
             
-            if not result:
+            if not original:
                 raise ValueError("Calcul introuvable dans l'historique")
             
-            import json
-            constraints = json.loads(result['constraints_snapshot']) if isinstance(result['constraints_snapshot'], str) else result['constraints_snapshot']
-            
             # Recalculer avec les mêmes paramètres
             new_result = self.find_shortest_path(
-                result['source'], 
-                result['destination'],
-                custom_constraints=constraints,
+                original['source'], 
+                original['destination'],
+                custom_constraints=original['constraints_snapshot'],
                 save_to_history=False,
                 user_notes=f"Replay du calcul #{history_id}"
             )
             
             # Ajouter l'info de l'original
-            original = dict(result)
-            original['path'] = json.loads(result['path']) if isinstance(result['path'], str) else result['path']
-            
-            # FIX: Convertir calculated_at en ISO string
-            if original.get('calculated_at'):
-                original['calculated_at'] = original['calculated_at'].isoformat()
-            
             new_result['original_calculation'] = original
             
             return new_result
         except Exception as e:
             raise Exception(f"Erreur replay: {e}")
     
-    def color_graph(self):
-        """Colorier le graphe"""
+    def replay_history_bulk(self, limit=1000, workers=None):
+        """
+        Rejouer en masse l'historique contre le graphe actuel
+        
+        Le graphe est chargé une seule fois ; les calculs sont regroupés par
+        (source, contraintes) et répartis sur un pool de processus.
+        
+        Args:
+            limit: Nombre d'entrées d'historique (les plus récentes)
+            workers: Nombre de processus (None = nb de CPU)
+        
+        Returns:
+            generator: {'type': 'diff', ...} pour chaque entrée, puis
+                       {'type': 'summary', ...} à la fin
+        """
         try:
-            graph = self.graph_controller.get_graph()
-            adj_list = graph.get_adjacency_list()
+            history = self.storage.get_path_history(limit)
             
-            coloring = graph_coloring(adj_list)
+            # Les workers mappent le snapshot s'il existe (pas de copie du graphe)
+            snapshot = self.snapshot
+            graph = snapshot.path if snapshot is not None and snapshot.path else self.graph_controller.get_graph()
+        except Exception as e:
+            raise Exception(f"Erreur replay en masse: {e}")
+        
+        # Regrouper par source + contraintes : un Dijkstra par groupe
+        groups = {}
+        for item in history:
+            constraints = item['constraints_snapshot'] or {}
+            key = (item['source'], json.dumps(constraints, sort_keys=True))
+            if key not in groups:
+                groups[key] = (item['source'], constraints, [])
+            groups[key][2].append(
+                (item['id'], item['destination'], item['path'], item['distance'])
+            )
+        
+        return self._iter_bulk_replay(graph, groups, workers)
+    
+    def _iter_bulk_replay(self, graph, groups, workers):
+        """Générateur des diffs du replay en masse, suivi du résumé"""
+        summary = ReplaySummary()
+        for diff in replay_bulk(graph, list(groups.values()), workers):
+            summary.add(diff)
+            diff['type'] = 'diff'
+            yield diff
+        
+        result = summary.to_dict()
+        result['type'] = 'summary'
+        result['groups'] = len(groups)
+        yield result
+    
+    def compact_path_history(self, batch_size=500):
+        """
+        Migrer les anciennes lignes (JSON en clair) vers les payloads dédupliqués
+        
+        Returns:
+            int: Nombre de lignes migrées
+        """
+        try:
+            return self.storage.compact_path_history(batch_size)
+        except Exception as e:
+            raise Exception(f"Erreur compactage historique: {e}")
+    
+    def get_history_storage_stats(self):
+        """
+        Mesurer le gain de stockage de l'historique
+        
+        Compare la taille des payloads stockés à la taille qu'aurait le JSON
+        en clair répété sur chaque ligne.
+        """
+        try:
+            stats = self.storage.get_history_storage_stats()
+            
+            inline = stats['inline_payload_bytes']
+            stats['payload_compression_ratio'] = (
+                round(inline / stats['stored_payload_bytes'], 2) if stats['stored_payload_bytes'] else None
+            )
+            
+            return stats
+        except Exception as e:
+            raise Exception(f"Erreur statistiques historique: {e}")
+    
+    def color_graph(self, timeout=None, task_id=None):
+        """Colorier le graphe"""
+        try:
+            coloring = self._coalesced('coloring', (), lambda: self._compute_coloring(timeout, task_id),
+                                       timeout, task_id)
             stats = get_coloring_stats(coloring)
             chromatic_number = max(coloring.values()) + 1 if coloring else 0
             
@@ -166,5 +1085,25 @@ class AlgorithmController:
                 'chromatic_number': chromatic_number
             }
             
+        except (AlgorithmTimeout, AlgorithmCancelled):
+            raise
         except Exception as e:
-            raise Exception(f"Erreur coloriage: {e}")
\ No newline at end of file
+            raise Exception(f"Erreur coloriage: {e}")
+    
+    def _compute_coloring(self, timeout, task_id):
+        """Coloriage (pool de processus ou thread courant) -> {nœud: couleur}"""
+        if self.executor is not None:
+            result = self._execute('coloring', (), timeout, task_id)
+            record_algorithm('coloring', result['duration'], result['stats'])
+            return result['coloring']
+        
+        graph = self._get_routing_graph()
+        adj_list = graph.get_adjacency_list()
+        
+        start = time.perf_counter()
+        coloring = graph_coloring(adj_list)
+        record_algorithm('coloring', time.perf_counter() - start, {
+            'nodes_settled': len(coloring),
+            'edges_relaxed': sum(len(neighbors) for neighbors in adj_list.values())
+        })
+        return coloring
@@ -1,16 +1,244 @@
 import sys
 import os
+import threading
+import time
+import uuid
+from datetime import datetime
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from backend.database.connection import Database
+from backend.storage import get_storage
+from backend.algorithms.time_slots import parse_schedule
 from backend.models import Node, Edge, Graph
+from backend.monitoring.metrics import GRAPH_LOAD_SECONDS
+from config.config import CHANGE_LOG_SIZE
+
+
+def _serialize_dates(row):
+    """Convertir created_at / expires_at en ISO string"""
+    if row.get('created_at'):
+        row['created_at'] = row['created_at'].isoformat()
+    if row.get('expires_at'):
+        row['expires_at'] = row['expires_at'].isoformat()
+    return row
+
+
+# Versions touchées par chaque modification (entité, opération)
+# La suppression d'un nœud supprime aussi ses contraintes (ON DELETE CASCADE)
+_VERSIONS_AFFECTED = {
+    'node': {'create': ('graph',), 'delete': ('graph', 'constraints')},
+    'edge': {'upsert': ('graph',), 'delete': ('graph',)},
+    'constraint': {'create': ('graph', 'constraints'), 'toggle': ('graph', 'constraints'),
+                   'expire': ('graph', 'constraints')},
+    'graph': {'clear': ('graph', 'constraints')},
+}
 
 
 class GraphController:
     """Contrôleur pour gérer le graphe (CRUD)"""
     
-    def __init__(self):
-        self.db = Database()
+    # Abonnés aux modifications du graphe (partagés par toutes les instances)
+    _listeners = []
+    
+    # Versions du graphe et des contraintes (ETag), préfixées par un identifiant
+    # de démarrage : les compteurs repartent de 0 à chaque lancement
+    instance_id = uuid.uuid4().hex[:8]
+    _versions = {'graph': 0, 'constraints': 0}
+    _version_lock = threading.Lock()
+    _expiry_queue = None  # [(expires_at, id)] des contraintes valides, None = à recharger
+    _expiry_checked_at = datetime.now()  # Expirations déjà notifiées jusqu'à cette date
+    _change_version = None  # Dernière version du journal des modifications, None = à lire
+
+    # Mode prefork : versions en mémoire partagée (SharedState), écrites par le seul writer
+    _shared = None
+    _shared_writer = False
+
+    def __init__(self, storage=None):
+        # Backend de stockage (PostgreSQL ou SQLite en processus, cf. STORAGE_BACKEND)
+        self.storage = storage or get_storage()
+
+    @classmethod
+    def attach_shared_state(cls, state, writer=False):
+        """
+        Partager les versions entre les processus du mode prefork
+
+        Le writer (seul processus qui modifie le graphe) les incrémente ;
+        les autres processus les lisent et ne détectent pas les expirations.
+        """
+        cls._shared = state
+        cls._shared_writer = writer
+    
+    @classmethod
+    def subscribe(cls, callback):
+        """S'abonner aux modifications : callback(entité, opération, données)"""
+        cls._listeners.append(callback)
+    
+    def _notify(self, entity, operation, **data):
+        """
+        Enregistrer une modification (appelé après le commit)
+
+        Incrémente les versions (ETag), ajoute la modification au journal
+        (GET /graph/changes) puis prévient les abonnés ; data['version']
+        est la version du journal (None si l'écriture du journal a échoué).
+        """
+        with self._version_lock:
+            for kind in _VERSIONS_AFFECTED[entity][operation]:
+                self._versions[kind] += 1
+                if self._shared is not None:
+                    self._shared.increment(kind)
+            if entity in ('constraint', 'node', 'graph') and operation != 'expire':
+                GraphController._expiry_queue = None
+
+        version = self._record_change(entity, operation, data)
+        data['version'] = version
+
+        for callback in list(self._listeners):
+            try:
+                callback(entity, operation, data)
+            except Exception as e:
+                print(f"Avertissement: abonné aux modifications en erreur: {e}")
+
+    def _record_change(self, entity, operation, data):
+        """Ajouter la modification au journal (purgé au-delà de CHANGE_LOG_SIZE versions)"""
+        try:
+            version = self.storage.record_change(entity, operation, data)
+            with self._version_lock:
+                if self._change_version is None or version > self._change_version:
+                    GraphController._change_version = version
+            if self._shared is not None:
+                self._shared.set_max('change', version)
+            if version % 500 == 0:
+                self.storage.prune_changes(version - CHANGE_LOG_SIZE)
+            return version
+        except Exception as e:
+            print(f"Avertissement: journal des modifications non mis à jour: {e}")
+            return None
+
+    # =====================
+    # VERSIONS
+    # =====================
+
+    def get_version(self, kind):
+        """Version courante de 'graph' ou 'constraints' (après prise en compte des expirations)"""
+        self.check_expirations()
+        if self._shared is not None:
+            return self._shared.get(kind)
+        return self._versions[kind]
+
+    def get_versions(self):
+        """Versions courantes {'graph', 'constraints'} (sans vérifier les expirations)"""
+        if self._shared is not None:
+            return {kind: self._shared.get(kind) for kind in ('graph', 'constraints')}
+        with self._version_lock:
+            return dict(self._versions)
+
+    def get_etag(self, kind):
+        """ETag (faible) de la version courante"""
+        return f'W/"{kind}-{self.instance_id}-{self.get_version(kind)}"'
+
+    def check_expirations(self):
+        """
+        Détecter les contraintes arrivées à expiration depuis le dernier appel
+
+        Une expiration change les contraintes valides sans aucune écriture :
+        elle est notifiée comme une modification ('constraint', 'expire').
+
+        Returns:
+            list: IDs des contraintes expirées
+        """
+        if self._shared is not None and not self._shared_writer:
+            return []  # Détectées par le writer (mode prefork)
+
+        now = datetime.now()
+        with self._version_lock:
+            queue = self._expiry_queue
+            checked_at = self._expiry_checked_at
+        if queue is None:
+            # Depuis le dernier contrôle, pas depuis maintenant : une contrainte
+            # expirée entre-temps (file invalidée par une écriture) doit être notifiée
+            rows = self.storage.get_all_constraints()
+            queue = sorted(
+                (row['expires_at'], row['id']) for row in rows
+                if row['is_active'] and row.get('expires_at') and row['expires_at'] > checked_at
+            )
+            with self._version_lock:
+                GraphController._expiry_queue = queue
+
+        with self._version_lock:
+            if queue is not self._expiry_queue:
+                return []
+            GraphController._expiry_checked_at = max(now, self._expiry_checked_at)
+            if not queue or queue[0][0] > now:
+                return []
+            expired = []
+            while queue and queue[0][0] <= now:
+                expired.append(queue.pop(0)[1])
+
+        self._notify('constraint', 'expire', ids=expired)
+        return expired
+
+    # =====================
+    # JOURNAL DES MODIFICATIONS (synchronisation par delta)
+    # =====================
+
+    def get_change_version(self):
+        """Dernière version du journal des modifications"""
+        if self._shared is not None and self._shared.get('change') >= 0:
+            return self._shared.get('change')
+        if self._change_version is None:
+            latest = self.storage.get_change_bounds()[1]
+            with self._version_lock:
+                if self._change_version is None or latest > self._change_version:
+                    GraphController._change_version = latest
+        return self._change_version
+
+    def get_changes(self, since, limit=1000):
+        """
+        Modifications du graphe depuis une version
+
+        Le client charge GET /graph (header X-Change-Version), puis ne demande
+        que les modifications suivantes. Les modifications sont idempotentes :
+        en rejouer une déjà vue est sans effet.
+
+        Args:
+            since: Dernière version connue du client
+            limit: Nombre maximum de modifications retournées
+
+        Returns:
+            dict: changes, version (à renvoyer comme since), has_more ;
+                  resync_required=True si le journal ne couvre plus 'since'
+                  (client trop en retard, ou version d'une autre base)
+        """
+        try:
+            self.check_expirations()
+            oldest, latest = self.storage.get_change_bounds()
+
+            if since > latest or (oldest is not None and since < oldest - 1):
+                return {
+                    'resync_required': True,
+                    'since': since,
+                    'version': latest,
+                    'has_more': False,
+                    'changes': []
+                }
+
+            changes = self.storage.get_changes(since, limit)
+            for change in changes:
+                change['changed_at'] = change['changed_at'].isoformat()
+
+            has_more = len(changes) == limit
+            version = changes[-1]['version'] if has_more else max(
+                [latest] + [change['version'] for change in changes]
+            )
+
+            return {
+                'resync_required': False,
+                'since': since,
+                'version': version,
+                'has_more': has_more,
+                'changes': changes
+            }
+        except Exception as e:
+            raise Exception(f"Erreur récupération modifications: {e}")
     
     # =====================
     # NODES - CRUD
@@ -19,33 +247,18 @@ class GraphController:
     def create_node(self, node_id, x, y, capacity=0):
         """Créer un nœud"""
         try:
-            cursor = self.db.get_cursor()
-            
-            cursor.execute("""
-                INSERT INTO nodes (id, x, y, capacity)
-                VALUES (%s, %s, %s, %s)
-                RETURNING *
-            """, (node_id, x, y, capacity))
+            result = self.storage.create_node(node_id, x, y, capacity)
             
-            result = cursor.fetchone()
-            self.db.commit()
-            cursor.close()
-            
-            return dict(result)
+            self._notify('node', 'create', **result)
+            return result
             
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur création nœud: {e}")
     
     def get_all_nodes(self):
         """Récupérer tous les nœuds"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("SELECT * FROM nodes ORDER BY id")
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return [dict(row) for row in results]
+            return self.storage.get_all_nodes()
             
         except Exception as e:
             raise Exception(f"Erreur récupération nœuds: {e}")
@@ -53,12 +266,7 @@ class GraphController:
     def get_node(self, node_id):
         """Récupérer un nœud spécifique"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("SELECT * FROM nodes WHERE id = %s", (node_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            
-            return dict(result) if result else None
+            return self.storage.get_node(node_id)
             
         except Exception as e:
             raise Exception(f"Erreur récupération nœud: {e}")
@@ -66,16 +274,13 @@ class GraphController:
     def delete_node(self, node_id):
         """Supprimer un nœud (simple, sans préserver l'optimalité)"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("DELETE FROM nodes WHERE id = %s", (node_id,))
-            deleted = cursor.rowcount > 0
-            self.db.commit()
-            cursor.close()
+            deleted = self.storage.delete_node(node_id)
             
+            if deleted:
+                self._notify('node', 'delete', id=node_id)
             return deleted
             
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur suppression nœud: {e}")
     
     def delete_node_smart(self, node_id):
@@ -85,7 +290,7 @@ class GraphController:
         Algorithme :
         1. Trouver tous les voisins du nœud
         2. Pour chaque paire de voisins, créer un raccourci si nécessaire
-        3. Supprimer le nœud
+        3. Supprimer le nœud (raccourcis + suppression dans une seule transaction)
         
         Args:
             node_id: ID du nœud à supprimer
@@ -94,21 +299,14 @@ class GraphController:
             dict: Statistiques de la suppression
         """
         try:
-            cursor = self.db.get_cursor()
-            
             # 1. Récupérer les voisins du nœud (avec leurs distances)
-            cursor.execute("""
-                SELECT target, weight FROM edges
-                WHERE source = %s
-            """, (node_id,))
-            neighbors = cursor.fetchall()
+            neighbors = self.storage.get_edges_from(node_id)
             
-            if not neighbors or len(neighbors) == 0:
+            if not neighbors:
                 # Nœud isolé, suppression simple
-                cursor.execute("DELETE FROM nodes WHERE id = %s", (node_id,))
-                deleted = cursor.rowcount > 0
-                self.db.commit()
-                cursor.close()
+                deleted = self.storage.delete_node(node_id)
+                if deleted:
+                    self._notify('node', 'delete', id=node_id)
                 return {
                     'deleted_node': node_id,
                     'shortcuts_created': 0,
@@ -118,9 +316,9 @@ class GraphController:
             
             neighbors_list = [(n['target'], n['weight']) for n in neighbors]
             
-            # 2. Créer des raccourcis entre chaque paire de voisins
-            shortcuts_created = 0
-            shortcuts_updated = 0
+            # 2. Calculer les raccourcis entre chaque paire de voisins
+            created = []
+            updated = []
             
             for i, (neighbor1, weight1) in enumerate(neighbors_list):
                 for neighbor2, weight2 in neighbors_list[i+1:]:
@@ -128,39 +326,24 @@ class GraphController:
                     shortcut_distance = weight1 + weight2
                     
                     # Vérifier si une arête existe déjà entre neighbor1 et neighbor2
-                    cursor.execute("""
-                        SELECT weight FROM edges
-                        WHERE source = %s AND target = %s
-                    """, (neighbor1, neighbor2))
-                    existing = cursor.fetchone()
+                    existing = self.storage.get_edge_weight(neighbor1, neighbor2)
                     
-                    if existing:
+                    if existing is not None:
                         # Arête existe : garder la plus courte distance
-                        if shortcut_distance < existing['weight']:
-                            # Mettre à jour avec la distance plus courte
-                            cursor.execute("""
-                                UPDATE edges
-                                SET weight = %s
-                                WHERE (source = %s AND target = %s) OR (source = %s AND target = %s)
-                            """, (shortcut_distance, neighbor1, neighbor2, neighbor2, neighbor1))
-                            shortcuts_updated += 1
+                        if shortcut_distance < existing:
+                            updated.append((neighbor1, neighbor2, shortcut_distance))
                     else:
-                        # Créer la nouvelle arête raccourci (dans les deux sens, graphe non-orienté)
-                        cursor.execute("""
-                            INSERT INTO edges (source, target, weight)
-                            VALUES (%s, %s, %s), (%s, %s, %s)
-                        """, (neighbor1, neighbor2, shortcut_distance, 
-                              neighbor2, neighbor1, shortcut_distance))
-                        shortcuts_created += 1
-            
-            self.db.commit()
-            
-            # 3. Supprimer le nœud (CASCADE supprimera les arêtes automatiquement)
-            cursor.execute("DELETE FROM nodes WHERE id = %s", (node_id,))
-            deleted = cursor.rowcount > 0
-            self.db.commit()
-            cursor.close()
+                        # Nouvelle arête raccourci (dans les deux sens, graphe non-orienté)
+                        created.append((neighbor1, neighbor2, shortcut_distance))
+            
+            # 3. Appliquer les raccourcis et supprimer le nœud (CASCADE sur ses arêtes)
+            self.storage.replace_node_with_shortcuts(node_id, created, updated)
             
+            self._notify('node', 'delete', id=node_id, smart=True, edges=[
+                {'source': a, 'target': b, 'weight': weight} for a, b, weight in created + updated
+            ])
+            shortcuts_created = len(created)
+            shortcuts_updated = len(updated)
             total_shortcuts = shortcuts_created + shortcuts_updated
             
             return {
@@ -173,7 +356,6 @@ class GraphController:
             }
             
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur suppression intelligente: {e}")
     
     # =====================
@@ -183,53 +365,18 @@ class GraphController:
     def create_edge(self, source, target, weight):
         """Créer une arête NON-ORIENTÉE"""
         try:
-            cursor = self.db.get_cursor()
-            
-            # Vérifier que les nœuds existent
-            cursor.execute("SELECT id FROM nodes WHERE id IN (%s, %s)", (source, target))
-            if cursor.rowcount < 2:
-                raise ValueError("Les nœuds source et/ou target n'existent pas")
-            
-            # Insérer les deux directions
-            cursor.execute("""
-                INSERT INTO edges (source, target, weight)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (source, target) DO UPDATE
-                SET weight = EXCLUDED.weight
-                RETURNING *
-            """, (source, target, weight))
-            edge1 = cursor.fetchone()
-            
-            cursor.execute("""
-                INSERT INTO edges (source, target, weight)
-                VALUES (%s, %s, %s)
-                ON CONFLICT (source, target) DO UPDATE
-                SET weight = EXCLUDED.weight
-            """, (target, source, weight))
-            
-            self.db.commit()
-            cursor.close()
-            
-            return dict(edge1)
+            edge = self.storage.create_edge(source, target, weight)
+            
+            self._notify('edge', 'upsert', source=source, target=target, weight=weight)
+            return edge
             
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur création arête: {e}")
     
     def get_all_edges(self):
         """Récupérer toutes les arêtes (sans doublons)"""
         try:
-            cursor = self.db.get_cursor()
-            
-            cursor.execute("""
-                SELECT * FROM edges 
-                WHERE source < target
-                ORDER BY source, target
-            """)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return [dict(row) for row in results]
+            return self.storage.get_all_edges()
             
         except Exception as e:
             raise Exception(f"Erreur récupération arêtes: {e}")
@@ -237,31 +384,30 @@ class GraphController:
     def delete_edge(self, source, target):
         """Supprimer une arête (les deux directions)"""
         try:
-            cursor = self.db.get_cursor()
-            
-            cursor.execute("""
-                DELETE FROM edges 
-                WHERE (source = %s AND target = %s) OR (source = %s AND target = %s)
-            """, (source, target, target, source))
-            
-            deleted = cursor.rowcount > 0
-            self.db.commit()
-            cursor.close()
+            deleted = self.storage.delete_edge(source, target)
             
+            if deleted:
+                self._notify('edge', 'delete', source=source, target=target)
             return deleted
             
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur suppression arête: {e}")
     
     # =====================
     # CONSTRAINTS
     # =====================
     
-    def create_constraint(self, source, target, constraint_value, reason=None, expiry_days=None):
-        """Créer une contrainte avec cycle de vie"""
+    def create_constraint(self, source, target, constraint_value, reason=None, expiry_days=None,
+                          schedule=None):
+        """
+        Créer une contrainte avec cycle de vie
+
+        schedule : fenêtres horaires hebdomadaires [{'days', 'start', 'end'}] ;
+        une contrainte à calendrier ne compte que pour les trajets avec une
+        heure de départ (voir AlgorithmController.find_shortest_path).
+        """
         try:
-            cursor = self.db.get_cursor()
+            schedule = parse_schedule(schedule)
             
             # Calculer expires_at si expiry_days fourni
             expires_at = None
@@ -269,52 +415,22 @@ class GraphController:
                 from datetime import datetime, timedelta
                 expires_at = datetime.now() + timedelta(days=expiry_days)
             
-            cursor.execute("""
-                INSERT INTO constraints (source, target, constraint_value, reason, expiry_days, expires_at)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                RETURNING *
-            """, (source, target, constraint_value, reason, expiry_days, expires_at))
-            
-            result = cursor.fetchone()
-            self.db.commit()
-            cursor.close()
+            row = self.storage.create_constraint(
+                source, target, constraint_value, reason, expiry_days, expires_at, schedule
+            )
             
             # Convertir datetime en ISO string
-            constraint_dict = dict(result)
-            if constraint_dict.get('created_at'):
-                constraint_dict['created_at'] = constraint_dict['created_at'].isoformat()
-            if constraint_dict.get('expires_at'):
-                constraint_dict['expires_at'] = constraint_dict['expires_at'].isoformat()
+            constraint_dict = _serialize_dates(row)
             
+            self._notify('constraint', 'create', **constraint_dict)
             return constraint_dict
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur création contrainte: {e}")
     
     def get_active_constraints(self):
         """Récupérer toutes les contraintes valides (actives ET non expirées)"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("""
-                SELECT * FROM constraints
-                WHERE is_active = TRUE 
-                AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
-                ORDER BY created_at DESC
-            """)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            # Convertir datetime en ISO string
-            constraints = []
-            for row in results:
-                c = dict(row)
-                if c.get('created_at'):
-                    c['created_at'] = c['created_at'].isoformat()
-                if c.get('expires_at'):
-                    c['expires_at'] = c['expires_at'].isoformat()
-                constraints.append(c)
-            
-            return constraints
+            return [_serialize_dates(row) for row in self.storage.get_active_constraints()]
             
         except Exception as e:
             raise Exception(f"Erreur récupération contraintes: {e}")
@@ -322,22 +438,7 @@ class GraphController:
     def get_all_constraints(self):
         """Récupérer TOUTES les contraintes (même inactives/expirées)"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("SELECT * FROM constraints ORDER BY created_at DESC")
-            results = cursor.fetchall()
-            cursor.close()
-            
-            # Convertir datetime en ISO string
-            constraints = []
-            for row in results:
-                c = dict(row)
-                if c.get('created_at'):
-                    c['created_at'] = c['created_at'].isoformat()
-                if c.get('expires_at'):
-                    c['expires_at'] = c['expires_at'].isoformat()
-                constraints.append(c)
-            
-            return constraints
+            return [_serialize_dates(row) for row in self.storage.get_all_constraints()]
             
         except Exception as e:
             raise Exception(f"Erreur récupération contraintes: {e}")
@@ -345,49 +446,23 @@ class GraphController:
     def toggle_constraint(self, constraint_id, is_active):
         """Activer/désactiver une contrainte"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("""
-                UPDATE constraints 
-                SET is_active = %s
-                WHERE id = %s
-            """, (is_active, constraint_id))
-            
-            updated = cursor.rowcount > 0
-            self.db.commit()
-            cursor.close()
+            updated = self.storage.toggle_constraint(constraint_id, is_active)
             
+            if updated:
+                self._notify('constraint', 'toggle', id=constraint_id, is_active=is_active)
             return updated
         except Exception as e:
-            self.db.rollback()
             raise Exception(f"Erreur toggle contrainte: {e}")
     
     def get_constraints_for_edge(self, source, target):
         """Récupérer les contraintes valides pour une arête et les sommer"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("""
-                SELECT * FROM constraints
-                WHERE ((source = %s AND target = %s) OR (source = %s AND target = %s))
-                AND is_active = TRUE
-                AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
-                ORDER BY created_at DESC
-            """, (source, target, target, source))
+            results = self.storage.get_constraints_for_edge(source, target)
             
-            results = cursor.fetchall()
-            cursor.close()
+            # Sommer les contraintes valides permanentes (celles à calendrier dépendent de l'heure)
+            total_constraint = sum(row['constraint_value'] for row in results if not row.get('schedule'))
             
-            # Sommer toutes les contraintes valides
-            total_constraint = sum(row['constraint_value'] for row in results)
-            
-            # Convertir datetime en ISO string
-            constraints = []
-            for row in results:
-                c = dict(row)
-                if c.get('created_at'):
-                    c['created_at'] = c['created_at'].isoformat()
-                if c.get('expires_at'):
-                    c['expires_at'] = c['expires_at'].isoformat()
-                constraints.append(c)
+            constraints = [_serialize_dates(row) for row in results]
             
             return total_constraint, constraints
         except Exception as e:
@@ -400,10 +475,12 @@ class GraphController:
     def get_graph(self):
         """Récupérer le graphe complet avec contraintes actives intégrées"""
         try:
+            start = time.perf_counter()
             graph = Graph()
             
-            # Charger les nœuds
-            nodes = self.get_all_nodes()
+            # Nœuds + arêtes avec la somme de leurs contraintes valides (2 requêtes)
+            nodes, edges = self.storage.load_graph()
+
             for node_data in nodes:
                 node = Node(
                     node_id=node_data['id'],
@@ -413,22 +490,12 @@ class GraphController:
                 )
                 graph.add_node(node)
             
-            # Charger les arêtes depuis edges table
-            cursor = self.db.get_cursor()
-            cursor.execute("SELECT * FROM edges ORDER BY source, target")
-            edges = cursor.fetchall()
-            cursor.close()
-            
             # Construire le dictionnaire d'adjacence avec contraintes
             for edge_data in edges:
                 source = edge_data['source']
                 target = edge_data['target']
-                weight = edge_data['weight']
-                
-                # Récupérer les contraintes actives pour cette arête
-                total_constraint, _ = self.get_constraints_for_edge(source, target)
                 
-                edge = Edge(source, target, weight, total_constraint)
+                edge = Edge(source, target, edge_data['weight'], edge_data['constraint_value'])
                 
                 # Ajouter seulement si pas déjà ajouté
                 if source in graph.edges:
@@ -438,6 +505,7 @@ class GraphController:
                 else:
                     graph.edges[source] = [edge]
             
+            GRAPH_LOAD_SECONDS.observe(time.perf_counter() - start)
             return graph
             
         except Exception as e:
@@ -446,13 +514,10 @@ class GraphController:
     def clear_graph(self):
         """Supprimer tout le graphe"""
         try:
-            cursor = self.db.get_cursor()
-            cursor.execute("TRUNCATE TABLE edges, nodes CASCADE")
-            self.db.commit()
-            cursor.close()
+            self.storage.clear_graph()
             
+            self._notify('graph', 'clear')
             return True
             
         except Exception as e:
-            self.db.rollback()
-            raise Exception(f"Erreur suppression graphe: {e}")
\ No newline at end of file
+            raise Exception(f"Erreur suppression graphe: {e}")
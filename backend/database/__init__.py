@@ -1,5 +1,6 @@
 """Package database"""
 
 from .connection import Database
+from .payload_store import PayloadStore
 
-__all__ = ['Database']
\ No newline at end of file
+__all__ = ['Database', 'PayloadStore']
\ No newline at end of file
@@ -1,12 +1,33 @@
 import psycopg2
 from psycopg2.extras import RealDictCursor
+import re
 import sys
 import os
+import time
 
 # Ajouter le dossier racine au path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from config.config import DB_CONFIG
+from config.config import DB_CONFIG, SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE
+from backend.monitoring.query_stats import QueryStats
+
+
+class InstrumentedCursor(RealDictCursor):
+    """Curseur (dicts) qui chronomètre chaque requête"""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            Database().record_query(query, vars, time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            Database().record_query(query, None, time.perf_counter() - start)
 
 
 class Database:
@@ -14,17 +35,28 @@ class Database:
     
     _instance = None
     _connection = None
+    _pid = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._init_stats()
         return cls._instance
     
+    def _init_stats(self):
+        self._prepared = set()  # Statements préparés sur la connexion courante
+        self.stats = QueryStats(SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE)
+    
     def connect(self):
         """Établir la connexion"""
+        if self._connection is not None and self._pid != os.getpid():
+            # Connexion héritée d'un fork (prefork) : ne jamais partager la socket
+            self._connection = None
         if self._connection is None or self._connection.closed:
             try:
                 self._connection = psycopg2.connect(**DB_CONFIG)
+                self._pid = os.getpid()
+                self._prepared = set()  # Les PREPARE sont liés à la session
                 print("✓ Connexion à PostgreSQL réussie")
             except psycopg2.Error as e:
                 print(f"✗ Erreur de connexion : {e}")
@@ -34,7 +66,7 @@ class Database:
     def get_cursor(self):
         """Obtenir un curseur (retourne des dicts)"""
         conn = self.connect()
-        return conn.cursor(cursor_factory=RealDictCursor)
+        return conn.cursor(cursor_factory=InstrumentedCursor)
     
     def commit(self):
         """Commit les changements"""
@@ -50,4 +82,59 @@ class Database:
         """Fermer la connexion"""
         if self._connection and not self._connection.closed:
             self._connection.close()
-            print("✓ Connexion fermée")
\ No newline at end of file
+            print("✓ Connexion fermée")
+
+    # =====================
+    # REQUÊTES PRÉPARÉES
+    # =====================
+
+    def execute_prepared(self, cursor, name, sql, params=()):
+        """
+        Exécuter une requête préparée une seule fois par connexion
+
+        Le premier appel envoie PREPARE (plan analysé et mémorisé par le
+        serveur), les suivants seulement EXECUTE avec les paramètres.
+
+        Args:
+            cursor: Curseur obtenu par get_cursor()
+            name: Nom unique de la requête (identifiant SQL)
+            sql: Requête avec des placeholders %s
+            params: Paramètres (tuple)
+        """
+        if name not in self._prepared:
+            index = iter(range(1, len(params) + 1))
+            server_sql = re.sub(r'%s', lambda _: f'${next(index)}', sql)
+            cursor.execute(f"PREPARE {name} AS {server_sql}")
+            self._prepared.add(name)
+
+        if params:
+            placeholders = ', '.join(['%s'] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    # =====================
+    # INSTRUMENTATION
+    # =====================
+
+    def record_query(self, query, params, duration):
+        """Enregistrer le temps d'une requête (appelé par InstrumentedCursor)"""
+        self.stats.record(query, params, duration)
+
+    def begin_request(self):
+        """Remettre à zéro les compteurs de la requête HTTP courante (par thread)"""
+        self.stats.begin_request()
+
+    def request_counters(self):
+        """Compteurs de la requête HTTP courante"""
+        return self.stats.request_counters()
+
+    def get_query_stats(self, top=20):
+        """Statistiques cumulées + requêtes les plus coûteuses + journal des lentes"""
+        result = self.stats.snapshot(top)
+        result['prepared_statements'] = sorted(self._prepared)
+        return result
+
+    def reset_query_stats(self):
+        """Remettre à zéro les statistiques cumulées"""
+        self.stats.reset()
@@ -0,0 +1,232 @@
+"""
+Initialisation et migrations du schéma PostgreSQL
+
+Usage :
+    python backend/database/init_db.py            # appliquer les migrations manquantes
+    python backend/database/init_db.py --status   # migrations appliquées / en attente
+    python backend/database/init_db.py --check    # vérifier (EXPLAIN) que les requêtes chaudes utilisent les index
+
+Chaque migration est appliquée une seule fois (table schema_migrations),
+dans sa propre transaction : relancer le script ne fait rien de plus.
+"""
+
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database.connection import Database
+from backend.storage.postgres import LOAD_EDGES_SQL
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+
+def _read_schema():
+    with open(SCHEMA_FILE, encoding='utf-8') as f:
+        return f.read()
+
+
+# =====================
+# MIGRATIONS (version, nom, SQL)
+# =====================
+
+MIGRATIONS = [
+    (1, 'schéma de base', _read_schema),
+    (2, 'index des requêtes chaudes', """
+        -- Index couvrant : voisins d'un nœud sans lire la table (index-only scan)
+        CREATE INDEX IF NOT EXISTS idx_edges_source_target
+            ON edges (source, target) INCLUDE (weight);
+
+        -- Index partiel : seules les contraintes actives sont indexées
+        CREATE INDEX IF NOT EXISTS idx_constraints_active_edge
+            ON constraints (source, target, expires_at) INCLUDE (constraint_value)
+            WHERE is_active;
+
+        -- Remplacés par les deux index ci-dessus
+        DROP INDEX IF EXISTS idx_edges_source;
+        DROP INDEX IF EXISTS idx_constraints_active;
+    """),
+    (3, 'journal des modifications', """
+        -- Une ligne par modification du graphe ; version = numéro de séquence
+        CREATE TABLE IF NOT EXISTS graph_changes (
+            version BIGSERIAL PRIMARY KEY,
+            entity VARCHAR(20) NOT NULL,
+            operation VARCHAR(20) NOT NULL,
+            data TEXT NOT NULL,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+    """),
+    (4, 'calendrier des contraintes', "ALTER TABLE constraints ADD COLUMN IF NOT EXISTS schedule JSONB"),
+]
+
+
+# =====================
+# REQUÊTES CHAUDES (nom, SQL, paramètres, index attendu)
+# =====================
+
+HOT_QUERIES = [
+    (
+        'voisins d\'un nœud',
+        "SELECT target, weight FROM edges WHERE source = %s",
+        ('A',),
+        'idx_edges_source_target'
+    ),
+    (
+        'arête (source, target)',
+        "SELECT weight FROM edges WHERE source = %s AND target = %s",
+        ('A', 'B'),
+        'idx_edges_source_target'
+    ),
+    (
+        'graphe complet (arêtes + somme des contraintes valides)',
+        LOAD_EDGES_SQL.format(where=''),
+        (),
+        'idx_constraints_active_edge'
+    ),
+    (
+        'historique récent',
+        "SELECT * FROM path_history ORDER BY calculated_at DESC LIMIT %s",
+        (20,),
+        'idx_path_history_date'
+    ),
+]
+
+
+def _ensure_migrations_table(db):
+    cursor = db.get_cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    db.commit()
+    cursor.close()
+
+
+def get_applied_versions(db):
+    """Versions de migrations déjà appliquées"""
+    _ensure_migrations_table(db)
+    cursor = db.get_cursor()
+    cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+    versions = {row['version'] for row in cursor.fetchall()}
+    cursor.close()
+    return versions
+
+
+def migrate(db=None):
+    """
+    Appliquer les migrations manquantes (idempotent)
+
+    Returns:
+        list: Versions appliquées lors de cet appel
+    """
+    db = db or Database()
+    applied = get_applied_versions(db)
+    newly_applied = []
+
+    for version, name, sql in MIGRATIONS:
+        if version in applied:
+            continue
+
+        cursor = db.get_cursor()
+        try:
+            # Un verrou évite que deux processus appliquent la même migration
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (20260000 + version,))
+            cursor.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
+            if cursor.fetchone() is None:
+                cursor.execute(sql() if callable(sql) else sql)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                newly_applied.append(version)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise Exception(f"Erreur migration {version} ({name}): {e}")
+        finally:
+            cursor.close()
+
+    return newly_applied
+
+
+def _collect_indexes(plan, found):
+    """Parcourir récursivement un plan EXPLAIN (JSON) et relever les index utilisés"""
+    if 'Index Name' in plan:
+        found.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        _collect_indexes(child, found)
+    return found
+
+
+def check_indexes(db=None):
+    """
+    Vérifier avec EXPLAIN que chaque requête chaude peut utiliser son index
+
+    Le scan séquentiel est désactivé le temps du EXPLAIN : sur une petite table
+    le planificateur le préférerait, alors qu'on veut savoir si l'index est
+    utilisable une fois la table volumineuse.
+
+    Returns:
+        list: [{'query', 'expected_index', 'indexes_used', 'ok'}]
+    """
+    db = db or Database()
+    cursor = db.get_cursor()
+    report = []
+
+    try:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for name, sql, params, expected in HOT_QUERIES:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()['QUERY PLAN']
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            used = _collect_indexes(plan[0]['Plan'], set())
+            report.append({
+                'query': name,
+                'expected_index': expected,
+                'indexes_used': sorted(used),
+                'ok': expected in used
+            })
+    finally:
+        db.rollback()
+        cursor.close()
+
+    return report
+
+
+def main(argv):
+    db = Database()
+
+    if '--status' in argv:
+        applied = get_applied_versions(db)
+        for version, name, _ in MIGRATIONS:
+            mark = '✓' if version in applied else '…'
+            print(f"{mark} {version:03d} {name}")
+        return 0
+
+    applied = migrate(db)
+    if applied:
+        print(f"✓ Migrations appliquées : {', '.join(str(v) for v in applied)}")
+    else:
+        print("✓ Schéma à jour")
+
+    if '--check' in argv:
+        failures = 0
+        for item in check_indexes(db):
+            mark = '✓' if item['ok'] else '✗'
+            print(f"{mark} {item['query']} → {', '.join(item['indexes_used']) or 'aucun index'}")
+            if not item['ok']:
+                failures += 1
+        return 1 if failures else 0
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import struct
+
+
+class PayloadStore:
+    """
+    Stockage dédupliqué (adressé par contenu) des payloads de l'historique
+
+    Chaque chemin et chaque snapshot de contraintes est stocké UNE seule fois
+    dans `path_payloads`, référencé par son hash SHA-1. Les chemins sont encodés
+    de façon compacte : les IDs de nœuds sont internés dans `node_symbols` et le
+    chemin devient un tableau d'entiers 32 bits.
+    """
+
+    KIND_PATH = 'path'
+    KIND_SNAPSHOT = 'snapshot'
+
+    def __init__(self, db):
+        self.db = db
+        self._symbols = {}      # {node_id: symbol}
+        self._node_ids = {}     # {symbol: node_id}
+        self._known_hashes = set()
+
+    # =====================
+    # ENCODAGE
+    # =====================
+
+    @staticmethod
+    def _canonical(value):
+        """JSON canonique (clés triées, sans espaces) : base du hash"""
+        return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    @classmethod
+    def content_hash(cls, kind, value):
+        """Hash du contenu (indépendant de l'encodage stocké)"""
+        raw = f"{kind}:{cls._canonical(value)}".encode('utf-8')
+        return hashlib.sha1(raw).hexdigest()
+
+    @staticmethod
+    def encode_symbols(symbols):
+        """Liste d'entiers -> bytes (uint32 little-endian)"""
+        return struct.pack(f'<{len(symbols)}I', *symbols)
+
+    @staticmethod
+    def decode_symbols(data):
+        """bytes (uint32 little-endian) -> liste d'entiers"""
+        data = bytes(data)
+        return list(struct.unpack(f'<{len(data) // 4}I', data))
+
+    # =====================
+    # SYMBOLES (IDs internés)
+    # =====================
+
+    def _intern(self, cursor, node_ids):
+        """Garantir qu'un symbole existe pour chaque node_id (un seul aller-retour)"""
+        missing = sorted({n for n in node_ids if n not in self._symbols})
+        if not missing:
+            return
+
+        cursor.execute("""
+            INSERT INTO node_symbols (node_id)
+            SELECT unnest(%s::varchar[])
+            ON CONFLICT (node_id) DO NOTHING
+        """, (missing,))
+        cursor.execute("""
+            SELECT symbol, node_id FROM node_symbols
+            WHERE node_id = ANY(%s)
+        """, (missing,))
+
+        for row in cursor.fetchall():
+            self._symbols[row['node_id']] = row['symbol']
+            self._node_ids[row['symbol']] = row['node_id']
+
+    def _resolve(self, cursor, symbols):
+        """Charger les node_id inconnus pour une liste de symboles"""
+        missing = sorted({s for s in symbols if s not in self._node_ids})
+        if not missing:
+            return
+
+        cursor.execute("""
+            SELECT symbol, node_id FROM node_symbols
+            WHERE symbol = ANY(%s)
+        """, (missing,))
+
+        for row in cursor.fetchall():
+            self._symbols[row['node_id']] = row['symbol']
+            self._node_ids[row['symbol']] = row['node_id']
+
+    # =====================
+    # ÉCRITURE
+    # =====================
+
+    def _store(self, cursor, kind, value, data):
+        payload_hash = self.content_hash(kind, value)
+        if payload_hash in self._known_hashes:
+            return payload_hash
+
+        raw_size = len(self._canonical(value).encode('utf-8'))
+        cursor.execute("""
+            INSERT INTO path_payloads (hash, kind, data, raw_size)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (hash) DO NOTHING
+        """, (payload_hash, kind, data, raw_size))
+
+        self._known_hashes.add(payload_hash)
+        return payload_hash
+
+    def store_path(self, cursor, path):
+        """Stocker un chemin (liste de node_id) et retourner son hash"""
+        path = list(path or [])
+        self._intern(cursor, path)
+        data = self.encode_symbols([self._symbols[n] for n in path])
+        return self._store(cursor, self.KIND_PATH, path, data)
+
+    def store_snapshot(self, cursor, snapshot):
+        """Stocker un snapshot de contraintes et retourner son hash"""
+        snapshot = snapshot or {}
+        data = self._canonical(snapshot).encode('utf-8')
+        return self._store(cursor, self.KIND_SNAPSHOT, snapshot, data)
+
+    # =====================
+    # LECTURE
+    # =====================
+
+    def load_many(self, cursor, hashes):
+        """
+        Charger plusieurs payloads en une requête
+
+        Returns:
+            dict: {hash: chemin (list) ou snapshot (dict)}
+        """
+        hashes = sorted({h for h in hashes if h})
+        if not hashes:
+            return {}
+
+        cursor.execute("""
+            SELECT hash, kind, data FROM path_payloads
+            WHERE hash = ANY(%s)
+        """, (hashes,))
+        rows = cursor.fetchall()
+
+        encoded_paths = {}
+        payloads = {}
+        for row in rows:
+            if row['kind'] == self.KIND_PATH:
+                encoded_paths[row['hash']] = self.decode_symbols(row['data'])
+            else:
+                payloads[row['hash']] = json.loads(bytes(row['data']).decode('utf-8'))
+
+        all_symbols = [s for symbols in encoded_paths.values() for s in symbols]
+        self._resolve(cursor, all_symbols)
+
+        for payload_hash, symbols in encoded_paths.items():
+            payloads[payload_hash] = [self._node_ids[s] for s in symbols]
+
+        return payloads
+
+    def reset_cache(self):
+        """Vider les caches (ex: après TRUNCATE des tables)"""
+        self._symbols.clear()
+        self._node_ids.clear()
+        self._known_hashes.clear()
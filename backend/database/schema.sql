@@ -46,10 +46,30 @@ CREATE TABLE IF NOT EXISTS path_history (
     FOREIGN KEY (destination) REFERENCES nodes(id)
 );
 
+-- Dictionnaire des IDs de nœuds (chemins encodés en entiers)
+CREATE TABLE IF NOT EXISTS node_symbols (
+    symbol SERIAL PRIMARY KEY,
+    node_id VARCHAR(50) NOT NULL UNIQUE
+);
+
+-- Payloads dédupliqués de l'historique (adressés par hash du contenu)
+CREATE TABLE IF NOT EXISTS path_payloads (
+    hash CHAR(40) PRIMARY KEY,
+    kind VARCHAR(10) NOT NULL,
+    data BYTEA NOT NULL,
+    raw_size INTEGER NOT NULL
+);
+
+-- L'historique référence les payloads (path/constraints_snapshot restent pour les anciennes lignes)
+ALTER TABLE path_history ALTER COLUMN path DROP NOT NULL;
+ALTER TABLE path_history ADD COLUMN IF NOT EXISTS path_hash CHAR(40) REFERENCES path_payloads(hash);
+ALTER TABLE path_history ADD COLUMN IF NOT EXISTS snapshot_hash CHAR(40) REFERENCES path_payloads(hash);
+
+-- Contraintes à calendrier : fenêtres horaires hebdomadaires (NULL = permanente)
+ALTER TABLE constraints ADD COLUMN IF NOT EXISTS schedule JSONB;
+
 -- Index pour performances
-CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source);
 CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target);
-CREATE INDEX IF NOT EXISTS idx_constraints_active ON constraints(is_active);
 CREATE INDEX IF NOT EXISTS idx_constraints_expires ON constraints(expires_at);
 CREATE INDEX IF NOT EXISTS idx_path_history_date ON path_history(calculated_at);
 CREATE INDEX IF NOT EXISTS idx_path_history_route ON path_history(source, destination);
\ No newline at end of file
@@ -0,0 +1,196 @@
+import json
+import selectors
+import socket
+import threading
+import time
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.monitoring.metrics import SSE_SUBSCRIBERS, SSE_EVENTS, SSE_DROPPED
+
+
+def format_event(event, data, event_id=None):
+    """Encoder un événement Server-Sent Events (data JSON sur une ligne)"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str))
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+class _Subscriber:
+    __slots__ = ('sock', 'buffer')
+
+    def __init__(self, sock, buffer):
+        self.sock = sock
+        self.buffer = bytearray(buffer)
+
+
+class EventBroker:
+    """
+    Diffusion SSE à tous les abonnés depuis un seul thread
+
+    Le handler HTTP envoie les headers puis confie la socket au broker et
+    retourne aussitôt : un abonné inactif ne coûte qu'un descripteur dans
+    le selector, aucun thread. Chaque événement est encodé une seule fois ;
+    un abonné dont le tampon dépasse max_buffer (client bloqué) est déconnecté.
+
+    Args:
+        heartbeat: Intervalle des commentaires keep-alive (s)
+        tick: Fonction appelée toutes les tick_interval secondes dans le thread
+              du broker (détection des contraintes expirées)
+    """
+
+    def __init__(self, heartbeat=15.0, tick=None, tick_interval=1.0, max_buffer=1 << 20):
+        self.heartbeat = heartbeat
+        self.tick = tick
+        self.tick_interval = tick_interval
+        self.max_buffer = max_buffer
+
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+
+        self._lock = threading.Lock()
+        self._subscribers = {}  # fd -> _Subscriber
+        self._pending = []      # Nouveaux abonnés, enregistrés par le thread du broker
+        self._thread = None
+
+    def start(self):
+        """Démarrer le thread du broker (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='sse-broker', daemon=True)
+                self._thread.start()
+
+    def subscribe(self, sock, initial=b''):
+        """Confier une socket (headers déjà envoyés) au broker"""
+        sock.setblocking(False)
+        with self._lock:
+            self._pending.append(_Subscriber(sock, initial))
+        self.start()
+        self._wake()
+
+    def publish(self, event, data, event_id=None):
+        """Diffuser un événement à tous les abonnés"""
+        payload = format_event(event, data, event_id)
+        with self._lock:
+            if not self._subscribers and not self._pending:
+                return
+            for subscriber in list(self._subscribers.values()) + self._pending:
+                subscriber.buffer += payload
+        SSE_EVENTS.inc(event=event)
+        self._wake()
+
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers) + len(self._pending)
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # Déjà réveillé (tampon de la socketpair plein)
+
+    # =====================
+    # THREAD DU BROKER
+    # =====================
+
+    def _run(self):
+        last_heartbeat = last_tick = time.monotonic()
+        while True:
+            timeout = min(self.heartbeat, self.tick_interval if self.tick else self.heartbeat)
+            for key, mask in self._selector.select(timeout):
+                if key.fileobj is self._wake_r:
+                    self._drain_wake()
+                elif mask & selectors.EVENT_READ:
+                    self._check_closed(key.fd)
+
+            now = time.monotonic()
+            if self.tick and now - last_tick >= self.tick_interval:
+                last_tick = now
+                try:
+                    self.tick()
+                except Exception as e:
+                    print(f"Avertissement: tick du flux d'événements en erreur: {e}")
+
+            if now - last_heartbeat >= self.heartbeat:
+                last_heartbeat = now
+                with self._lock:
+                    for subscriber in self._subscribers.values():
+                        subscriber.buffer += b': ping\n\n'
+
+            self._flush()
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _check_closed(self, fd):
+        """Un client SSE n'envoie rien : socket lisible = fermée par le client"""
+        with self._lock:
+            subscriber = self._subscribers.get(fd)
+            if subscriber is None:
+                return
+            try:
+                if subscriber.sock.recv(4096):
+                    return
+            except BlockingIOError:
+                return
+            except OSError:
+                pass
+            self._remove(fd)
+
+    def _flush(self):
+        """Enregistrer les nouveaux abonnés et écrire les tampons en attente"""
+        with self._lock:
+            for subscriber in self._pending:
+                fd = subscriber.sock.fileno()
+                self._subscribers[fd] = subscriber
+                self._selector.register(subscriber.sock, selectors.EVENT_READ)
+            self._pending = []
+
+            for fd, subscriber in list(self._subscribers.items()):
+                if not subscriber.buffer:
+                    continue
+                try:
+                    sent = subscriber.sock.send(subscriber.buffer)
+                    del subscriber.buffer[:sent]
+                except BlockingIOError:
+                    pass
+                except OSError:
+                    self._remove(fd)
+                    continue
+
+                if len(subscriber.buffer) > self.max_buffer:
+                    SSE_DROPPED.inc()
+                    self._remove(fd)
+                    continue
+
+                # Attendre que la socket redevienne inscriptible si tout n'est pas parti
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if subscriber.buffer else 0)
+                self._selector.modify(subscriber.sock, events)
+
+            SSE_SUBSCRIBERS.set(len(self._subscribers))
+
+    def _remove(self, fd):
+        subscriber = self._subscribers.pop(fd, None)
+        if subscriber is None:
+            return
+        try:
+            self._selector.unregister(subscriber.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            subscriber.sock.close()
+        except OSError:
+            pass
+        SSE_SUBSCRIBERS.set(len(self._subscribers))
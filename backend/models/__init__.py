@@ -5,5 +5,6 @@ from .edge import Edge
 from .graph import Graph
 from .constraint import Constraint
 from .path_history import PathHistory
+from .graph_snapshot import GraphSnapshot
 
-__all__ = ['Node', 'Edge', 'Graph', 'Constraint', 'PathHistory']
\ No newline at end of file
+__all__ = ['Node', 'Edge', 'Graph', 'Constraint', 'PathHistory', 'GraphSnapshot']
\ No newline at end of file
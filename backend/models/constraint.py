@@ -6,7 +6,7 @@ class Constraint:
     
     def __init__(self, constraint_id=None, source=None, target=None, 
                  constraint_value=0, is_active=True, reason=None,
-                 created_at=None, expiry_days=None, expires_at=None):
+                 created_at=None, expiry_days=None, expires_at=None, schedule=None):
         self.id = constraint_id
         self.source = source
         self.target = target
@@ -16,6 +16,7 @@ class Constraint:
         self.created_at = created_at or datetime.now()
         self.expiry_days = expiry_days
         self.expires_at = expires_at
+        self.schedule = schedule  # Fenêtres horaires hebdomadaires (None = permanente)
         
         # Calculer la date d'expiration si nécessaire
         if expiry_days and not expires_at:
@@ -43,7 +44,8 @@ class Constraint:
             'reason': self.reason,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'expiry_days': self.expiry_days,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'schedule': self.schedule
         }
     
     @staticmethod
@@ -57,5 +59,6 @@ class Constraint:
             reason=data.get('reason'),
             created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None,
             expiry_days=data.get('expiry_days'),
-            expires_at=datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None
+            expires_at=datetime.fromisoformat(data['expires_at']) if data.get('expires_at') else None,
+            schedule=data.get('schedule')
         )
\ No newline at end of file
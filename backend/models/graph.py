@@ -56,6 +56,10 @@ class Graph:
         
         return adj
     
+    def get_capacities(self):
+        """Capacité de chaque point de collecte : {node: capacité}"""
+        return {node_id: node.capacity or 0 for node_id, node in self.nodes.items()}
+    
     def get_edge(self, source, target):
         """Récupérer une arête spécifique"""
         if source in self.edges:
@@ -0,0 +1,216 @@
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+
+from .node import Node
+from .edge import Edge
+from .graph import Graph
+
+
+class GraphSnapshot:
+    """
+    Snapshot binaire du graphe (lecture seule, mappable en mémoire)
+
+    Format (little-endian, sections alignées sur 8 octets) :
+        en-tête   : magic, version du format, nb nœuds, nb entrées d'adjacence,
+                    version du graphe, empreinte SHA-1 du contenu
+        node_x    : float64[n]        node_y : float64[n]      capacity : int64[n]
+        offsets   : int64[n+1]        (adjacence CSR : voisins de i = offsets[i]..offsets[i+1])
+        targets   : int32[m]          weights : float64[m]     constraints : float64[m]
+        id_offsets: int64[n+1]        ids : UTF-8 concaténés
+
+    `constraints` contient la contrainte effective (somme des contraintes
+    actives) de chaque arête orientée, comme Edge.constraint_value.
+    Ouvert avec open(), le fichier est mappé (mmap) : plusieurs processus
+    partagent les mêmes pages sans copie.
+    """
+
+    MAGIC = b'WGSNAP\x00\x00'
+    FORMAT_VERSION = 1
+    HEADER = struct.Struct('<8sIIQQQ20s4x')
+
+    def __init__(self, node_ids, x, y, capacity, offsets, targets, weights, constraints,
+                 graph_version=0, fingerprint=None, path=None, mapping=None):
+        self.node_ids = node_ids
+        self.index = {node_id: i for i, node_id in enumerate(node_ids)}
+        self.x = x
+        self.y = y
+        self.capacity = capacity
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.constraints = constraints
+        self.graph_version = graph_version
+        self.fingerprint = fingerprint or self._compute_fingerprint()
+        self.path = path
+        self._mapping = mapping
+
+    # =====================
+    # CONSTRUCTION
+    # =====================
+
+    @staticmethod
+    def from_graph(graph, graph_version=0):
+        """Construire un snapshot (en mémoire) depuis un Graph"""
+        node_ids = list(graph.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        x, y, capacity = array('d'), array('d'), array('q')
+        offsets, targets = array('q', [0]), array('i')
+        weights, constraints = array('d'), array('d')
+
+        for node_id in node_ids:
+            node = graph.nodes[node_id]
+            x.append(float(node.x))
+            y.append(float(node.y))
+            capacity.append(int(node.capacity or 0))
+
+            for edge in graph.edges.get(node_id, []):
+                if edge.target not in index:
+                    continue
+                targets.append(index[edge.target])
+                weights.append(float(edge.weight))
+                constraints.append(float(edge.constraint_value or 0))
+            offsets.append(len(targets))
+
+        return GraphSnapshot(node_ids, x, y, capacity, offsets, targets,
+                             weights, constraints, graph_version)
+
+    def _sections(self):
+        id_bytes = [node_id.encode('utf-8') for node_id in self.node_ids]
+        id_offsets = array('q', [0])
+        for b in id_bytes:
+            id_offsets.append(id_offsets[-1] + len(b))
+
+        return [
+            bytes(memoryview(self.x).cast('B')),
+            bytes(memoryview(self.y).cast('B')),
+            bytes(memoryview(self.capacity).cast('B')),
+            bytes(memoryview(self.offsets).cast('B')),
+            bytes(memoryview(self.targets).cast('B')),
+            bytes(memoryview(self.weights).cast('B')),
+            bytes(memoryview(self.constraints).cast('B')),
+            id_offsets.tobytes(),
+            b''.join(id_bytes),
+        ]
+
+    def _compute_fingerprint(self):
+        """Empreinte du contenu (indépendante de graph_version)"""
+        digest = hashlib.sha1()
+        for section in self._sections():
+            digest.update(struct.pack('<Q', len(section)))
+            digest.update(section)
+        return digest.digest()
+
+    # =====================
+    # ÉCRITURE / LECTURE
+    # =====================
+
+    def write(self, path):
+        """Écrire le snapshot (atomique : fichier temporaire puis rename)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+
+        with open(tmp_path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, 0, len(self.node_ids),
+                                     len(self.targets), self.graph_version, self.fingerprint))
+            for section in self._sections():
+                f.write(section)
+                f.write(b'\x00' * (-len(section) % 8))
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+        self.path = path
+        return path
+
+    @classmethod
+    def open(cls, path):
+        """Mapper un snapshot en mémoire (aucune copie des tableaux)"""
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, n, m, graph_version, fingerprint = cls.HEADER.unpack_from(mapping, 0)
+        if magic != cls.MAGIC:
+            raise ValueError(f"Fichier snapshot invalide: {path}")
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"Version de snapshot non supportée: {version}")
+
+        view = memoryview(mapping)
+        position = cls.HEADER.size
+
+        def section(count, fmt, itemsize):
+            nonlocal position
+            size = count * itemsize
+            data = view[position:position + size].cast(fmt)
+            position += size + (-size % 8)
+            return data
+
+        x = section(n, 'd', 8)
+        y = section(n, 'd', 8)
+        capacity = section(n, 'q', 8)
+        offsets = section(n + 1, 'q', 8)
+        targets = section(m, 'i', 4)
+        weights = section(m, 'd', 8)
+        constraints = section(m, 'd', 8)
+        id_offsets = section(n + 1, 'q', 8)
+        id_blob = section(id_offsets[n], 'B', 1)
+
+        node_ids = [bytes(id_blob[id_offsets[i]:id_offsets[i + 1]]).decode('utf-8') for i in range(n)]
+
+        return cls(node_ids, x, y, capacity, offsets, targets, weights, constraints,
+                   graph_version, fingerprint, path, mapping)
+
+    # =====================
+    # ACCÈS (même interface que Graph pour les algorithmes)
+    # =====================
+
+    def get_adjacency_list(self, custom_constraints=None):
+        """Format pour Dijkstra : {node: [(voisin, poids, contrainte), ...]}"""
+        custom_constraints = custom_constraints or {}
+        ids = self.node_ids
+        offsets, targets = self.offsets, self.targets
+        weights, constraints = self.weights, self.constraints
+
+        adj = {}
+        for i, node_id in enumerate(ids):
+            neighbors = []
+            for k in range(offsets[i], offsets[i + 1]):
+                target = ids[targets[k]]
+                constraint = constraints[k]
+                if custom_constraints:
+                    constraint = custom_constraints.get(f"{node_id}-{target}", constraint)
+                neighbors.append((target, weights[k], constraint))
+            adj[node_id] = neighbors
+
+        return adj
+
+    def get_capacities(self):
+        """Capacité de chaque point de collecte : {node: capacité}"""
+        return dict(zip(self.node_ids, self.capacity))
+
+    def to_graph(self):
+        """Reconstruire un Graph complet (objets Node / Edge)"""
+        graph = Graph()
+        for i, node_id in enumerate(self.node_ids):
+            capacity = self.capacity[i]
+            graph.add_node(Node(node_id, self.x[i], self.y[i], capacity))
+        for i, node_id in enumerate(self.node_ids):
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                graph.edges[node_id].append(
+                    Edge(node_id, self.node_ids[self.targets[k]], self.weights[k], self.constraints[k])
+                )
+        return graph
+
+    def stats(self):
+        return {
+            'path': self.path,
+            'nodes': len(self.node_ids),
+            'edges': len(self.targets) // 2,
+            'graph_version': self.graph_version,
+            'fingerprint': self.fingerprint.hex(),
+            'mapped': self._mapping is not None,
+            'size_bytes': len(self._mapping) if self._mapping is not None else None
+        }
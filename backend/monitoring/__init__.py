@@ -0,0 +1,8 @@
+"""Package monitoring - Métriques au format Prometheus"""
+
+from .metrics import (
+    Counter, Gauge, Histogram, MetricsRegistry, REGISTRY, route_label, record_algorithm
+)
+from .query_stats import QueryStats
+
+__all__ = ['QueryStats', 'Counter', 'Gauge', 'Histogram', 'MetricsRegistry', 'REGISTRY', 'route_label', 'record_algorithm']
@@ -0,0 +1,252 @@
+import re
+import threading
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base commune : nom, aide, labels et valeurs par combinaison de labels"""
+
+    type_name = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.label_names):
+            raise ValueError(f"Labels attendus pour {self.name}: {self.label_names}")
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Valeur instantanée (peut monter et descendre)"""
+
+    type_name = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """Histogramme cumulatif (buckets + somme + nombre d'observations)"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            for key, state in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, state['buckets']):
+                    labels = _format_labels(self.label_names, key, [('le', _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+                lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ensemble des métriques exposées par GET /metrics"""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrique déjà enregistrée: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, labels=()):
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name, help_text, labels=()):
+        return self.register(Gauge(name, help_text, labels))
+
+    def histogram(self, name, help_text, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labels, buckets))
+
+    def render(self):
+        """Export texte compatible Prometheus (format 0.0.4)"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# Registre global du serveur
+REGISTRY = MetricsRegistry()
+
+
+# =====================
+# LABEL DE ROUTE (cardinalité bornée)
+# =====================
+
+_ROUTE_PATTERNS = [
+    (re.compile(r'^/history/paths/[^/]+/replay$'), '/history/paths/{id}/replay'),
+    (re.compile(r'^/constraints/[^/]+/toggle$'), '/constraints/{id}/toggle'),
+    (re.compile(r'^/node/[^/]+/smart$'), '/node/{id}/smart'),
+    (re.compile(r'^/algo/tasks/[^/]+$'), '/algo/tasks/{id}'),
+    (re.compile(r'^/node/[^/]+$'), '/node/{id}'),
+    (re.compile(r'^/edge/[^/]+/[^/]+$'), '/edge/{source}/{target}'),
+]
+
+# Routes statiques du serveur : gardées telles quelles (tout autre chemin -> 'other')
+_STATIC_ROUTES = frozenset([
+    '/graph', '/graph/node', '/graph/edge', '/graph/changes', '/graph/components', '/graph/nearest',
+    '/graph/snapshot', '/events', '/constraints', '/constraints/all', '/constraints/slots',
+    '/algo/dijkstra', '/algo/coloring', '/algo/nearest-depot', '/algo/reachable', '/algo/partition',
+    '/algo/critical-edges', '/algo/tours', '/algo/scenarios', '/algo/executor',
+    '/history/paths', '/history/replay', '/history/storage', '/history/compact',
+    '/metrics', '/debug/queries',
+])
+
+
+def route_label(path):
+    """Remplacer les identifiants d'un chemin par des paramètres (/node/A -> /node/{id})"""
+    if path in _STATIC_ROUTES:
+        return path
+    for pattern, label in _ROUTE_PATTERNS:
+        if pattern.match(path):
+            return label
+    return 'other'
+
+
+# =====================
+# MÉTRIQUES DU SERVEUR
+# =====================
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'wastegraph_http_requests_total', 'Requêtes HTTP traitées', ('method', 'route', 'status'))
+HTTP_ERRORS = REGISTRY.counter(
+    'wastegraph_http_errors_total', 'Réponses HTTP en erreur (status >= 400)', ('method', 'route', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'wastegraph_http_request_duration_seconds', 'Latence des requêtes HTTP', ('method', 'route'))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'wastegraph_http_requests_in_flight', 'Requêtes HTTP en cours de traitement', ('method',))
+HTTP_CACHE = REGISTRY.counter(
+    'wastegraph_http_cache_total', 'Réponses versionnées : not_modified (304), hit ou miss', ('route', 'result'))
+SSE_SUBSCRIBERS = REGISTRY.gauge(
+    'wastegraph_sse_subscribers', 'Clients abonnés au flux /events')
+SSE_EVENTS = REGISTRY.counter(
+    'wastegraph_sse_events_total', 'Événements diffusés sur /events', ('event',))
+SSE_DROPPED = REGISTRY.counter(
+    'wastegraph_sse_dropped_total', 'Abonnés déconnectés car trop lents (tampon plein)')
+
+ALGO_RUNS = REGISTRY.counter(
+    'wastegraph_algo_runs_total', 'Exécutions des algorithmes', ('algorithm',))
+ALGO_DURATION = REGISTRY.histogram(
+    'wastegraph_algo_duration_seconds', 'Durée des algorithmes (hors chargement du graphe)', ('algorithm',))
+ALGO_NODES_SETTLED = REGISTRY.counter(
+    'wastegraph_algo_nodes_settled_total', 'Nœuds définitivement traités', ('algorithm',))
+ALGO_EDGES_RELAXED = REGISTRY.counter(
+    'wastegraph_algo_edges_relaxed_total', 'Arêtes examinées (relaxations)', ('algorithm',))
+EXECUTOR_QUEUE_DEPTH = REGISTRY.gauge(
+    'wastegraph_executor_queue_depth', 'Calculs en attente d\'un worker')
+EXECUTOR_BUSY = REGISTRY.gauge(
+    'wastegraph_executor_busy_workers', 'Workers de calcul occupés')
+EXECUTOR_TASKS = REGISTRY.counter(
+    'wastegraph_executor_tasks_total', 'Calculs exécutés par le pool (ok, error, timeout, cancelled)',
+    ('task', 'result'))
+EXECUTOR_WAIT = REGISTRY.histogram(
+    'wastegraph_executor_queue_wait_seconds', 'Attente en file avant d\'être confié à un worker')
+ALGO_COALESCING = REGISTRY.counter(
+    'wastegraph_algo_coalescing_total',
+    'Requêtes d\'algorithme : computed (calcul lancé) ou coalesced (résultat d\'un calcul identique en cours)',
+    ('algorithm', 'result'))
+ALGO_DISCONNECTED = REGISTRY.counter(
+    'wastegraph_algo_disconnected_total',
+    'Chemins refusés sans calcul : source et destination dans deux composantes différentes')
+COMPONENT_REBUILDS = REGISTRY.counter(
+    'wastegraph_component_index_rebuilds_total', 'Reconstructions de l\'index des composantes connexes')
+DEPOT_TREE_HITS = REGISTRY.counter(
+    'wastegraph_depot_tree_hits_total', 'Plus courts chemins lus dans un arbre de dépôt (sans recherche)')
+DEPOT_TREE_REBUILDS = REGISTRY.counter(
+    'wastegraph_depot_tree_rebuilds_total', 'Rechargements de la liste d\'adjacence des arbres de dépôts')
+SPATIAL_REBUILDS = REGISTRY.counter(
+    'wastegraph_spatial_index_rebuilds_total', 'Reconstructions de l\'index spatial des nœuds')
+GRAPH_LOAD_SECONDS = REGISTRY.histogram(
+    'wastegraph_graph_load_seconds', 'Temps de chargement du graphe depuis la BDD')
+
+
+def record_algorithm(algorithm, duration, stats=None):
+    """Enregistrer une exécution d'algorithme et ses compteurs de travail"""
+    ALGO_RUNS.inc(algorithm=algorithm)
+    ALGO_DURATION.observe(duration, algorithm=algorithm)
+    if stats:
+        ALGO_NODES_SETTLED.inc(stats.get('nodes_settled', 0), algorithm=algorithm)
+        ALGO_EDGES_RELAXED.inc(stats.get('edges_relaxed', 0), algorithm=algorithm)
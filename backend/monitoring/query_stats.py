@@ -0,0 +1,85 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+
+class QueryStats:
+    """
+    Statistiques des requêtes SQL d'un stockage
+
+    - cumul global (nombre, temps) et par requête normalisée
+    - compteurs de la requête HTTP en cours (par thread)
+    - journal des requêtes lentes au-delà d'un seuil
+    """
+
+    def __init__(self, slow_query_ms=50, slow_log_size=200):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.slow_query_ms = slow_query_ms
+        self.total_queries = 0
+        self.total_time = 0.0
+        self.statement_stats = {}   # {requête normalisée: {count, total_ms, max_ms}}
+        self.slow_queries = deque(maxlen=slow_log_size)
+
+    def record(self, query, params, duration):
+        """Enregistrer le temps d'une requête (secondes)"""
+        duration_ms = duration * 1000
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', 'replace')
+        key = ' '.join(str(query).split())
+
+        with self._lock:
+            self.total_queries += 1
+            self.total_time += duration
+
+            stat = self.statement_stats.get(key)
+            if stat is None:
+                stat = self.statement_stats[key] = {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+            stat['count'] += 1
+            stat['total_ms'] += duration_ms
+            stat['max_ms'] = max(stat['max_ms'], duration_ms)
+
+            if duration_ms >= self.slow_query_ms:
+                self.slow_queries.append({
+                    'query': key,
+                    'params': [str(p) for p in params] if isinstance(params, (list, tuple)) else None,
+                    'duration_ms': round(duration_ms, 3),
+                    'at': datetime.now().isoformat()
+                })
+
+        counters = getattr(self._local, 'counters', None)
+        if counters is not None:
+            counters['queries'] += 1
+            counters['time_ms'] += duration_ms
+
+    def begin_request(self):
+        """Remettre à zéro les compteurs de la requête HTTP courante (par thread)"""
+        self._local.counters = {'queries': 0, 'time_ms': 0.0}
+
+    def request_counters(self):
+        """Compteurs de la requête HTTP courante"""
+        return getattr(self._local, 'counters', None) or {'queries': 0, 'time_ms': 0.0}
+
+    def snapshot(self, top=20):
+        """Cumul + requêtes les plus coûteuses + journal des requêtes lentes"""
+        with self._lock:
+            statements = sorted(
+                ({'query': q, **s} for q, s in self.statement_stats.items()),
+                key=lambda s: s['total_ms'],
+                reverse=True
+            )[:top]
+            return {
+                'total_queries': self.total_queries,
+                'total_time_ms': round(self.total_time * 1000, 3),
+                'slow_query_threshold_ms': self.slow_query_ms,
+                'top_statements': statements,
+                'slow_queries': list(self.slow_queries)
+            }
+
+    def reset(self):
+        """Remettre à zéro les statistiques cumulées"""
+        with self._lock:
+            self.total_queries = 0
+            self.total_time = 0.0
+            self.statement_stats.clear()
+            self.slow_queries.clear()
@@ -0,0 +1,291 @@
+"""
+Mode prefork du serveur : N processus lecteurs + 1 writer
+
+    python backend/server.py --workers 4
+
+- Le processus parent ouvre la socket publique, crée la mémoire partagée
+  des versions puis forke ; il ne sert aucune requête et relance les
+  processus qui s'arrêtent.
+- Les lecteurs acceptent tous sur la même socket. Ils routent depuis le
+  snapshot binaire mappé (mêmes pages mémoire pour tous) et transmettent
+  les modifications (POST / PUT / DELETE) au writer.
+- Le writer, seul à modifier le graphe, écoute sur une socket interne.
+  Après chaque modification il incrémente les versions partagées et
+  réécrit le snapshot ; les lecteurs voient la nouvelle version à leur
+  prochaine requête (caches invalidés par ETag, snapshot remappé) et
+  relaient le journal des modifications à leurs abonnés SSE.
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.config import STORAGE_BACKEND, SQLITE_PATH, SNAPSHOT_PATH
+
+
+class SharedState:
+    """Versions partagées entre les processus (mémoire partagée créée avant le fork)"""
+
+    FIELDS = ('graph', 'constraints', 'change', 'snapshot')
+
+    def __init__(self):
+        # change = -1 : pas encore lue par le writer ; snapshot = -1 : aucun snapshot publié
+        self._values = multiprocessing.Array('q', [0, 0, -1, -1])
+
+    def get(self, field):
+        return self._values[self.FIELDS.index(field)]
+
+    def set(self, field, value):
+        with self._values.get_lock():
+            self._values[self.FIELDS.index(field)] = value
+
+    def increment(self, field):
+        with self._values.get_lock():
+            index = self.FIELDS.index(field)
+            self._values[index] += 1
+            return self._values[index]
+
+    def set_max(self, field, value):
+        with self._values.get_lock():
+            index = self.FIELDS.index(field)
+            if value > self._values[index]:
+                self._values[index] = value
+
+
+# =====================
+# WRITER
+# =====================
+
+class SnapshotPublisher:
+    """
+    Réécrire le snapshot après les modifications (writer) et publier sa version
+
+    Les modifications rapprochées sont regroupées (delay) : une rafale
+    d'écritures ne provoque qu'une reconstruction.
+    """
+
+    def __init__(self, algo_controller, state, delay=0.2):
+        self.algo_controller = algo_controller
+        self.state = state
+        self.delay = delay
+        self._dirty = threading.Event()
+
+    def start(self):
+        from backend.controllers import GraphController
+        GraphController.subscribe(lambda entity, operation, data: self._dirty.set())
+        self.publish()
+        threading.Thread(target=self._run, name='snapshot-publisher', daemon=True).start()
+
+    def publish(self):
+        """Écrire le snapshot de la version courante ; publié s'il est resté à jour"""
+        version = self.state.get('graph')
+        result = self.algo_controller.write_snapshot()
+        if result['installed'] and self.state.get('graph') == version:
+            self.state.set('snapshot', version)
+
+    def _run(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.delay)
+            self._dirty.clear()
+            try:
+                self.publish()
+            except Exception as e:
+                print(f"Avertissement: snapshot non publié: {e}")
+
+
+# =====================
+# LECTEURS
+# =====================
+
+class ReaderSync:
+    """
+    Appelé avant chaque requête d'un lecteur : suivre les versions du writer
+
+    Si la version du graphe a changé, le snapshot mappé est abandonné (routage
+    depuis la BDD) jusqu'à ce que le writer publie celui de la nouvelle version.
+    """
+
+    def __init__(self, algo_controller, state):
+        self.algo_controller = algo_controller
+        self.state = state
+        self._seen = None
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        graph_version = self.state.get('graph')
+        with self._lock:
+            if graph_version != self._seen:
+                self._seen = graph_version
+                self.algo_controller._on_graph_change('graph', 'sync', {})
+
+            if self.algo_controller.snapshot is None and self.state.get('snapshot') == graph_version:
+                try:
+                    self.algo_controller.load_snapshot(SNAPSHOT_PATH)
+                except Exception as e:
+                    print(f"Avertissement: snapshot partagé illisible: {e}")
+
+
+class ChangeRelay:
+    """Tick du broker SSE d'un lecteur : relayer les modifications faites par le writer"""
+
+    def __init__(self, graph_controller, state, publish):
+        self.graph_controller = graph_controller
+        self.state = state
+        self.publish = publish
+        # Dès le démarrage du lecteur : rien de ce qui suit n'est manqué
+        self._last = graph_controller.get_change_version()
+
+    def __call__(self):
+        latest = self.state.get('change')
+        if latest < 0:
+            return
+
+        while self._last < latest:
+            result = self.graph_controller.get_changes(self._last)
+            if result['resync_required']:
+                self._last = result['version']
+                return
+            for change in result['changes']:
+                self.publish(change['entity'], change['operation'],
+                             dict(change['data'], version=change['version']))
+            self._last = result['version']
+            if not result['has_more']:
+                return
+
+
+# =====================
+# PROCESSUS
+# =====================
+
+def _bind(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(128)
+    return sock
+
+
+def _child_main(role, sock, state, writer_address, app):
+    """
+    Point d'entrée d'un processus forké (writer ou lecteur)
+
+    app : objets du module serveur qui a lancé le prefork (voir serve_prefork) ;
+    les réimporter créerait un second module (backend.server lancé comme
+    __main__) avec ses propres contrôleurs et abonnements.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # Ctrl+C : c'est le parent qui arrête tout
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    from backend.controllers import GraphController
+    from backend.event_stream import EventBroker
+
+    WasteGraphHandler, WasteGraphServer, _publish_change, _expiry_loop = app
+    graph_controller = WasteGraphHandler.graph_controller
+    algo_controller = WasteGraphHandler.algo_controller
+
+    # Un processus = une unité de parallélisme : pas de pool de calcul par processus
+    algo_controller.executor = None
+
+    GraphController.attach_shared_state(state, writer=(role == 'writer'))
+
+    if role == 'writer':
+        GraphController._change_version = None
+        state.set_max('change', graph_controller.get_change_version())
+        WasteGraphHandler.event_broker = EventBroker()
+        SnapshotPublisher(algo_controller, state).start()
+        threading.Thread(target=_expiry_loop, args=(graph_controller,),
+                         name='constraint-expiry', daemon=True).start()
+    else:
+        WasteGraphHandler.writer_address = writer_address
+        WasteGraphHandler.request_hook = ReaderSync(algo_controller, state)
+        WasteGraphHandler.event_broker = EventBroker(
+            tick=ChangeRelay(graph_controller, state, _publish_change))
+
+    httpd = WasteGraphServer(sock.getsockname(), WasteGraphHandler, bind_and_activate=False)
+    httpd.socket.close()
+    httpd.socket = sock
+    httpd.serve_forever()
+
+
+def serve_prefork(host, port, workers, handler, server_class, publish, expiry_loop):
+    """
+    Lancer le writer et les lecteurs, et les relancer s'ils s'arrêtent
+
+    Args:
+        workers: Nombre de processus lecteurs (acceptant sur la socket publique)
+        handler: Classe de handler HTTP (porte les contrôleurs)
+        server_class: Classe de serveur HTTP
+        publish: Diffusion d'une modification aux abonnés SSE (entity, operation, data)
+        expiry_loop: Boucle de détection des contraintes expirées (writer)
+    """
+    if not hasattr(os, 'fork'):
+        raise RuntimeError("Le mode prefork nécessite fork() (Linux / macOS)")
+    if STORAGE_BACKEND == 'sqlite' and SQLITE_PATH == ':memory:':
+        raise RuntimeError("Le mode prefork nécessite une base partagée "
+                           "(PostgreSQL ou WASTEGRAPH_SQLITE_PATH=fichier)")
+
+    public = _bind(host, port)
+    internal = _bind('127.0.0.1', 0)
+    writer_address = internal.getsockname()
+    state = SharedState()
+    app = (handler, server_class, publish, expiry_loop)
+    children = {}
+
+    def spawn(role):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                if role == 'writer':
+                    public.close()
+                    _child_main(role, internal, state, writer_address, app)
+                else:
+                    internal.close()
+                    _child_main(role, public, state, writer_address, app)
+            except BaseException as e:
+                print(f"✗ Processus {role} arrêté: {e}")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = role
+
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    spawn('writer')
+    for _ in range(workers):
+        spawn('reader')
+    print(f"✓ Prefork : 1 writer + {workers} lecteurs sur http://{host}:{port}")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        role = children.pop(pid, None)
+        if role and not stopping:
+            print(f"Avertissement: processus {role} ({pid}) arrêté, relance")
+            spawn(role)
+
+    public.close()
+    internal.close()
+    print("\n✓ Serveur arrêté proprement")
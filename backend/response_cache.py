@@ -0,0 +1,97 @@
+import gzip
+import json
+import threading
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.config import GZIP_MIN_BYTES
+
+
+def accepts_gzip(accept_encoding):
+    """Le client accepte-t-il gzip ? (header Accept-Encoding, q=0 = refus)"""
+    for part in (accept_encoding or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            params = params.replace(' ', '')
+            return params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def etag_matches(if_none_match, etag):
+    """Comparaison faible d'un header If-None-Match avec l'ETag courant"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    weak = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == weak:
+            return True
+    return False
+
+
+def encode_json(data):
+    """Sérialisation JSON des réponses (identique à _send_json)"""
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+class CachedPayload:
+    """Réponse sérialisée d'une version donnée (+ sa version gzip, calculée une fois)"""
+
+    def __init__(self, etag, body):
+        self.etag = etag
+        self.body = body
+        self._gzipped = None
+
+    def encoded(self, use_gzip):
+        """
+        Returns:
+            tuple: (octets à envoyer, Content-Encoding ou None)
+        """
+        if not use_gzip or len(self.body) < GZIP_MIN_BYTES:
+            return self.body, None
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped, 'gzip'
+
+
+class ResponseCache:
+    """
+    Octets des réponses JSON par clé de route et par version (ETag)
+
+    Tant que la version ne change pas, les requêtes répétées évitent
+    le chargement, to_dict() et json.dumps(). Une seule version est
+    gardée par clé : la précédente devient inutile dès qu'elle change.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, etag, build):
+        """
+        Payload de la clé pour cet ETag, construit par build() si absent
+
+        Args:
+            key: Clé de la réponse (ex: 'graph')
+            etag: ETag de la version lue AVANT de construire la réponse
+            build: Fonction retournant les données JSON
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.etag == etag:
+            return entry, True
+
+        entry = CachedPayload(etag, encode_json(build()))
+        with self._lock:
+            self._entries[key] = entry
+        return entry, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
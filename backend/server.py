@@ -1,12 +1,51 @@
 from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+import argparse
+import functools
+import gzip
+import http.client
 import json
 import sys
 import os
+import threading
+import time
 from urllib.parse import urlparse, parse_qs
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from backend.controllers import GraphController, AlgorithmController
+from backend.algorithms import AlgorithmTimeout, AlgorithmCancelled, parse_schedule, parse_departure
+from backend.monitoring import REGISTRY, route_label
+from backend.monitoring.metrics import HTTP_REQUESTS, HTTP_ERRORS, HTTP_LATENCY, HTTP_IN_FLIGHT, HTTP_CACHE
+from backend.event_stream import EventBroker, format_event
+from backend.response_cache import ResponseCache, CachedPayload, accepts_gzip, etag_matches, encode_json
+from config.config import GZIP_MIN_BYTES, CHANGE_LOG_SIZE, SERVER_WORKERS
+
+
+def _instrumented(handler):
+    """Middleware : latence, compteurs et requêtes en cours pour chaque route"""
+    @functools.wraps(handler)
+    def wrapper(self):
+        method = self.command
+        route = route_label(urlparse(self.path).path)
+        self._status = None
+        HTTP_IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            return handler(self)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec(method=method)
+            status = self._status or 500
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            if status >= 400:
+                HTTP_ERRORS.inc(method=method, route=route, status=status)
+            
+            counters = self.graph_controller.storage.request_counters()
+            self.log_message('"%s" %s %.1fms (%d requêtes SQL)',
+                             self.requestline, status, elapsed * 1000, counters['queries'])
+    return wrapper
 
 
 class WasteGraphHandler(BaseHTTPRequestHandler):
@@ -14,25 +53,187 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
     
     graph_controller = GraphController()
     algo_controller = AlgorithmController()
+    response_cache = ResponseCache()
+    event_broker = EventBroker(tick=graph_controller.check_expirations)
+    
+    # Mode prefork (lecteurs) : adresse du writer et synchronisation des versions
+    writer_address = None
+    request_hook = None
+    
+    def handle_one_request(self):
+        """Traiter une requête (compteurs SQL remis à zéro à chaque requête)"""
+        self.graph_controller.storage.begin_request()
+        if self.request_hook is not None:
+            self.request_hook()
+        super().handle_one_request()
+    
+    def send_response(self, code, message=None):
+        """Mémoriser le status envoyé (pour les métriques)"""
+        self._status = code
+        super().send_response(code, message)
+    
+    def log_request(self, code='-', size='-'):
+        """Pas de log à l'envoi des headers : _instrumented logge avec la latence"""
     
-    def _set_headers(self, status_code=200, content_type='application/json'):
+    def _set_headers(self, status_code=200, content_type='application/json', extra_headers=None):
         """Définir les headers de la réponse"""
         self.send_response(status_code)
-        self.send_header('Content-Type', content_type)
+        if content_type:
+            self.send_header('Content-Type', content_type)
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, PUT, DELETE, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+        self.send_header('Access-Control-Expose-Headers', 'ETag, X-Change-Version, X-DB-Queries, X-DB-Time-Ms')
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        
+        # Nombre de requêtes SQL émises pour cet appel (détection des N+1)
+        counters = self.graph_controller.storage.request_counters()
+        self.send_header('X-DB-Queries', str(counters['queries']))
+        self.send_header('X-DB-Time-Ms', f"{counters['time_ms']:.3f}")
         self.end_headers()
     
+    def _send_body(self, body, status_code=200, content_type='application/json', extra_headers=None):
+        """Envoyer un corps déjà sérialisé, compressé en gzip s'il est gros et accepté"""
+        headers = dict(extra_headers or {})
+        if len(body) >= GZIP_MIN_BYTES and accepts_gzip(self.headers.get('Accept-Encoding')):
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+        headers['Content-Length'] = str(len(body))
+        self._set_headers(status_code, content_type, headers)
+        self.wfile.write(body)
+    
     def _send_json(self, data, status_code=200):
         """Envoyer une réponse JSON"""
-        self._set_headers(status_code)
-        self.wfile.write(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        self._send_body(encode_json(data), status_code)
+    
+    def _send_versioned(self, key, kind, build, cache=True):
+        """
+        Envoyer une réponse JSON liée à la version du graphe ou des contraintes
+        
+        ETag = version : If-None-Match identique → 304 sans corps. Sinon les
+        octets (et leur version gzip) sont servis depuis le cache de la version.
+        
+        Args:
+            key: Clé du cache (une par route)
+            kind: 'graph' ou 'constraints'
+            build: Fonction retournant les données si la version n'est pas en cache
+            cache: False pour les réponses paramétrées (une par requête) : seul
+                   l'ETag sert, le cache ne garderait qu'une entrée par clé
+        """
+        # Versions lues AVANT la construction : au pire le contenu est plus récent
+        change_version = self.graph_controller.get_change_version()
+        etag = self.graph_controller.get_etag(kind)
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding',
+                   'X-Change-Version': str(change_version)}
+        
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            HTTP_CACHE.inc(route=key, result='not_modified')
+            self._set_headers(304, None, headers)
+            return
+        
+        if cache:
+            entry, hit = self.response_cache.get(key, etag, build)
+        else:
+            entry, hit = CachedPayload(etag, encode_json(build())), False
+        HTTP_CACHE.inc(route=key, result='hit' if hit else 'miss')
+        
+        body, encoding = entry.encoded(accepts_gzip(self.headers.get('Accept-Encoding')))
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(body))
+        self._set_headers(200, 'application/json', headers)
+        self.wfile.write(body)
+    
+    def _send_stream(self, items):
+        """Envoyer une suite d'objets JSON au fil de l'eau (NDJSON)"""
+        self._set_headers(200, 'application/x-ndjson')
+        try:
+            for item in items:
+                self.wfile.write(json.dumps(item, ensure_ascii=False).encode('utf-8') + b'\n')
+                self.wfile.flush()
+        except Exception as e:
+            # Les headers sont déjà partis : l'erreur devient la dernière ligne
+            self.wfile.write(json.dumps({'type': 'error', 'error': str(e)}).encode('utf-8') + b'\n')
+    
+    def _open_event_stream(self, since=None):
+        """
+        Ouvrir un flux SSE et confier la socket au broker d'événements
+        
+        Le handler retourne immédiatement : aucun thread n'est bloqué par
+        un abonné. Si le client fournit une version (Last-Event-ID à la
+        reconnexion, ou ?since=), les modifications manquées sont rejouées
+        depuis le journal, ou un événement 'resync' est envoyé.
+        """
+        controller = self.graph_controller
+        initial = b'retry: 3000\n\n' + format_event('hello', {
+            'change_version': controller.get_change_version(),
+            'versions': {kind: controller.get_version(kind) for kind in ('graph', 'constraints')}
+        })
+        
+        if since is not None:
+            missed = controller.get_changes(since, CHANGE_LOG_SIZE)
+            if missed['resync_required'] or missed['has_more']:
+                initial += format_event('resync', {'version': missed['version']})
+            else:
+                for change in missed['changes']:
+                    initial += format_event('change', {
+                        'entity': change['entity'],
+                        'operation': change['operation'],
+                        'version': change['version'],
+                        'data': change['data']
+                    }, change['version'])
+        
+        self._set_headers(200, 'text/event-stream; charset=utf-8', {'Cache-Control': 'no-cache'})
+        self.wfile.flush()
+        
+        # La socket survit à la fin du handler (voir WasteGraphServer.shutdown_request)
+        self.close_connection = True
+        detach = getattr(self.server, 'detach', None)
+        if detach is None:
+            self.wfile.write(initial)
+            return
+        detach(self.connection)
+        self.event_broker.subscribe(self.connection, initial)
     
     def _send_error(self, message, status_code=400):
         """Envoyer une erreur"""
         self._send_json({'error': message}, status_code)
     
+    def _forward_to_writer(self):
+        """
+        Mode prefork : transmettre une modification au processus writer
+        
+        Returns:
+            bool: True si la requête a été transmise (réponse déjà envoyée)
+        """
+        path = urlparse(self.path).path
+        if self.writer_address is None or path.startswith(('/debug/', '/algo/')):
+            return False
+        
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else None
+        try:
+            conn = http.client.HTTPConnection(*self.writer_address, timeout=60)
+            conn.request(self.command, self.path, body,
+                         {'Content-Type': self.headers.get('Content-Type', 'application/json')})
+            response = conn.getresponse()
+            data = response.read()
+            conn.close()
+        except OSError as e:
+            self._send_error(f"Writer indisponible: {e}", 502)
+            return True
+        
+        self._send_body(data, response.status, response.getheader('Content-Type', 'application/json'))
+        return True
+    
+    def _task_params(self, query_params):
+        """Paramètres des calculs : ?timeout=<s> et ?task=<id> (pour DELETE /algo/tasks/<id>)"""
+        timeout = query_params.get('timeout', [None])[0]
+        task_id = query_params.get('task', [None])[0]
+        return (float(timeout) if timeout else None), task_id
+    
     def _parse_body(self):
         """Parser le body JSON de la requête"""
         content_length = int(self.headers.get('Content-Length', 0))
@@ -41,10 +242,12 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
         body = self.rfile.read(content_length)
         return json.loads(body.decode('utf-8'))
     
+    @_instrumented
     def do_OPTIONS(self):
         """Gérer les requêtes OPTIONS (CORS preflight)"""
         self._set_headers(204)
     
+    @_instrumented
     def do_GET(self):
         """Gérer les requêtes GET"""
         parsed_path = urlparse(self.path)
@@ -52,20 +255,80 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
         query_params = parse_qs(parsed_path.query)
         
         try:
-            # GET /graph - Récupérer tout le graphe
+            # GET /graph - Récupérer tout le graphe (?bbox=minx,miny,maxx,maxy : zone visible)
             if path == '/graph':
-                graph = self.graph_controller.get_graph()
-                self._send_json(graph.to_dict())
+                bbox = query_params.get('bbox', [None])[0]
+                if bbox is None:
+                    self._send_versioned('graph', 'graph',
+                                         lambda: self.graph_controller.get_graph().to_dict())
+                    return
+                try:
+                    min_x, min_y, max_x, max_y = (float(v) for v in bbox.split(','))
+                except ValueError:
+                    self._send_error("Paramètre 'bbox' invalide (minx,miny,maxx,maxy)")
+                    return
+                self._send_versioned('graph_bbox', 'graph',
+                                     lambda: self.algo_controller.get_region(min_x, min_y, max_x, max_y),
+                                     cache=False)
+            
+            # GET /graph/nearest?x=&y=&k=5 - Nœuds les plus proches d'un point
+            elif path == '/graph/nearest':
+                try:
+                    x = float(query_params['x'][0])
+                    y = float(query_params['y'][0])
+                    k = int(query_params.get('k', [1])[0])
+                except (KeyError, ValueError):
+                    self._send_error("Paramètres 'x' et 'y' requis (nombres), 'k' entier")
+                    return
+                self._send_json(self.algo_controller.nearest_nodes(x, y, k))
+            
+            # GET /graph/changes?since=42&limit=1000 - Modifications depuis une version
+            elif path == '/graph/changes':
+                since = query_params.get('since', [None])[0]
+                if since is None:
+                    self._send_error("Paramètre 'since' requis")
+                    return
+                limit = int(query_params.get('limit', [1000])[0])
+                self._send_json(self.graph_controller.get_changes(int(since), limit))
+            
+            # GET /events - Flux SSE des modifications (Last-Event-ID / ?since= pour rattraper)
+            elif path == '/events':
+                since = self.headers.get('Last-Event-ID') or query_params.get('since', [None])[0]
+                self._open_event_stream(int(since) if since else None)
+            
+            # GET /graph/components?limit=50 - Composantes connexes (?node=X : celle de X)
+            elif path == '/graph/components':
+                node = query_params.get('node', [None])[0]
+                limit = int(query_params.get('limit', [50])[0])
+                components = self.algo_controller.get_components(node, limit)
+                if components is None:
+                    self._send_error(f"Nœud '{node}' introuvable", 404)
+                    return
+                self._send_json(components)
+            
+            # GET /graph/snapshot - État du snapshot binaire
+            elif path == '/graph/snapshot':
+                self._send_json(self.algo_controller.snapshot_status())
             
             # GET /constraints - Contraintes actives
             elif path == '/constraints':
-                constraints = self.graph_controller.get_active_constraints()
-                self._send_json(constraints)
+                self._send_versioned('constraints', 'constraints',
+                                     self.graph_controller.get_active_constraints)
             
             # GET /constraints/all - Toutes les contraintes
             elif path == '/constraints/all':
-                constraints = self.graph_controller.get_all_constraints()
-                self._send_json(constraints)
+                self._send_versioned('constraints/all', 'constraints',
+                                     self.graph_controller.get_all_constraints)
+            
+            # GET /constraints/slots?at=2024-05-13T08:30 - Créneaux des contraintes à calendrier
+            elif path == '/constraints/slots':
+                at = query_params.get('at', [None])[0]
+                try:
+                    at = parse_departure(at) if at else None
+                except ValueError:
+                    self._send_error("Paramètre 'at' invalide (date ISO 8601)")
+                    return
+                self._send_json(self.algo_controller.get_time_slots(at))
             
             # GET /history/paths - Historique des calculs
             elif path == '/history/paths':
@@ -73,44 +336,145 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
                 history = self.algo_controller.get_path_history(limit)
                 self._send_json(history)
             
+            # GET /history/storage - Gain de stockage de l'historique dédupliqué
+            elif path == '/history/storage':
+                stats = self.algo_controller.get_history_storage_stats()
+                self._send_json(stats)
+            
+            # GET /history/replay?limit=1000&workers=4 - Replay en masse (NDJSON)
+            elif path == '/history/replay':
+                limit = int(query_params.get('limit', [1000])[0])
+                workers = query_params.get('workers', [None])[0]
+                workers = int(workers) if workers else None
+                self._send_stream(self.algo_controller.replay_history_bulk(limit, workers))
+            
             # GET /history/paths/{id}/replay - Recalculer un chemin
             elif path.startswith('/history/paths/') and path.endswith('/replay'):
                 history_id = int(path.split('/')[3])
                 result = self.algo_controller.replay_path_calculation(history_id)
                 self._send_json(result)
             
-            # GET /algo/dijkstra?src=A&dst=Z&constraints={"A-B":5}
+            # GET /algo/dijkstra?src=A&dst=Z&constraints={"A-B":5}&departure=2024-05-13T08:30
             elif path == '/algo/dijkstra':
                 source = query_params.get('src', [None])[0]
                 destination = query_params.get('dst', [None])[0]
                 constraints_str = query_params.get('constraints', ['{}'])[0]
                 save_history = query_params.get('save', ['true'])[0].lower() == 'true'
                 notes = query_params.get('notes', [None])[0]
+                departure = query_params.get('departure', [None])[0]
                 
                 if not source or not destination:
                     self._send_error("Paramètres 'src' et 'dst' requis")
                     return
+                try:
+                    departure = parse_departure(departure) if departure else None
+                except ValueError:
+                    self._send_error("Paramètre 'departure' invalide (date ISO 8601)")
+                    return
                 
                 custom_constraints = json.loads(constraints_str) if constraints_str else {}
+                timeout, task_id = self._task_params(query_params)
                 
                 result = self.algo_controller.find_shortest_path(
-                    source, destination, custom_constraints, save_history, notes
+                    source, destination, custom_constraints, save_history, notes, timeout, task_id,
+                    departure
+                )
+                self._send_json(result)
+            
+            # GET /algo/nearest-depot?depots=D1,D2&constraints={"A-B":5}
+            elif path == '/algo/nearest-depot':
+                depots = [d for d in query_params.get('depots', [''])[0].split(',') if d]
+                if not depots:
+                    self._send_error("Paramètre 'depots' requis (ex: depots=D1,D2)")
+                    return
+                constraints_str = query_params.get('constraints', ['{}'])[0]
+                custom_constraints = json.loads(constraints_str) if constraints_str else {}
+                timeout, task_id = self._task_params(query_params)
+                
+                result = self.algo_controller.assign_nearest_depots(
+                    depots, custom_constraints, timeout, task_id
+                )
+                self._send_json(result)
+            
+            # GET /algo/reachable?src=D1&budget=120&frontier=true - Zone atteignable (isochrone)
+            elif path == '/algo/reachable':
+                source = query_params.get('src', [None])[0]
+                budget = query_params.get('budget', [None])[0]
+                if not source or budget is None:
+                    self._send_error("Paramètres 'src' et 'budget' requis")
+                    return
+                constraints_str = query_params.get('constraints', ['{}'])[0]
+                custom_constraints = json.loads(constraints_str) if constraints_str else {}
+                with_frontier = query_params.get('frontier', ['false'])[0].lower() == 'true'
+                timeout, task_id = self._task_params(query_params)
+                
+                result = self.algo_controller.reachable_within(
+                    source, float(budget), custom_constraints, with_frontier, timeout, task_id
                 )
                 self._send_json(result)
             
+            # GET /algo/critical-edges?top=20&samples=200&seed=0 - Intermédiarité des arêtes
+            elif path == '/algo/critical-edges':
+                samples = query_params.get('samples', [None])[0]
+                seed = int(query_params.get('seed', [0])[0])
+                top = int(query_params.get('top', [20])[0])
+                constraints_str = query_params.get('constraints', ['{}'])[0]
+                custom_constraints = json.loads(constraints_str) if constraints_str else {}
+                timeout, task_id = self._task_params(query_params)
+                
+                result = self.algo_controller.edge_criticality(
+                    int(samples) if samples else None, seed, top, custom_constraints, timeout, task_id
+                )
+                self._send_json(result)
+            
+            # GET /algo/partition?k=4&tolerance=0.1 - Zones de collecte équilibrées
+            elif path == '/algo/partition':
+                k = query_params.get('k', [None])[0]
+                if not k:
+                    self._send_error("Paramètre 'k' requis (nombre de zones)")
+                    return
+                tolerance = float(query_params.get('tolerance', [0.1])[0])
+                timeout, task_id = self._task_params(query_params)
+                
+                result = self.algo_controller.partition_zones(int(k), tolerance, timeout, task_id)
+                self._send_json(result)
+            
             # GET /algo/coloring
             elif path == '/algo/coloring':
-                result = self.algo_controller.color_graph()
+                timeout, task_id = self._task_params(query_params)
+                result = self.algo_controller.color_graph(timeout, task_id)
                 self._send_json(result)
             
+            # GET /algo/executor - File d'attente et workers du pool de calcul
+            elif path == '/algo/executor':
+                self._send_json(self.algo_controller.executor_status())
+            
+            # GET /metrics - Métriques au format Prometheus
+            elif path == '/metrics':
+                self._set_headers(200, 'text/plain; version=0.0.4; charset=utf-8')
+                self.wfile.write(REGISTRY.render().encode('utf-8'))
+            
+            # GET /debug/queries - Statistiques SQL cumulées + requêtes lentes
+            elif path == '/debug/queries':
+                top = int(query_params.get('top', [20])[0])
+                self._send_json(self.graph_controller.storage.get_query_stats(top))
+            
             else:
                 self._send_error(f"Route inconnue: {path}", 404)
         
+        except AlgorithmTimeout as e:
+            self._send_error(str(e), 504)
+        except AlgorithmCancelled as e:
+            self._send_error(str(e), 409)
         except Exception as e:
             self._send_error(str(e), 500)
     
+    @_instrumented
     def do_POST(self):
         """Gérer les requêtes POST"""
+        if self._forward_to_writer():
+            return
+        
         path = self.path
         
         try:
@@ -150,24 +514,84 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
                 constraint_value = data.get('constraint_value')
                 reason = data.get('reason')
                 expiry_days = data.get('expiry_days')
+                schedule = data.get('schedule')
                 
                 if not source or not target or constraint_value is None:
                     self._send_error("Les champs 'source', 'target' et 'constraint_value' sont requis")
                     return
+                try:
+                    parse_schedule(schedule)
+                except ValueError as e:
+                    self._send_error(f"Champ 'schedule' invalide: {e}")
+                    return
                 
                 result = self.graph_controller.create_constraint(
-                    source, target, constraint_value, reason, expiry_days
+                    source, target, constraint_value, reason, expiry_days, schedule
                 )
                 self._send_json(result, 201)
             
+            # POST /graph/snapshot - Écrire (et mapper) un snapshot depuis la BDD
+            elif path == '/graph/snapshot':
+                result = self.algo_controller.write_snapshot()
+                self._send_json(result, 201)
+            
+            # POST /algo/tours - Tournées de collecte sous capacité des camions
+            elif path == '/algo/tours':
+                depot = data.get('depot')
+                if not depot:
+                    self._send_error("Le champ 'depot' est requis")
+                    return
+                
+                result = self.algo_controller.plan_collection_tours(
+                    depot,
+                    points=data.get('points'),
+                    vehicle_capacity=data.get('vehicle_capacity'),
+                    method=data.get('method', 'savings'),
+                    time_budget=float(data.get('time_budget', 2.0)),
+                    custom_constraints=data.get('constraints'),
+                    with_paths=bool(data.get('paths', False)),
+                    timeout=data.get('timeout'),
+                    task_id=data.get('task')
+                )
+                self._send_json(result)
+            
+            # POST /algo/scenarios - Comparer des scénarios de contraintes sur les mêmes trajets
+            elif path == '/algo/scenarios':
+                pairs = data.get('pairs')
+                scenarios = data.get('scenarios')
+                if not pairs or not scenarios:
+                    self._send_error("Les champs 'pairs' et 'scenarios' sont requis")
+                    return
+                
+                result = self.algo_controller.compare_scenarios(
+                    pairs, scenarios,
+                    with_paths=bool(data.get('paths', False)),
+                    timeout=data.get('timeout'),
+                    task_id=data.get('task')
+                )
+                self._send_json(result)
+            
+            # POST /history/compact - Migrer l'ancien historique vers les payloads
+            elif path == '/history/compact':
+                migrated = self.algo_controller.compact_path_history()
+                self._send_json({'migrated_rows': migrated})
+            
             else:
                 self._send_error(f"Route inconnue: {path}", 404)
         
+        except AlgorithmTimeout as e:
+            self._send_error(str(e), 504)
+        except AlgorithmCancelled as e:
+            self._send_error(str(e), 409)
         except Exception as e:
             self._send_error(str(e), 500)
     
+    @_instrumented
     def do_PUT(self):
         """Gérer les requêtes PUT"""
+        if self._forward_to_writer():
+            return
+        
         path = self.path
         
         try:
@@ -191,13 +615,30 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
         except Exception as e:
             self._send_error(str(e), 500)
     
+    @_instrumented
     def do_DELETE(self):
         """Gérer les requêtes DELETE"""
+        if self._forward_to_writer():
+            return
+        
         path = self.path
         
         try:
+            # DELETE /debug/queries - Remettre à zéro les statistiques SQL
+            if path == '/debug/queries':
+                self.graph_controller.storage.reset_query_stats()
+                self._send_json({'message': 'Statistiques SQL remises à zéro'})
+            
+            # DELETE /algo/tasks/{id} - Annuler un calcul en file ou en cours
+            elif path.startswith('/algo/tasks/'):
+                task_id = path.split('/')[3]
+                if self.algo_controller.cancel_task(task_id):
+                    self._send_json({'message': f'Calcul {task_id} annulé'})
+                else:
+                    self._send_error("Calcul non trouvé (déjà terminé ?)", 404)
+            
             # DELETE /graph - Vider tout
-            if path == '/graph':
+            elif path == '/graph':
                 self.graph_controller.clear_graph()
                 self._send_json({'message': 'Graphe vidé'})
             
@@ -244,10 +685,66 @@ class WasteGraphHandler(BaseHTTPRequestHandler):
         print(f"[{self.log_date_time_string()}] {format % args}")
 
 
-def run_server(host='localhost', port=8000):
-    """Lancer le serveur"""
-    server_address = (host, port)
-    httpd = HTTPServer(server_address, WasteGraphHandler)
+def _publish_change(entity, operation, data):
+    """Diffuser chaque modification du graphe aux abonnés SSE"""
+    data = dict(data)
+    version = data.pop('version', None)
+    WasteGraphHandler.event_broker.publish('change', {
+        'entity': entity,
+        'operation': operation,
+        'version': version,
+        'versions': WasteGraphHandler.graph_controller.get_versions(),
+        'data': data
+    }, version)
+
+
+GraphController.subscribe(_publish_change)
+
+
+def _expiry_loop(graph_controller, interval=1.0):
+    """Détecter les expirations de contraintes même sans requête (processus qui écrit)"""
+    while True:
+        time.sleep(interval)
+        try:
+            graph_controller.check_expirations()
+        except Exception as e:
+            print(f"Avertissement: détection des expirations en erreur: {e}")
+
+
+class WasteGraphServer(ThreadingMixIn, HTTPServer):
+    """
+    Serveur HTTP multi-thread (un calcul long ne bloque plus les autres requêtes)
+    
+    Les sockets des flux SSE survivent à la fin de la requête.
+    """
+    
+    daemon_threads = True
+    
+    # Beaucoup d'écrans se connectent au flux en même temps (défaut : 5)
+    request_queue_size = 128
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._detached = set()
+    
+    def detach(self, connection):
+        """La socket appartient désormais au broker d'événements"""
+        self._detached.add(connection)
+    
+    def shutdown_request(self, request):
+        if request in self._detached:
+            self._detached.discard(request)
+            return
+        super().shutdown_request(request)
+
+
+def run_server(host='localhost', port=8000, workers=1):
+    """
+    Lancer le serveur
+    
+    Args:
+        workers: Nombre de processus ; > 1 = mode prefork (voir backend/prefork.py)
+    """
     
     print(f"╔════════════════════════════════════════════╗")
     print(f"║   WasteGraph API Server v2.0               ║")
@@ -262,19 +759,63 @@ def run_server(host='localhost', port=8000):
     print(f"    DELETE /node/{{id}}/smart      (suppression intelligente)")
     print(f"    DELETE /edge/{{source}}/{{target}}")
     print(f"    DELETE /graph")
+    print(f"    GET    /graph/changes?since={{version}}")
+    print(f"    GET    /events                 (flux SSE)")
+    print(f"    GET    /graph/components?node={{id}}")
+    print(f"    GET    /graph?bbox=minx,miny,maxx,maxy")
+    print(f"    GET    /graph/nearest?x=&y=&k=")
+    print(f"    GET    /graph/snapshot")
+    print(f"    POST   /graph/snapshot")
     print(f"\n  CONSTRAINTS:")
     print(f"    GET    /constraints")
     print(f"    GET    /constraints/all")
-    print(f"    POST   /constraints")
+    print(f"    POST   /constraints             {{source, target, constraint_value, schedule: [{{days, start, end}}]}}")
+    print(f"    GET    /constraints/slots?at=2024-05-13T08:30")
     print(f"    PUT    /constraints/{{id}}/toggle")
     print(f"\n  ALGORITHMS:")
-    print(f"    GET    /algo/dijkstra?src=A&dst=Z&constraints={{...}}")
+    print(f"    GET    /algo/dijkstra?src=A&dst=Z&constraints={{...}}&departure=2024-05-13T08:30&timeout=5&task={{id}}")
     print(f"    GET    /algo/coloring")
+    print(f"    GET    /algo/nearest-depot?depots=D1,D2")
+    print(f"    GET    /algo/reachable?src=D1&budget=120&frontier=true")
+    print(f"    GET    /algo/partition?k=4&tolerance=0.1")
+    print(f"    GET    /algo/critical-edges?top=20&samples=200")
+    print(f"    POST   /algo/tours              {{depot, points, vehicle_capacity, method, time_budget}}")
+    print(f"    POST   /algo/scenarios          {{pairs: [[src, dst]], scenarios: [{{name, constraints}}]}}")
+    print(f"    GET    /algo/executor")
+    print(f"    DELETE /algo/tasks/{{id}}         (calcul lancé avec ?task={{id}})")
     print(f"\n  HISTORY:")
     print(f"    GET    /history/paths")
     print(f"    GET    /history/paths/{{id}}/replay")
+    print(f"    GET    /history/replay?limit=1000&workers=4")
+    print(f"    GET    /history/storage")
+    print(f"    POST   /history/compact")
+    print(f"\n  DEBUG:")
+    print(f"    GET    /metrics")
+    print(f"    GET    /debug/queries")
+    print(f"    DELETE /debug/queries")
     print(f"\nAppuyez sur Ctrl+C pour arrêter le serveur\n")
     
+    if workers > 1:
+        from backend.prefork import serve_prefork
+        serve_prefork(host, port, workers, WasteGraphHandler, WasteGraphServer,
+                      _publish_change, _expiry_loop)
+        return
+    
+    httpd = WasteGraphServer((host, port), WasteGraphHandler)
+    
+    # Démarrage rapide : routage servi depuis le snapshot mappé,
+    # réconciliation avec la BDD en arrière-plan
+    algo_controller = WasteGraphHandler.algo_controller
+    try:
+        snapshot = algo_controller.load_snapshot()
+        if snapshot:
+            print(f"✓ Snapshot mappé : {snapshot['nodes']} nœuds, {snapshot['edges']} arêtes")
+    except Exception as e:
+        print(f"Avertissement: snapshot illisible, ignoré: {e}")
+    algo_controller.reconcile_snapshot_async()
+    threading.Thread(target=_expiry_loop, args=(WasteGraphHandler.graph_controller,),
+                     name='constraint-expiry', daemon=True).start()
+    
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
@@ -283,4 +824,10 @@ def run_server(host='localhost', port=8000):
 
 
 if __name__ == '__main__':
-    run_server()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Serveur API WasteGraph")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS,
+                        help="Processus lecteurs (> 1 = mode prefork, writer unique)")
+    args = parser.parse_args()
+    run_server(args.host, args.port, args.workers)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import threading
+
+
+class FlightTimeout(TimeoutError):
+    """Un follower a attendu le calcul partagé plus longtemps que son délai"""
+
+
+class _Call:
+    """Calcul en cours : attendu par les requêtes identiques arrivées entre-temps"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Regrouper les calculs identiques lancés en même temps
+
+    La première requête pour une clé (leader) exécute le calcul ; celles qui
+    arrivent avant la fin (followers) attendent et reçoivent le même résultat
+    ou la même exception. Rien n'est gardé après la fin : ce n'est pas un
+    cache, la clé doit donc inclure la version du graphe pour qu'une requête
+    arrivée après une modification ne reçoive pas un résultat obsolète.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.followers = 0
+
+    def do(self, key, fn, timeout=None):
+        """
+        Exécuter fn() une seule fois pour tous les appels concurrents de même clé
+
+        Args:
+            key: Clé hashable (paramètres du calcul + version du graphe)
+            fn: Calcul à exécuter par le leader
+            timeout: Attente maximale d'un follower (secondes, None = illimitée)
+
+        Returns:
+            tuple: (résultat, True si partagé avec un calcul déjà en cours)
+
+        Raises:
+            FlightTimeout: Le follower a attendu plus de timeout secondes
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.followers += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise FlightTimeout(f"calcul partagé toujours en cours après {timeout:g} s")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Compteurs depuis le démarrage et calculs en cours"""
+        with self._lock:
+            total = self.leaders + self.followers
+            return {
+                'in_flight': len(self._calls),
+                'waiting': sum(call.followers for call in self._calls.values()),
+                'computed': self.leaders,
+                'coalesced': self.followers,
+                'coalescing_rate': round(self.followers / total, 4) if total else 0.0
+            }
@@ -0,0 +1,46 @@
+"""Package storage - Backends de stockage derrière les contrôleurs"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from config.config import STORAGE_BACKEND, SQLITE_PATH
+
+from .base import GraphStorage
+from .sqlite import SQLiteStorage
+
+_default_storage = None
+
+
+def create_storage(kind, path=None):
+    """
+    Créer un backend de stockage
+
+    Args:
+        kind: 'postgres' ou 'sqlite'
+        path: fichier SQLite (':memory:' par défaut)
+    """
+    if kind == 'postgres':
+        # Import local : psycopg2 n'est requis que pour ce backend
+        from .postgres import PostgresStorage
+        return PostgresStorage()
+    if kind == 'sqlite':
+        return SQLiteStorage(path or SQLITE_PATH)
+    raise ValueError(f"Backend de stockage inconnu: {kind}")
+
+
+def get_storage():
+    """Stockage par défaut, partagé par tous les contrôleurs (STORAGE_BACKEND)"""
+    global _default_storage
+    if _default_storage is None:
+        _default_storage = create_storage(STORAGE_BACKEND)
+    return _default_storage
+
+
+def set_storage(storage):
+    """Remplacer le stockage par défaut (avant de créer les contrôleurs)"""
+    global _default_storage
+    _default_storage = storage
+
+
+__all__ = ['GraphStorage', 'SQLiteStorage', 'create_storage', 'get_storage', 'set_storage']
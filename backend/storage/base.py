@@ -0,0 +1,195 @@
+from abc import ABC, abstractmethod
+
+
+class GraphStorage(ABC):
+    """
+    Interface de stockage derrière GraphController et AlgorithmController
+
+    Les méthodes retournent des dicts (une ligne = un dict) ; les dates sont
+    des objets datetime, sauf dans l'historique déjà prêt pour le JSON.
+    Chaque méthode d'écriture est atomique (commit ou rollback complet).
+    """
+
+    name = None
+
+    # =====================
+    # NODES
+    # =====================
+
+    @abstractmethod
+    def create_node(self, node_id, x, y, capacity=0):
+        """Insérer un nœud et retourner la ligne créée"""
+
+    @abstractmethod
+    def get_all_nodes(self):
+        """Tous les nœuds, triés par id"""
+
+    @abstractmethod
+    def get_node(self, node_id):
+        """Un nœud, ou None"""
+
+    @abstractmethod
+    def delete_node(self, node_id):
+        """Supprimer un nœud (et ses arêtes) ; True si supprimé"""
+
+    # =====================
+    # EDGES (chaque arête non-orientée = 2 lignes orientées)
+    # =====================
+
+    @abstractmethod
+    def create_edge(self, source, target, weight):
+        """Créer/mettre à jour l'arête dans les deux sens (ValueError si un nœud manque)"""
+
+    @abstractmethod
+    def get_all_edges(self):
+        """Arêtes sans doublons (source < target)"""
+
+    @abstractmethod
+    def get_edges_from(self, node_id):
+        """Voisins d'un nœud : [{'target', 'weight'}]"""
+
+    @abstractmethod
+    def get_edge_weight(self, source, target):
+        """Poids de l'arête source → target, ou None"""
+
+    @abstractmethod
+    def delete_edge(self, source, target):
+        """Supprimer l'arête dans les deux sens ; True si supprimée"""
+
+    @abstractmethod
+    def replace_node_with_shortcuts(self, node_id, created, updated):
+        """
+        Suppression intelligente, en une transaction
+
+        Args:
+            created: [(a, b, poids)] raccourcis à créer (dans les deux sens)
+            updated: [(a, b, poids)] arêtes existantes à raccourcir
+        """
+
+    # =====================
+    # CONSTRAINTS
+    # =====================
+
+    @abstractmethod
+    def create_constraint(self, source, target, constraint_value, reason, expiry_days, expires_at,
+                          schedule=None):
+        """Insérer une contrainte et retourner la ligne créée (schedule : fenêtres horaires, None = permanente)"""
+
+    @abstractmethod
+    def get_active_constraints(self):
+        """Contraintes actives et non expirées (plus récentes d'abord)"""
+
+    @abstractmethod
+    def get_all_constraints(self):
+        """Toutes les contraintes (plus récentes d'abord)"""
+
+    @abstractmethod
+    def toggle_constraint(self, constraint_id, is_active):
+        """Activer/désactiver ; True si la contrainte existe"""
+
+    @abstractmethod
+    def get_constraints_for_edge(self, source, target):
+        """Contraintes valides de l'arête (dans les deux sens)"""
+
+    # =====================
+    # GRAPHE COMPLET
+    # =====================
+
+    @abstractmethod
+    def load_graph(self):
+        """
+        Charger le graphe en un minimum de requêtes
+
+        Returns:
+            tuple: (nœuds [dict], arêtes orientées [{'source', 'target', 'weight',
+                    'constraint_value'}]) où constraint_value est la somme des
+                    contraintes valides de l'arête
+        """
+
+    @abstractmethod
+    def load_region(self, node_ids):
+        """
+        Charger une partie du graphe (zone visible d'une carte)
+
+        Returns:
+            tuple: (nœuds [dict] de node_ids, arêtes orientées partant de ces
+                    nœuds, même format que load_graph)
+        """
+
+    @abstractmethod
+    def clear_graph(self):
+        """Supprimer tous les nœuds et arêtes"""
+
+    @abstractmethod
+    def bulk_insert(self, nodes, edges):
+        """
+        Insertion en masse (benchmarks, imports)
+
+        Args:
+            nodes: [(id, x, y, capacity)]
+            edges: [(source, target, poids)] orientées (les deux sens à fournir)
+        """
+
+    # =====================
+    # JOURNAL DES MODIFICATIONS
+    # =====================
+
+    @abstractmethod
+    def record_change(self, entity, operation, data):
+        """Ajouter une modification au journal et retourner sa version"""
+
+    @abstractmethod
+    def get_changes(self, since, limit=1000):
+        """Modifications de version > since, par version croissante (data décodé)"""
+
+    @abstractmethod
+    def get_change_bounds(self):
+        """(plus ancienne version conservée ou None, dernière version ou 0)"""
+
+    @abstractmethod
+    def prune_changes(self, up_to_version):
+        """Supprimer les modifications de version <= up_to_version"""
+
+    # =====================
+    # HISTORIQUE
+    # =====================
+
+    @abstractmethod
+    def save_path_history(self, source, destination, path, distance, constraints_snapshot, user_notes):
+        """Sauvegarder un calcul et retourner son id"""
+
+    @abstractmethod
+    def get_path_history(self, limit=20):
+        """Derniers calculs (path / constraints_snapshot décodés, dates en ISO)"""
+
+    @abstractmethod
+    def get_path_history_entry(self, history_id):
+        """Un calcul de l'historique (même format), ou None"""
+
+    @abstractmethod
+    def compact_path_history(self, batch_size=500):
+        """Migrer les anciennes lignes vers le format compact ; nb de lignes migrées"""
+
+    @abstractmethod
+    def get_history_storage_stats(self):
+        """Taille de l'historique comparée au JSON en clair"""
+
+    # =====================
+    # INSTRUMENTATION (self.stats : QueryStats)
+    # =====================
+
+    stats = None
+
+    def begin_request(self):
+        self.stats.begin_request()
+
+    def request_counters(self):
+        return self.stats.request_counters()
+
+    def get_query_stats(self, top=20):
+        result = self.stats.snapshot(top)
+        result['storage'] = self.name
+        return result
+
+    def reset_query_stats(self):
+        self.stats.reset()
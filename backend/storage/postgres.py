@@ -0,0 +1,468 @@
+import json
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from backend.database.connection import Database
+from backend.database.payload_store import PayloadStore
+from backend.storage.base import GraphStorage
+
+
+# Contraintes valides d'une arête (les deux sens) : requête chaude, préparée
+CONSTRAINTS_FOR_EDGE_SQL = """
+    SELECT * FROM constraints
+    WHERE ((source = %s AND target = %s) OR (source = %s AND target = %s))
+    AND is_active = TRUE
+    AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+    ORDER BY created_at DESC
+"""
+
+# Graphe complet en UNE requête : somme des contraintes valides par paire non-orientée
+# (les contraintes à calendrier sont appliquées par créneau, hors du graphe)
+LOAD_EDGES_SQL = """
+    SELECT e.source, e.target, e.weight, COALESCE(c.total, 0) AS constraint_value
+    FROM edges e
+    LEFT JOIN (
+        SELECT LEAST(source, target) AS a, GREATEST(source, target) AS b,
+               SUM(constraint_value) AS total
+        FROM constraints
+        WHERE is_active = TRUE
+        AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+        AND schedule IS NULL
+        GROUP BY 1, 2
+    ) c ON c.a = LEAST(e.source, e.target) AND c.b = GREATEST(e.source, e.target)
+    {where}
+    ORDER BY e.source, e.target
+"""
+
+
+class PostgresStorage(GraphStorage):
+    """Stockage PostgreSQL (psycopg2, connexion Database partagée)"""
+
+    name = 'postgres'
+
+    def __init__(self, db=None):
+        self.db = db or Database()
+        self.stats = self.db.stats
+        self.payloads = PayloadStore(self.db)
+        # Une seule connexion partagée par les threads du serveur : transactions sérialisées
+        self._lock = threading.RLock()
+
+    def _run(self, fn, write=False):
+        """
+        Exécuter fn(cursor) ; commit si écriture, rollback en cas d'erreur
+
+        Une lecture termine aussi sa transaction : sinon la suivante réutilise
+        la même et CURRENT_TIMESTAMP reste figé (les contraintes n'expirent plus)
+        """
+        with self._lock:
+            cursor = self.db.get_cursor()
+            try:
+                result = fn(cursor)
+                if write:
+                    self.db.commit()
+                return result
+            except Exception:
+                if write:
+                    self.db.rollback()
+                raise
+            finally:
+                cursor.close()
+                if not write:
+                    self.db.rollback()
+
+    # =====================
+    # NODES
+    # =====================
+
+    def create_node(self, node_id, x, y, capacity=0):
+        def op(cursor):
+            cursor.execute("""
+                INSERT INTO nodes (id, x, y, capacity)
+                VALUES (%s, %s, %s, %s)
+                RETURNING *
+            """, (node_id, x, y, capacity))
+            return dict(cursor.fetchone())
+        return self._run(op, write=True)
+
+    def get_all_nodes(self):
+        def op(cursor):
+            cursor.execute("SELECT * FROM nodes ORDER BY id")
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    def get_node(self, node_id):
+        def op(cursor):
+            self.db.execute_prepared(cursor, 'get_node', "SELECT * FROM nodes WHERE id = %s", (node_id,))
+            result = cursor.fetchone()
+            return dict(result) if result else None
+        return self._run(op)
+
+    def delete_node(self, node_id):
+        def op(cursor):
+            cursor.execute("DELETE FROM nodes WHERE id = %s", (node_id,))
+            return cursor.rowcount > 0
+        return self._run(op, write=True)
+
+    # =====================
+    # EDGES
+    # =====================
+
+    def create_edge(self, source, target, weight):
+        def op(cursor):
+            # Vérifier que les nœuds existent
+            cursor.execute("SELECT id FROM nodes WHERE id IN (%s, %s)", (source, target))
+            if cursor.rowcount < 2:
+                raise ValueError("Les nœuds source et/ou target n'existent pas")
+
+            # Insérer les deux directions
+            cursor.execute("""
+                INSERT INTO edges (source, target, weight)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (source, target) DO UPDATE
+                SET weight = EXCLUDED.weight
+                RETURNING *
+            """, (source, target, weight))
+            edge = cursor.fetchone()
+
+            cursor.execute("""
+                INSERT INTO edges (source, target, weight)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (source, target) DO UPDATE
+                SET weight = EXCLUDED.weight
+            """, (target, source, weight))
+            return dict(edge)
+        return self._run(op, write=True)
+
+    def get_all_edges(self):
+        def op(cursor):
+            cursor.execute("""
+                SELECT * FROM edges
+                WHERE source < target
+                ORDER BY source, target
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    def get_edges_from(self, node_id):
+        def op(cursor):
+            self.db.execute_prepared(cursor, 'edge_neighbors', """
+                SELECT target, weight FROM edges
+                WHERE source = %s
+            """, (node_id,))
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    def get_edge_weight(self, source, target):
+        def op(cursor):
+            self.db.execute_prepared(cursor, 'edge_weight', """
+                SELECT weight FROM edges
+                WHERE source = %s AND target = %s
+            """, (source, target))
+            row = cursor.fetchone()
+            return row['weight'] if row else None
+        return self._run(op)
+
+    def delete_edge(self, source, target):
+        def op(cursor):
+            cursor.execute("""
+                DELETE FROM edges
+                WHERE (source = %s AND target = %s) OR (source = %s AND target = %s)
+            """, (source, target, target, source))
+            return cursor.rowcount > 0
+        return self._run(op, write=True)
+
+    def replace_node_with_shortcuts(self, node_id, created, updated):
+        def op(cursor):
+            for a, b, weight in updated:
+                cursor.execute("""
+                    UPDATE edges
+                    SET weight = %s
+                    WHERE (source = %s AND target = %s) OR (source = %s AND target = %s)
+                """, (weight, a, b, b, a))
+            for a, b, weight in created:
+                cursor.execute("""
+                    INSERT INTO edges (source, target, weight)
+                    VALUES (%s, %s, %s), (%s, %s, %s)
+                """, (a, b, weight, b, a, weight))
+
+            # CASCADE supprime les arêtes du nœud
+            cursor.execute("DELETE FROM nodes WHERE id = %s", (node_id,))
+            return cursor.rowcount > 0
+        return self._run(op, write=True)
+
+    # =====================
+    # CONSTRAINTS
+    # =====================
+
+    def create_constraint(self, source, target, constraint_value, reason, expiry_days, expires_at,
+                          schedule=None):
+        def op(cursor):
+            cursor.execute("""
+                INSERT INTO constraints
+                (source, target, constraint_value, reason, expiry_days, expires_at, schedule)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                RETURNING *
+            """, (source, target, constraint_value, reason, expiry_days, expires_at,
+                  json.dumps(schedule) if schedule else None))
+            return dict(cursor.fetchone())
+        return self._run(op, write=True)
+
+    def get_active_constraints(self):
+        def op(cursor):
+            cursor.execute("""
+                SELECT * FROM constraints
+                WHERE is_active = TRUE
+                AND (expires_at IS NULL OR expires_at > CURRENT_TIMESTAMP)
+                ORDER BY created_at DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    def get_all_constraints(self):
+        def op(cursor):
+            cursor.execute("SELECT * FROM constraints ORDER BY created_at DESC")
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    def toggle_constraint(self, constraint_id, is_active):
+        def op(cursor):
+            cursor.execute("""
+                UPDATE constraints
+                SET is_active = %s
+                WHERE id = %s
+            """, (is_active, constraint_id))
+            return cursor.rowcount > 0
+        return self._run(op, write=True)
+
+    def get_constraints_for_edge(self, source, target):
+        def op(cursor):
+            self.db.execute_prepared(cursor, 'constraints_for_edge', CONSTRAINTS_FOR_EDGE_SQL,
+                                     (source, target, target, source))
+            return [dict(row) for row in cursor.fetchall()]
+        return self._run(op)
+
+    # =====================
+    # GRAPHE COMPLET
+    # =====================
+
+    def load_graph(self):
+        def op(cursor):
+            cursor.execute("SELECT * FROM nodes ORDER BY id")
+            nodes = [dict(row) for row in cursor.fetchall()]
+            cursor.execute(LOAD_EDGES_SQL.format(where=''))
+            edges = [dict(row) for row in cursor.fetchall()]
+            return nodes, edges
+        return self._run(op)
+
+    def load_region(self, node_ids):
+        def op(cursor):
+            ids = sorted(node_ids)
+            cursor.execute("SELECT * FROM nodes WHERE id = ANY(%s) ORDER BY id", (ids,))
+            nodes = [dict(row) for row in cursor.fetchall()]
+            cursor.execute(LOAD_EDGES_SQL.format(where='WHERE e.source = ANY(%s)'), (ids,))
+            edges = [dict(row) for row in cursor.fetchall()]
+            return nodes, edges
+        return self._run(op)
+
+    def clear_graph(self):
+        def op(cursor):
+            cursor.execute("TRUNCATE TABLE edges, nodes CASCADE")
+            return True
+        return self._run(op, write=True)
+
+    def bulk_insert(self, nodes, edges):
+        from psycopg2.extras import execute_values
+
+        def op(cursor):
+            execute_values(cursor, "INSERT INTO nodes (id, x, y, capacity) VALUES %s",
+                           list(nodes), page_size=5000)
+            execute_values(cursor, "INSERT INTO edges (source, target, weight) VALUES %s",
+                           list(edges), page_size=5000)
+        return self._run(op, write=True)
+
+    # =====================
+    # JOURNAL DES MODIFICATIONS
+    # =====================
+
+    def record_change(self, entity, operation, data):
+        def op(cursor):
+            cursor.execute("""
+                INSERT INTO graph_changes (entity, operation, data)
+                VALUES (%s, %s, %s)
+                RETURNING version
+            """, (entity, operation, json.dumps(data, default=str)))
+            return cursor.fetchone()['version']
+        return self._run(op, write=True)
+
+    def get_changes(self, since, limit=1000):
+        def op(cursor):
+            cursor.execute("""
+                SELECT version, entity, operation, data, changed_at FROM graph_changes
+                WHERE version > %s
+                ORDER BY version
+                LIMIT %s
+            """, (since, limit))
+            rows = [dict(row) for row in cursor.fetchall()]
+            for row in rows:
+                row['data'] = json.loads(row['data'])
+            return rows
+        return self._run(op)
+
+    def get_change_bounds(self):
+        def op(cursor):
+            cursor.execute("SELECT MIN(version) AS oldest, MAX(version) AS latest FROM graph_changes")
+            row = cursor.fetchone()
+            return row['oldest'], row['latest'] or 0
+        return self._run(op)
+
+    def prune_changes(self, up_to_version):
+        def op(cursor):
+            cursor.execute("DELETE FROM graph_changes WHERE version <= %s", (up_to_version,))
+            return cursor.rowcount
+        return self._run(op, write=True)
+
+    # =====================
+    # HISTORIQUE (payloads dédupliqués)
+    # =====================
+
+    def save_path_history(self, source, destination, path, distance, constraints_snapshot, user_notes):
+        def op(cursor):
+            path_hash = self.payloads.store_path(cursor, path)
+            snapshot_hash = self.payloads.store_snapshot(cursor, constraints_snapshot)
+
+            cursor.execute("""
+                INSERT INTO path_history
+                (source, destination, path_hash, distance, snapshot_hash, user_notes)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                RETURNING id
+            """, (source, destination, path_hash, distance, snapshot_hash, user_notes))
+            return cursor.fetchone()['id']
+        try:
+            return self._run(op, write=True)
+        except Exception:
+            self.payloads.reset_cache()
+            raise
+
+    def _decode_history_rows(self, cursor, rows):
+        """
+        Reconstituer path / constraints_snapshot des lignes d'historique
+
+        Les nouvelles lignes référencent des payloads (path_hash, snapshot_hash),
+        les anciennes contiennent encore le JSON en clair : les deux formats
+        donnent le même résultat.
+        """
+        hashes = []
+        for row in rows:
+            hashes.append(row.get('path_hash'))
+            hashes.append(row.get('snapshot_hash'))
+        payloads = self.payloads.load_many(cursor, hashes)
+
+        items = []
+        for row in rows:
+            item = dict(row)
+            path_hash = item.pop('path_hash', None)
+            snapshot_hash = item.pop('snapshot_hash', None)
+
+            if path_hash:
+                item['path'] = payloads[path_hash]
+            else:
+                item['path'] = json.loads(item['path']) if isinstance(item['path'], str) else item['path']
+
+            if snapshot_hash:
+                item['constraints_snapshot'] = payloads[snapshot_hash]
+            else:
+                item['constraints_snapshot'] = json.loads(item['constraints_snapshot']) if isinstance(item['constraints_snapshot'], str) else item['constraints_snapshot']
+
+            # FIX: Convertir calculated_at en ISO string
+            if item.get('calculated_at'):
+                item['calculated_at'] = item['calculated_at'].isoformat()
+
+            items.append(item)
+
+        return items
+
+    def get_path_history(self, limit=20):
+        def op(cursor):
+            cursor.execute("""
+                SELECT * FROM path_history
+                ORDER BY calculated_at DESC
+                LIMIT %s
+            """, (limit,))
+            return self._decode_history_rows(cursor, cursor.fetchall())
+        return self._run(op)
+
+    def get_path_history_entry(self, history_id):
+        def op(cursor):
+            cursor.execute("SELECT * FROM path_history WHERE id = %s", (history_id,))
+            row = cursor.fetchone()
+            return self._decode_history_rows(cursor, [row])[0] if row else None
+        return self._run(op)
+
+    def compact_path_history(self, batch_size=500):
+        def op(cursor):
+            migrated = 0
+            while True:
+                cursor.execute("""
+                    SELECT id, path, constraints_snapshot FROM path_history
+                    WHERE path_hash IS NULL
+                    ORDER BY id
+                    LIMIT %s
+                """, (batch_size,))
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                for row in self._decode_history_rows(cursor, rows):
+                    path_hash = self.payloads.store_path(cursor, row['path'])
+                    snapshot_hash = self.payloads.store_snapshot(cursor, row['constraints_snapshot'])
+                    cursor.execute("""
+                        UPDATE path_history
+                        SET path_hash = %s, snapshot_hash = %s,
+                            path = NULL, constraints_snapshot = NULL
+                        WHERE id = %s
+                    """, (path_hash, snapshot_hash, row['id']))
+
+                self.db.commit()
+                migrated += len(rows)
+            return migrated
+        try:
+            return self._run(op, write=True)
+        except Exception:
+            self.payloads.reset_cache()
+            raise
+
+    def get_history_storage_stats(self):
+        def op(cursor):
+            cursor.execute("""
+                SELECT
+                    (SELECT COUNT(*) FROM path_history) AS history_rows,
+                    (SELECT COUNT(*) FROM path_payloads WHERE kind = 'path') AS distinct_paths,
+                    (SELECT COUNT(*) FROM path_payloads WHERE kind = 'snapshot') AS distinct_snapshots,
+                    (SELECT COUNT(*) FROM node_symbols) AS interned_nodes,
+                    pg_total_relation_size('path_history') AS history_bytes,
+                    pg_total_relation_size('path_payloads') AS payloads_bytes,
+                    pg_total_relation_size('node_symbols') AS symbols_bytes,
+                    (SELECT COALESCE(SUM(
+                        COALESCE(octet_length(h.path), p.raw_size, 0)
+                        + COALESCE(octet_length(h.constraints_snapshot), s.raw_size, 0)
+                    ), 0)
+                     FROM path_history h
+                     LEFT JOIN path_payloads p ON p.hash = h.path_hash
+                     LEFT JOIN path_payloads s ON s.hash = h.snapshot_hash) AS inline_payload_bytes,
+                    (SELECT COALESCE(SUM(octet_length(data)), 0) FROM path_payloads) AS stored_payload_bytes
+            """)
+            stats = dict(cursor.fetchone())
+            stats['total_bytes'] = stats['history_bytes'] + stats['payloads_bytes'] + stats['symbols_bytes']
+            return stats
+        return self._run(op)
+
+    # =====================
+    # INSTRUMENTATION
+    # =====================
+
+    def get_query_stats(self, top=20):
+        result = self.db.get_query_stats(top)
+        result['storage'] = self.name
+        return result
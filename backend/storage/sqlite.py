@@ -0,0 +1,450 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from backend.storage.base import GraphStorage
+from backend.monitoring.query_stats import QueryStats
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nodes (
+    id TEXT PRIMARY KEY,
+    x REAL NOT NULL,
+    y REAL NOT NULL,
+    capacity INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS edges (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    target TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    weight REAL NOT NULL,
+    UNIQUE(source, target)
+);
+
+CREATE TABLE IF NOT EXISTS constraints (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    target TEXT NOT NULL REFERENCES nodes(id) ON DELETE CASCADE,
+    constraint_value REAL NOT NULL,
+    is_active INTEGER DEFAULT 1,
+    reason TEXT,
+    created_at TEXT NOT NULL,
+    expiry_days INTEGER,
+    expires_at TEXT,
+    schedule TEXT
+);
+
+CREATE TABLE IF NOT EXISTS path_payloads (
+    hash TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    data BLOB NOT NULL,
+    raw_size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS path_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL REFERENCES nodes(id),
+    destination TEXT NOT NULL REFERENCES nodes(id),
+    path_hash TEXT NOT NULL REFERENCES path_payloads(hash),
+    distance REAL NOT NULL,
+    calculated_at TEXT NOT NULL,
+    snapshot_hash TEXT NOT NULL REFERENCES path_payloads(hash),
+    user_notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS graph_changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    data TEXT NOT NULL,
+    changed_at TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_edges_source_target ON edges(source, target, weight);
+CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target);
+CREATE INDEX IF NOT EXISTS idx_constraints_active_edge
+    ON constraints(source, target, expires_at) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS idx_path_history_date ON path_history(calculated_at);
+"""
+
+VALID_CONSTRAINT = "is_active = 1 AND (expires_at IS NULL OR expires_at > ?)"
+
+
+def _now():
+    return datetime.now().isoformat(sep=' ')
+
+
+def _to_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class SQLiteStorage(GraphStorage):
+    """
+    Stockage en processus (sqlite3 de la bibliothèque standard)
+
+    Par défaut la base est en mémoire (':memory:') : aucun aller-retour réseau,
+    idéal pour les déploiements locaux/embarqués et pour mesurer le coût
+    des algorithmes sans la latence de PostgreSQL. Un chemin de fichier
+    donne un stockage persistant.
+
+    L'historique est dédupliqué comme avec PostgreSQL (payloads adressés par
+    hash), mais stocké en JSON canonique, sans dictionnaire de nœuds.
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.stats = QueryStats()
+        self._lock = threading.RLock()
+        self._connect()
+
+    def _connect(self):
+        """Ouvrir la connexion (et la rouvrir dans un processus forké : prefork)"""
+        self._pid = os.getpid()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if self.path != ':memory:':
+            # Lecteurs concurrents d'un autre processus pendant une écriture
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(SCHEMA)
+        # Bases créées avant les contraintes à calendrier
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(constraints)")}
+        if 'schedule' not in columns:
+            self._conn.execute("ALTER TABLE constraints ADD COLUMN schedule TEXT")
+
+    # =====================
+    # OUTILS
+    # =====================
+
+    def _execute(self, sql, params=()):
+        start = time.perf_counter()
+        try:
+            return self._conn.execute(sql, params)
+        finally:
+            self.stats.record(sql, params, time.perf_counter() - start)
+
+    def _run(self, fn, write=False):
+        """Exécuter fn() sous verrou ; commit si écriture, rollback en cas d'erreur"""
+        with self._lock:
+            if self._pid != os.getpid():
+                self._connect()
+            try:
+                result = fn()
+                if write:
+                    self._conn.commit()
+                return result
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _fetchall(self, sql, params=()):
+        return [dict(row) for row in self._execute(sql, params).fetchall()]
+
+    def _fetchone(self, sql, params=()):
+        row = self._execute(sql, params).fetchone()
+        return dict(row) if row else None
+
+    @staticmethod
+    def _constraint_row(row):
+        row['is_active'] = bool(row['is_active'])
+        row['created_at'] = _to_datetime(row['created_at'])
+        row['expires_at'] = _to_datetime(row['expires_at'])
+        row['schedule'] = json.loads(row['schedule']) if row.get('schedule') else None
+        return row
+
+    # =====================
+    # NODES
+    # =====================
+
+    def create_node(self, node_id, x, y, capacity=0):
+        def op():
+            self._execute("INSERT INTO nodes (id, x, y, capacity) VALUES (?, ?, ?, ?)",
+                          (node_id, x, y, capacity))
+            return self._fetchone("SELECT * FROM nodes WHERE id = ?", (node_id,))
+        return self._run(op, write=True)
+
+    def get_all_nodes(self):
+        return self._run(lambda: self._fetchall("SELECT * FROM nodes ORDER BY id"))
+
+    def get_node(self, node_id):
+        return self._run(lambda: self._fetchone("SELECT * FROM nodes WHERE id = ?", (node_id,)))
+
+    def delete_node(self, node_id):
+        return self._run(
+            lambda: self._execute("DELETE FROM nodes WHERE id = ?", (node_id,)).rowcount > 0,
+            write=True
+        )
+
+    # =====================
+    # EDGES
+    # =====================
+
+    def create_edge(self, source, target, weight):
+        def op():
+            found = self._fetchall("SELECT id FROM nodes WHERE id IN (?, ?)", (source, target))
+            if len(found) < 2:
+                raise ValueError("Les nœuds source et/ou target n'existent pas")
+
+            for a, b in ((source, target), (target, source)):
+                self._execute("""
+                    INSERT INTO edges (source, target, weight)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (source, target) DO UPDATE
+                    SET weight = excluded.weight
+                """, (a, b, weight))
+            return self._fetchone("SELECT * FROM edges WHERE source = ? AND target = ?", (source, target))
+        return self._run(op, write=True)
+
+    def get_all_edges(self):
+        return self._run(lambda: self._fetchall("""
+            SELECT * FROM edges
+            WHERE source < target
+            ORDER BY source, target
+        """))
+
+    def get_edges_from(self, node_id):
+        return self._run(lambda: self._fetchall(
+            "SELECT target, weight FROM edges WHERE source = ?", (node_id,)))
+
+    def get_edge_weight(self, source, target):
+        def op():
+            row = self._fetchone("SELECT weight FROM edges WHERE source = ? AND target = ?", (source, target))
+            return row['weight'] if row else None
+        return self._run(op)
+
+    def delete_edge(self, source, target):
+        return self._run(lambda: self._execute("""
+            DELETE FROM edges
+            WHERE (source = ? AND target = ?) OR (source = ? AND target = ?)
+        """, (source, target, target, source)).rowcount > 0, write=True)
+
+    def replace_node_with_shortcuts(self, node_id, created, updated):
+        def op():
+            for a, b, weight in updated:
+                self._execute("""
+                    UPDATE edges SET weight = ?
+                    WHERE (source = ? AND target = ?) OR (source = ? AND target = ?)
+                """, (weight, a, b, b, a))
+            for a, b, weight in created:
+                self._execute("INSERT INTO edges (source, target, weight) VALUES (?, ?, ?), (?, ?, ?)",
+                              (a, b, weight, b, a, weight))
+            return self._execute("DELETE FROM nodes WHERE id = ?", (node_id,)).rowcount > 0
+        return self._run(op, write=True)
+
+    # =====================
+    # CONSTRAINTS
+    # =====================
+
+    def create_constraint(self, source, target, constraint_value, reason, expiry_days, expires_at,
+                          schedule=None):
+        def op():
+            cursor = self._execute("""
+                INSERT INTO constraints
+                (source, target, constraint_value, reason, created_at, expiry_days, expires_at, schedule)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (source, target, constraint_value, reason, _now(), expiry_days,
+                  expires_at.isoformat(sep=' ') if expires_at else None,
+                  json.dumps(schedule) if schedule else None))
+            row = self._fetchone("SELECT * FROM constraints WHERE id = ?", (cursor.lastrowid,))
+            return self._constraint_row(row)
+        return self._run(op, write=True)
+
+    def get_active_constraints(self):
+        return self._run(lambda: [self._constraint_row(r) for r in self._fetchall(f"""
+            SELECT * FROM constraints
+            WHERE {VALID_CONSTRAINT}
+            ORDER BY created_at DESC
+        """, (_now(),))])
+
+    def get_all_constraints(self):
+        return self._run(lambda: [self._constraint_row(r) for r in self._fetchall(
+            "SELECT * FROM constraints ORDER BY created_at DESC")])
+
+    def toggle_constraint(self, constraint_id, is_active):
+        return self._run(lambda: self._execute(
+            "UPDATE constraints SET is_active = ? WHERE id = ?",
+            (1 if is_active else 0, constraint_id)).rowcount > 0, write=True)
+
+    def get_constraints_for_edge(self, source, target):
+        return self._run(lambda: [self._constraint_row(r) for r in self._fetchall(f"""
+            SELECT * FROM constraints
+            WHERE ((source = ? AND target = ?) OR (source = ? AND target = ?))
+            AND {VALID_CONSTRAINT}
+            ORDER BY created_at DESC
+        """, (source, target, target, source, _now()))])
+
+    # =====================
+    # GRAPHE COMPLET
+    # =====================
+
+    def _load_edges(self, where='', params=()):
+        """Arêtes orientées avec la somme de leurs contraintes valides permanentes (sans calendrier)"""
+        return self._fetchall(f"""
+            SELECT e.source, e.target, e.weight, COALESCE(c.total, 0) AS constraint_value
+            FROM edges e
+            LEFT JOIN (
+                SELECT MIN(source, target) AS a, MAX(source, target) AS b,
+                       SUM(constraint_value) AS total
+                FROM constraints
+                WHERE {VALID_CONSTRAINT} AND schedule IS NULL
+                GROUP BY 1, 2
+            ) c ON c.a = MIN(e.source, e.target) AND c.b = MAX(e.source, e.target)
+            {where}
+            ORDER BY e.source, e.target
+        """, (_now(),) + tuple(params))
+
+    def load_graph(self):
+        def op():
+            nodes = self._fetchall("SELECT * FROM nodes ORDER BY id")
+            return nodes, self._load_edges()
+        return self._run(op)
+
+    def load_region(self, node_ids):
+        def op():
+            nodes, edges = [], []
+            ids = sorted(node_ids)
+            # Par lots : nombre de paramètres limité par requête SQLite
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                marks = ', '.join('?' * len(chunk))
+                nodes += self._fetchall(f"SELECT * FROM nodes WHERE id IN ({marks}) ORDER BY id", chunk)
+                edges += self._load_edges(f"WHERE e.source IN ({marks})", chunk)
+            return nodes, edges
+        return self._run(op)
+
+    def clear_graph(self):
+        def op():
+            # Équivalent du TRUNCATE ... CASCADE de PostgreSQL
+            for table in ('path_history', 'constraints', 'edges', 'nodes'):
+                self._execute(f"DELETE FROM {table}")
+            return True
+        return self._run(op, write=True)
+
+    def bulk_insert(self, nodes, edges):
+        def op():
+            self._conn.executemany("INSERT INTO nodes (id, x, y, capacity) VALUES (?, ?, ?, ?)", nodes)
+            self._conn.executemany("INSERT INTO edges (source, target, weight) VALUES (?, ?, ?)", edges)
+        return self._run(op, write=True)
+
+    # =====================
+    # JOURNAL DES MODIFICATIONS
+    # =====================
+
+    def record_change(self, entity, operation, data):
+        def op():
+            cursor = self._execute("""
+                INSERT INTO graph_changes (entity, operation, data, changed_at)
+                VALUES (?, ?, ?, ?)
+            """, (entity, operation, json.dumps(data, default=str), _now()))
+            return cursor.lastrowid
+        return self._run(op, write=True)
+
+    def get_changes(self, since, limit=1000):
+        def op():
+            rows = self._fetchall("""
+                SELECT version, entity, operation, data, changed_at FROM graph_changes
+                WHERE version > ?
+                ORDER BY version
+                LIMIT ?
+            """, (since, limit))
+            for row in rows:
+                row['data'] = json.loads(row['data'])
+                row['changed_at'] = _to_datetime(row['changed_at'])
+            return rows
+        return self._run(op)
+
+    def get_change_bounds(self):
+        def op():
+            row = self._fetchone("SELECT MIN(version) AS oldest, MAX(version) AS latest FROM graph_changes")
+            return row['oldest'], row['latest'] or 0
+        return self._run(op)
+
+    def prune_changes(self, up_to_version):
+        def op():
+            return self._execute("DELETE FROM graph_changes WHERE version <= ?",
+                                 (up_to_version,)).rowcount
+        return self._run(op, write=True)
+
+    # =====================
+    # HISTORIQUE (payloads dédupliqués)
+    # =====================
+
+    def _store_payload(self, kind, value):
+        canonical = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        payload_hash = hashlib.sha1(f"{kind}:{canonical}".encode('utf-8')).hexdigest()
+        data = canonical.encode('utf-8')
+        self._execute("""
+            INSERT INTO path_payloads (hash, kind, data, raw_size)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (hash) DO NOTHING
+        """, (payload_hash, kind, data, len(data)))
+        return payload_hash
+
+    def save_path_history(self, source, destination, path, distance, constraints_snapshot, user_notes):
+        def op():
+            path_hash = self._store_payload('path', list(path or []))
+            snapshot_hash = self._store_payload('snapshot', constraints_snapshot or {})
+            cursor = self._execute("""
+                INSERT INTO path_history
+                (source, destination, path_hash, distance, calculated_at, snapshot_hash, user_notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (source, destination, path_hash, distance, _now(), snapshot_hash, user_notes))
+            return cursor.lastrowid
+        return self._run(op, write=True)
+
+    def _history_rows(self, where, params):
+        rows = self._fetchall(f"""
+            SELECT h.*, p.data AS path_data, s.data AS snapshot_data
+            FROM path_history h
+            JOIN path_payloads p ON p.hash = h.path_hash
+            JOIN path_payloads s ON s.hash = h.snapshot_hash
+            {where}
+        """, params)
+
+        items = []
+        for row in rows:
+            row['path'] = json.loads(row.pop('path_data'))
+            row['constraints_snapshot'] = json.loads(row.pop('snapshot_data'))
+            row.pop('path_hash')
+            row.pop('snapshot_hash')
+            row['calculated_at'] = datetime.fromisoformat(row['calculated_at']).isoformat()
+            items.append(row)
+        return items
+
+    def get_path_history(self, limit=20):
+        return self._run(lambda: self._history_rows(
+            "ORDER BY h.calculated_at DESC LIMIT ?", (limit,)))
+
+    def get_path_history_entry(self, history_id):
+        def op():
+            rows = self._history_rows("WHERE h.id = ?", (history_id,))
+            return rows[0] if rows else None
+        return self._run(op)
+
+    def compact_path_history(self, batch_size=500):
+        # Toutes les lignes sont déjà au format dédupliqué
+        return 0
+
+    def get_history_storage_stats(self):
+        def op():
+            stats = self._fetchone("""
+                SELECT
+                    (SELECT COUNT(*) FROM path_history) AS history_rows,
+                    (SELECT COUNT(*) FROM path_payloads WHERE kind = 'path') AS distinct_paths,
+                    (SELECT COUNT(*) FROM path_payloads WHERE kind = 'snapshot') AS distinct_snapshots,
+                    (SELECT COALESCE(SUM(p.raw_size + s.raw_size), 0)
+                     FROM path_history h
+                     JOIN path_payloads p ON p.hash = h.path_hash
+                     JOIN path_payloads s ON s.hash = h.snapshot_hash) AS inline_payload_bytes,
+                    (SELECT COALESCE(SUM(length(data)), 0) FROM path_payloads) AS stored_payload_bytes
+            """)
+            stats['total_bytes'] = None  # Pas de taille par table en SQLite sans dbstat
+            return stats
+        return self._run(op)
@@ -0,0 +1,102 @@
+"""
+Cycle de vie des contraintes (expiration) sur un stockage SQLite en mémoire,
+et sur PostgreSQL quand il est disponible
+
+Usage :
+    python -m pytest backend/test_constraints.py
+"""
+
+import time
+import sys
+import os
+import pytest
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.controllers import GraphController, AlgorithmController
+from backend.storage import SQLiteStorage, create_storage, set_storage
+
+
+def _graph_controller():
+    """Petit graphe A - B - C et A - D - C (A -> C : 2 par B, 6 par D)"""
+    controller = GraphController(SQLiteStorage())
+    for node_id, x in (('A', 0), ('B', 1), ('C', 2), ('D', 1)):
+        controller.create_node(node_id, x, 0)
+    controller.create_edge('A', 'B', 1.0)
+    controller.create_edge('B', 'C', 1.0)
+    controller.create_edge('A', 'D', 3.0)
+    controller.create_edge('D', 'C', 3.0)
+    return controller
+
+
+def test_expiration_detected_after_queue_invalidated():
+    controller = _graph_controller()
+    controller.check_expirations()
+
+    # La création invalide la file : elle est reconstruite au prochain contrôle,
+    # alors que la contrainte a déjà expiré
+    constraint = controller.create_constraint('A', 'B', 10, "Travaux", 1 / 86400)
+    version = controller.get_versions()['constraints']
+    time.sleep(1.5)
+
+    assert controller.check_expirations() == [constraint['id']]
+    assert controller.get_versions()['constraints'] == version + 1
+    assert controller.check_expirations() == []
+
+
+def test_depot_tree_drops_expired_constraint():
+    set_storage(SQLiteStorage())
+    algo = AlgorithmController()
+    algo.executor = None  # Calculs dans le thread du test
+    graph = algo.graph_controller
+    for node_id, x in (('A', 0), ('B', 1), ('C', 2), ('D', 1)):
+        graph.create_node(node_id, x, 0)
+    graph.create_edge('A', 'B', 1.0)
+    graph.create_edge('B', 'C', 1.0)
+    graph.create_edge('A', 'D', 3.0)
+    graph.create_edge('D', 'C', 3.0)
+
+    def route():
+        result = algo.find_shortest_path('A', 'C', save_to_history=False)
+        return result['path'], result['distance']
+
+    # A est une source fréquente : servie par son arbre, réparé à chaque modification
+    route()
+    assert route() == (['A', 'B', 'C'], 2.0)
+    assert 'A' in algo.depot_trees.sources()
+
+    graph.create_constraint('A', 'B', 10, "Travaux", 2 / 86400)
+    assert route() == (['A', 'D', 'C'], 6.0)
+
+    time.sleep(2.5)
+    assert route() == (['A', 'B', 'C'], 2.0)
+
+
+def test_postgres_expiration_visible_under_new_etag():
+    pytest.importorskip('psycopg2')
+    try:
+        controller = GraphController(create_storage('postgres'))
+        controller.get_all_nodes()
+    except Exception as e:
+        pytest.skip(f"PostgreSQL indisponible: {e}")
+
+    # Nœuds préfixés : la base peut contenir d'autres données
+    a, b = 'TEST_EXPIRY_A', 'TEST_EXPIRY_B'
+    controller.create_node(a, 0, 0)
+    controller.create_node(b, 1, 0)
+    try:
+        controller.create_edge(a, b, 1.0)
+        controller.check_expirations()
+        constraint = controller.create_constraint(a, b, 10, "Travaux", 2 / 86400)
+
+        etag = controller.get_etag('constraints')
+        assert controller.get_graph().get_edge(a, b).constraint_value == 10
+        assert constraint['id'] in [row['id'] for row in controller.get_active_constraints()]
+
+        # Les lectures précédentes ne doivent pas laisser une transaction ouverte (CURRENT_TIMESTAMP figé)
+        time.sleep(2.5)
+        assert controller.get_etag('constraints') != etag
+        assert controller.get_graph().get_edge(a, b).constraint_value == 0
+        assert constraint['id'] not in [row['id'] for row in controller.get_active_constraints()]
+    finally:
+        controller.delete_node(a)
+        controller.delete_node(b)
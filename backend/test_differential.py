@@ -0,0 +1,364 @@
+"""
+Harnais différentiel : les moteurs rapides contre les algorithmes de référence
+
+Des graphes aléatoires (avec surcouche de contraintes) sont générés ; chaque
+moteur enregistré doit donner la même distance que `dijkstra()`, un chemin
+valide, et un coloriage valide. En cas d'écart, le cas est réduit (shrinking)
+jusqu'à un graphe minimal qui reproduit l'erreur.
+
+Usage :
+    python backend/test_differential.py [nb_essais] [graine]
+    python -m pytest backend/test_differential.py
+
+Pour vérifier un nouveau moteur, l'ajouter à ROUTING_ENGINES ou COLORING_ENGINES.
+"""
+
+import random
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.algorithms import (
+    dijkstra, dijkstra_all, multi_source_dijkstra, bounded_dijkstra, build_path, graph_coloring,
+    ComponentIndex, evaluate_scenarios, ShortestPathTree
+)
+from backend.models import Node, Edge, Graph
+
+
+EPSILON = 1e-9
+
+
+# =====================
+# MOTEURS À VÉRIFIER
+# =====================
+
+def _dijkstra_all_engine(adj, source, destination):
+    dist, parent = dijkstra_all(adj, source)
+    path = build_path(parent, destination)
+    return path, dist.get(destination, float('inf'))
+
+
+def _multi_source_engine(adj, source, destination):
+    """Dijkstra multi-sources réduit à une source (même étiquetage que dijkstra_all)"""
+    dist, nearest, parent = multi_source_dijkstra(adj, [source, source])
+    path = build_path(parent, destination)
+    return path, dist.get(destination, float('inf'))
+
+
+def _bounded_engine(adj, source, destination):
+    """Isochrone au budget couvrant tout le graphe (somme des coûts des arêtes)"""
+    budget = sum(weight + constraint for neighbors in adj.values() for _, weight, constraint in neighbors)
+    reach = bounded_dijkstra(adj, source, budget)
+    if destination not in reach['nodes']:
+        return None, float('inf')
+    parent = dict(zip(reach['nodes'], reach['predecessor']))
+    return build_path(parent, destination), reach['distance'][reach['nodes'].index(destination)]
+
+
+def _scenario_engine(adj, source, destination):
+    """Scénario qui rétablit toutes les contraintes sur une base sans contraintes"""
+    base = {node: [(neighbor, weight, 0) for neighbor, weight, _ in neighbors]
+            for node, neighbors in adj.items()}
+    constraints = {f"{node}-{neighbor}": constraint
+                   for node, neighbors in adj.items() for neighbor, _, constraint in neighbors}
+    comparison = evaluate_scenarios(base, [(source, destination)],
+                                    [{'name': 'all', 'constraints': constraints}], with_paths=True)
+    scenario = comparison['scenarios'][0]
+    return scenario['path'][0], scenario['distance'][0]
+
+
+def _repaired_tree_engine(adj, source, destination):
+    """Arbre construit sans contraintes puis réparé : hausses (contrainte + 5) puis baisses"""
+    base = {node: [(neighbor, weight, 0) for neighbor, weight, _ in neighbors]
+            for node, neighbors in adj.items()}
+    reverse = {node: set() for node in adj}
+    for node, neighbors in adj.items():
+        for neighbor, _, _ in neighbors:
+            reverse[neighbor].add(node)
+    tree = ShortestPathTree.build(base, source)
+
+    for offset in (5, 0):
+        for node, neighbors in adj.items():
+            for i, (neighbor, weight, constraint) in enumerate(neighbors):
+                old = base[node][i][2]
+                base[node][i] = (neighbor, weight, constraint + offset)
+                if constraint + offset > old:
+                    tree.increase(base, reverse, node, neighbor)
+                elif constraint + offset < old:
+                    tree.decrease(base, node, neighbor, weight + constraint + offset)
+    return tree.path_to(destination)
+
+
+def _component_guard_engine(adj, source, destination):
+    """Refus « composantes différentes » (index construit par ajouts successifs), sinon Dijkstra"""
+    index = ComponentIndex()
+    index.clear()
+    for node, neighbors in adj.items():
+        index.add_node(node)
+        for neighbor, _, _ in neighbors:
+            index.add_edge(node, neighbor)
+    if index.disconnected(source, destination):
+        return None, float('inf')
+    return dijkstra(adj, source, destination)
+
+
+# {nom: fonction(adj, source, destination) -> (chemin, distance)}
+ROUTING_ENGINES = {
+    'dijkstra_all': _dijkstra_all_engine,
+    'multi_source': _multi_source_engine,
+    'bounded': _bounded_engine,
+    'scenario': _scenario_engine,
+    'repaired_tree': _repaired_tree_engine,
+    'component_guard': _component_guard_engine,
+}
+
+# {nom: fonction(adj) -> {node: couleur}}
+COLORING_ENGINES = {
+    'graph_coloring': graph_coloring,
+}
+
+
+# =====================
+# GÉNÉRATION DES CAS
+# =====================
+
+def random_case(rng, max_nodes=10):
+    """
+    Cas aléatoire : graphe non-orienté + contraintes + paire (source, destination)
+
+    Les contraintes sont des overrides orientés au format de custom_constraints
+    ({"A-B": valeur}), comme celles de /algo/dijkstra.
+    """
+    n = rng.randint(1, max_nodes)
+    nodes = [f"N{i}" for i in range(n)]
+
+    edges = []
+    seen = set()
+    for _ in range(rng.randint(0, n * 2)):
+        u, v = rng.sample(nodes, 2) if n > 1 else (nodes[0], nodes[0])
+        key = tuple(sorted((u, v)))
+        if u == v or key in seen:
+            continue
+        seen.add(key)
+        edges.append((u, v, rng.choice([0, 1, 2, 3, 5, 7.5, rng.uniform(0, 10)])))
+
+    constraints = {}
+    for u, v, _ in edges:
+        if rng.random() < 0.3:
+            a, b = (u, v) if rng.random() < 0.5 else (v, u)
+            constraints[f"{a}-{b}"] = rng.choice([0, 1, 4, 10, rng.uniform(0, 20)])
+
+    return {
+        'nodes': nodes,
+        'edges': edges,
+        'constraints': constraints,
+        'source': rng.choice(nodes),
+        'destination': rng.choice(nodes)
+    }
+
+
+def build_adjacency(case):
+    """Construire la liste d'adjacence via Graph (même chemin que les contrôleurs)"""
+    graph = Graph()
+    for node_id in case['nodes']:
+        graph.add_node(Node(node_id))
+    for u, v, w in case['edges']:
+        graph.add_edge(Edge(u, v, w))
+    return graph.get_adjacency_list(case['constraints'])
+
+
+# =====================
+# PROPRIÉTÉS
+# =====================
+
+def path_cost(adj, path):
+    """Coût d'un chemin, ou None si une arête n'existe pas"""
+    total = 0
+    for u, v in zip(path, path[1:]):
+        costs = [w + c for neighbor, w, c in adj.get(u, []) if neighbor == v]
+        if not costs:
+            return None
+        total += min(costs)
+    return total
+
+
+def check_routing(engine, case):
+    """Retourne un message d'erreur, ou None si le moteur est conforme"""
+    adj = build_adjacency(case)
+    source, destination = case['source'], case['destination']
+
+    ref_path, ref_dist = dijkstra(adj, source, destination)
+    try:
+        path, dist = engine(adj, source, destination)
+    except Exception as e:
+        return f"exception: {e!r}"
+
+    if ref_path is None:
+        if path is not None or dist != float('inf'):
+            return f"devrait être inatteignable, obtenu {path} ({dist})"
+        return None
+
+    if path is None:
+        return f"chemin manquant (référence {ref_path}, {ref_dist})"
+    if abs(dist - ref_dist) > EPSILON * max(1, abs(ref_dist)):
+        return f"distance {dist} ≠ référence {ref_dist}"
+    if path[0] != source or path[-1] != destination:
+        return f"chemin {path} ne relie pas {source} → {destination}"
+
+    cost = path_cost(adj, path)
+    if cost is None:
+        return f"chemin {path} utilise une arête inexistante"
+    if abs(cost - dist) > EPSILON * max(1, abs(dist)):
+        return f"coût réel du chemin {cost} ≠ distance annoncée {dist}"
+
+    return None
+
+
+def check_coloring(engine, case):
+    """Tout nœud est colorié et deux voisins n'ont jamais la même couleur"""
+    adj = build_adjacency(case)
+    try:
+        coloring = engine(adj)
+    except Exception as e:
+        return f"exception: {e!r}"
+
+    missing = [n for n in adj if n not in coloring]
+    if missing:
+        return f"nœuds non coloriés: {missing}"
+
+    for node, neighbors in adj.items():
+        for neighbor, _, _ in neighbors:
+            if coloring[node] == coloring[neighbor]:
+                return f"{node} et {neighbor} ont la même couleur {coloring[node]}"
+
+    return None
+
+
+# =====================
+# SHRINKING
+# =====================
+
+def _candidates(case):
+    """Cas plus petits que `case` (un élément retiré ou simplifié à la fois)"""
+    for i in range(len(case['edges'])):
+        edge = case['edges'][i]
+        yield dict(case, edges=case['edges'][:i] + case['edges'][i + 1:],
+                   constraints={k: v for k, v in case['constraints'].items()
+                                if k not in (f"{edge[0]}-{edge[1]}", f"{edge[1]}-{edge[0]}")})
+
+    for key in case['constraints']:
+        yield dict(case, constraints={k: v for k, v in case['constraints'].items() if k != key})
+
+    for node in case['nodes']:
+        if node in (case['source'], case['destination']):
+            continue
+        yield dict(
+            case,
+            nodes=[n for n in case['nodes'] if n != node],
+            edges=[e for e in case['edges'] if node not in e[:2]],
+            constraints={k: v for k, v in case['constraints'].items() if node not in k.split('-')}
+        )
+
+    # Simplifier les valeurs (entiers, puis 1)
+    for i, (u, v, w) in enumerate(case['edges']):
+        for simpler in (round(w), 1):
+            if simpler != w:
+                edges = list(case['edges'])
+                edges[i] = (u, v, simpler)
+                yield dict(case, edges=edges)
+
+    for key, value in case['constraints'].items():
+        for simpler in (round(value), 0):
+            if simpler != value:
+                yield dict(case, constraints=dict(case['constraints'], **{key: simpler}))
+
+
+def shrink(case, fails):
+    """
+    Réduire un cas en échec jusqu'à un minimum local
+
+    Args:
+        case: cas qui échoue
+        fails: fonction(case) -> message d'erreur ou None
+    """
+    improved = True
+    while improved:
+        improved = False
+        for candidate in _candidates(case):
+            if fails(candidate):
+                case = candidate
+                improved = True
+                break
+    return case
+
+
+# =====================
+# EXÉCUTION
+# =====================
+
+def run_differential(trials=500, seed=0):
+    """
+    Vérifier tous les moteurs enregistrés sur `trials` cas aléatoires
+
+    Returns:
+        list: échecs [{'engine', 'error', 'case' (minimal)}]
+    """
+    rng = random.Random(seed)
+    failures = []
+    checks = [(name, engine, check_routing) for name, engine in ROUTING_ENGINES.items()]
+    checks += [(name, engine, check_coloring) for name, engine in COLORING_ENGINES.items()]
+
+    for _ in range(trials):
+        case = random_case(rng)
+        for name, engine, check in checks:
+            if any(f['engine'] == name for f in failures):
+                continue
+            error = check(engine, case)
+            if error:
+                minimal = shrink(case, lambda c: check(engine, c))
+                failures.append({'engine': name, 'error': check(engine, minimal), 'case': minimal})
+
+    return failures
+
+
+def test_routing_and_coloring_engines_match_reference():
+    failures = run_differential(trials=300, seed=1)
+    assert not failures, failures
+
+
+def test_shrinker_reduces_failure_to_minimal_graph():
+    # Moteur volontairement faux : ignore les contraintes
+    def buggy(adj, source, destination):
+        plain = {n: [(v, w, 0) for v, w, _ in edges] for n, edges in adj.items()}
+        return dijkstra(plain, source, destination)
+
+    rng = random.Random(3)
+    case = next(c for c in (random_case(rng) for _ in range(1000)) if check_routing(buggy, c))
+    minimal = shrink(case, lambda c: check_routing(buggy, c))
+
+    assert check_routing(buggy, minimal)
+    assert len(minimal['constraints']) == 1
+    assert len(minimal['edges']) <= 3
+
+
+if __name__ == '__main__':
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    print(f"=== HARNAIS DIFFÉRENTIEL ({trials} cas, graine {seed}) ===\n")
+    print(f"Routage : {', '.join(ROUTING_ENGINES)}")
+    print(f"Coloriage : {', '.join(COLORING_ENGINES)}\n")
+
+    failures = run_differential(trials, seed)
+    if not failures:
+        print("✓ Tous les moteurs sont conformes à la référence")
+        sys.exit(0)
+
+    for failure in failures:
+        case = failure['case']
+        print(f"❌ {failure['engine']}: {failure['error']}")
+        print(f"   nœuds: {case['nodes']}")
+        print(f"   arêtes: {case['edges']}")
+        print(f"   contraintes: {case['constraints']}")
+        print(f"   {case['source']} → {case['destination']}\n")
+    sys.exit(1)
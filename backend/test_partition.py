@@ -0,0 +1,71 @@
+"""
+Découpage en zones sur des graphes non connexes
+
+Usage :
+    python -m pytest backend/test_partition.py
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backend.algorithms import partition_graph
+
+
+def _edge(adj, a, b, weight=1):
+    adj[a].append((b, weight, 0))
+    adj[b].append((a, weight, 0))
+
+
+def _check_loads(result, weights=None):
+    """Charge et taille de chaque zone cohérentes avec l'affectation des nœuds"""
+    for zone in result['zones']:
+        members = [node for node, z in zip(result['nodes'], result['zone']) if z == zone['zone']]
+        assert zone['nodes'] == len(members) > 0
+        assert zone['load'] == sum((weights or {}).get(node, 1) for node in members)
+        assert zone['seed'] in members
+
+
+def test_isolated_nodes_get_one_zone_each():
+    result = partition_graph({'A': [], 'B': [], 'C': []}, 3)
+
+    assert sorted(result['zone']) == [0, 1, 2]
+    assert all(zone['contiguous'] for zone in result['zones'])
+    _check_loads(result)
+
+
+def test_small_components_are_not_split_when_seeds_can_go_elsewhere():
+    adj = {'A': [], 'B': [], 'C': [], 'D': []}
+    _edge(adj, 'A', 'B')
+    result = partition_graph(adj, 3)
+    zone = dict(zip(result['nodes'], result['zone']))
+
+    assert zone['A'] == zone['B']
+    assert len({zone['A'], zone['C'], zone['D']}) == 3
+    assert all(z['contiguous'] for z in result['zones'])
+    _check_loads(result)
+
+
+def test_large_component_gets_seeds_in_proportion_to_its_load():
+    adj = {f"N{i}": [] for i in range(8)}
+    adj['X'] = []
+    for i in range(7):
+        _edge(adj, f"N{i}", f"N{i + 1}")
+    result = partition_graph(adj, 3)
+    zone = dict(zip(result['nodes'], result['zone']))
+
+    # 8 nœuds reliés contre 1 isolé : les 3 graines vont à la chaîne, X rejoint la zone la moins chargée
+    assert len({zone[f"N{i}"] for i in range(8)}) == 3
+    assert result['cut_edges'] == 2
+    _check_loads(result)
+
+
+def test_zero_capacity_nodes_do_not_leave_empty_zones():
+    adj = {node: [] for node in 'ABCDE'}
+    _edge(adj, 'A', 'B')
+    _edge(adj, 'B', 'C')
+    _edge(adj, 'D', 'E')
+    capacities = {'A': 0, 'B': 0, 'C': 5, 'D': 0, 'E': 5}
+    result = partition_graph(adj, 5, capacities)
+
+    _check_loads(result, capacities)
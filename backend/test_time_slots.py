@@ -0,0 +1,104 @@
+"""
+Contraintes à calendrier : validation des fenêtres et tables par créneau
+
+Usage :
+    python -m pytest backend/test_time_slots.py
+"""
+
+from datetime import datetime
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from backend.algorithms import compile_time_slots, parse_schedule
+
+# 13 mai 2024 : un lundi
+MONDAY = datetime(2024, 5, 13)
+
+
+def _at(day, hour, minute=0):
+    return MONDAY.replace(day=13 + day, hour=hour, minute=minute)
+
+
+def _constraint(source, target, value, schedule):
+    return {'source': source, 'target': target, 'constraint_value': value, 'schedule': schedule}
+
+
+def test_parse_schedule_normalizes_days_and_hours():
+    windows = parse_schedule([{'days': ['mardi', 0, 0], 'start': '8:00', 'end': '24:00'}])
+
+    assert windows == [{'days': [0, 1], 'start': '08:00', 'end': '24:00'}]
+    assert parse_schedule([{'start': '22:00', 'end': '06:00'}])[0]['days'] == list(range(7))
+    assert parse_schedule(None) is None
+
+
+@pytest.mark.parametrize('schedule', [
+    [],
+    [{'start': '24:30', 'end': '01:00'}],
+    [{'start': '08:60', 'end': '09:00'}],
+    [{'start': '08:00'}],
+    [{'days': [7], 'start': '08:00', 'end': '09:00'}],
+    [{'days': [True], 'start': '08:00', 'end': '09:00'}],
+    ['08:00-09:00'],
+])
+def test_parse_schedule_rejects_invalid_windows(schedule):
+    with pytest.raises(ValueError):
+        parse_schedule(schedule)
+
+
+def test_overnight_window_continues_next_day():
+    # Dimanche 22:00 -> lundi 02:00 : la semaine boucle
+    table = compile_time_slots(
+        [_constraint('A', 'B', 4, [{'days': [6], 'start': '22:00', 'end': '02:00'}])], 60)
+
+    def extras(when):
+        return table.profiles[table.profile_of(when)]
+
+    assert extras(_at(6, 21, 59)) == {}
+    assert extras(_at(6, 22)) == {('A', 'B'): 4}
+    assert extras(_at(0, 1, 59)) == {('A', 'B'): 4}
+    assert extras(_at(0, 2)) == {}
+    assert extras(_at(1, 1)) == {}
+
+
+def test_window_until_midnight_and_partial_slots():
+    table = compile_time_slots([
+        _constraint('B', 'A', 2, [{'days': [2], 'start': '20:00', 'end': '24:00'}]),
+        _constraint('C', 'D', 1, [{'days': [2], 'start': '10:15', 'end': '10:45'}]),
+    ], 60)
+
+    def extras(when):
+        return table.profiles[table.profile_of(when)]
+
+    # Arête non-orientée : clé (a, b) avec a < b
+    assert extras(_at(2, 23, 59)) == {('A', 'B'): 2}
+    assert extras(_at(3, 0)) == {}
+    # Une fenêtre qui recouvre une partie du créneau s'applique à tout le créneau
+    assert extras(_at(2, 10)) == {('C', 'D'): 1}
+    assert extras(_at(2, 10, 59)) == {('C', 'D'): 1}
+    assert extras(_at(2, 11)) == {}
+
+
+def test_identical_slots_share_one_profile():
+    table = compile_time_slots([
+        _constraint('A', 'B', 5, [{'days': [0, 1, 2, 3, 4], 'start': '08:00', 'end': '10:00'}]),
+        _constraint('A', 'B', 1, [{'days': [0], 'start': '09:00', 'end': '10:00'}]),
+        _constraint('C', 'D', 3, None),  # Permanente : déjà dans le graphe, ignorée
+    ], 30)
+
+    assert len(table.slot_profile) == 7 * 48
+    # Vide, matinée de semaine, lundi 9h-10h (les deux contraintes sommées)
+    assert table.stats()['profiles'] == 3
+    assert table.profiles[0] == {}
+    monday_8 = table.profile_of(_at(0, 8))
+    assert table.profile_of(_at(4, 9, 45)) == monday_8 == table.profile_of(_at(1, 9))
+    assert table.profiles[table.profile_of(_at(0, 9, 30))] == {('A', 'B'): 6}
+    assert table.profile_of(_at(5, 9)) == 0
+
+
+def test_slot_minutes_must_divide_a_day():
+    with pytest.raises(ValueError):
+        compile_time_slots([], 7)
+    assert compile_time_slots([], 15).slot_bounds(4 * 24 * 3 + 5) == ('jeudi', '01:15', '01:30')
@@ -1,3 +1,5 @@
+import os
+
 # Configuration PostgreSQL
 DB_CONFIG = {
     'host': 'localhost',
@@ -5,4 +7,36 @@ DB_CONFIG = {
     'user': 'postgres',
     'password': '12345678',  # ← Ton mot de passe pgAdmin !
     'port': 5432
-}
\ No newline at end of file
+}
+
+# Instrumentation des requêtes SQL
+SLOW_QUERY_MS = 50        # Seuil du journal des requêtes lentes (ms)
+SLOW_QUERY_LOG_SIZE = 200  # Nombre de requêtes lentes conservées
+
+# Snapshot binaire du graphe (démarrage rapide par mmap)
+SNAPSHOT_PATH = os.environ.get('WASTEGRAPH_SNAPSHOT_PATH',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'graph.snapshot'))
+
+# Backend de stockage des contrôleurs : 'postgres' ou 'sqlite' (en processus)
+STORAGE_BACKEND = os.environ.get('WASTEGRAPH_STORAGE', 'postgres')
+SQLITE_PATH = os.environ.get('WASTEGRAPH_SQLITE_PATH', ':memory:')
+
+# Réponses HTTP : compression gzip au-delà de cette taille (octets)
+GZIP_MIN_BYTES = 1024
+
+# Journal des modifications (GET /graph/changes) : nombre de versions conservées
+CHANGE_LOG_SIZE = 10000
+
+# Exécution des algorithmes dans un pool de processus (0 = dans le thread de la requête)
+ALGO_WORKERS = int(os.environ.get('WASTEGRAPH_ALGO_WORKERS', min(4, os.cpu_count() or 1)))
+ALGO_TIMEOUT_S = 30  # Délai par défaut d'un calcul (surchargeable par ?timeout=)
+
+# Arbres des plus courts chemins des sources fréquentes (dépôts), réparés à chaque contrainte
+DEPOT_TREES_MAX = 16       # Nombre d'arbres gardés (0 = désactivé)
+DEPOT_TREE_MIN_HITS = 2    # Requêtes depuis une source avant de lui construire un arbre
+
+# Contraintes à calendrier : durée d'un créneau de la semaine (diviseur de 24 h ; 60 = 168 créneaux)
+TIME_SLOT_MINUTES = 60
+
+# Serveur : nombre de processus lecteurs (> 1 = mode prefork avec un writer unique)
+SERVER_WORKERS = int(os.environ.get('WASTEGRAPH_WORKERS', 1))
@@ -18,8 +18,40 @@ document.addEventListener('DOMContentLoaded', () => {
     initializeEventListeners();
     loadGraph();
     loadConstraints();
+    subscribeToChanges();
 });
 
+// =================== TEMPS RÉEL (SSE) ===================
+// Le serveur pousse chaque modification (et chaque expiration de contrainte) :
+// les autres écrans se mettent à jour sans rafraîchir. Les rechargements sont
+// groupés et peu coûteux (ETag : 304 si rien n'a changé entre-temps).
+function subscribeToChanges() {
+    if (!window.EventSource) return;
+    
+    const source = new EventSource(`${API_BASE}/events`);
+    let reloadTimer = null;
+    let reloadConstraints = false;
+    
+    const scheduleReload = (withConstraints) => {
+        reloadConstraints = reloadConstraints || withConstraints;
+        if (reloadTimer) return;
+        reloadTimer = setTimeout(async () => {
+            const constraints = reloadConstraints;
+            reloadTimer = null;
+            reloadConstraints = false;
+            if (constraints) await loadConstraints();
+            await loadGraph();
+        }, 200);
+    };
+    
+    source.addEventListener('change', (event) => {
+        const change = JSON.parse(event.data);
+        scheduleReload(change.entity !== 'edge');
+    });
+    
+    source.addEventListener('resync', () => scheduleReload(true));
+}
+
 // =================== EVENT LISTENERS ===================
 function initializeEventListeners() {
     // Boutons d'édition